@@ -28,17 +28,418 @@
 from __future__ import print_function
 from __future__ import unicode_literals
 
+from fnmatch import fnmatch, translate
+import io
 import logging
+import os
+import posixpath
 from os import extsep, path, readlink, curdir
+import stat
 from subprocess import CalledProcessError, Popen, PIPE
 import sys
 import tarfile
-from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED
+import time
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED, is_zipfile
 import re
 
 __version__ = "1.17"
 
 
+class PrefetchedEntry(object):
+    """
+    File read ahead of the archive writer by GitArchiver.prefetch_files.
+
+    stat is the os.lstat result, linkname the target of a symlink, and data the
+    content of a regular file (None when it is larger than
+    GitArchiver.PREFETCH_MAX_SIZE: the writer then streams it from disk).
+    """
+
+    __slots__ = ("stat", "data", "linkname")
+
+    def __init__(self, st, data=None, linkname=None):
+        self.stat = st
+        self.data = data
+        self.linkname = linkname
+
+
+class GitBlob(object):
+    """
+    File of an archived revision, read from a GitObjectStore.
+
+    mode is the git file mode ("100644", "100755" or "120000" for symlinks)
+    and mtime the commit time of the archived revision.
+    """
+
+    __slots__ = ("store", "sha", "mode", "mtime")
+
+    def __init__(self, store, sha, mode, mtime):
+        self.store = store
+        self.sha = sha
+        self.mode = mode
+        self.mtime = mtime
+
+
+class ChecksumReader(object):
+    """
+    File object reading size bytes of fileobj and hashing them with SHA-256 on
+    the way, for ArchiveManifest.
+    """
+
+    def __init__(self, fileobj, size):
+        import hashlib
+
+        self.fileobj = fileobj
+        self.remaining = size
+        self.sha256 = hashlib.sha256()
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.fileobj.read(size)
+        self.sha256.update(data)
+        self.remaining -= len(data)
+        return data
+
+
+class ArchiveManifest(object):
+    """
+    Size, mode and SHA-256 of every entry of an archive, hashed while the
+    entries stream into the archive, and written to a sidecar file.
+
+    Formats are "json", a list of {"path", "mode", "size", "sha256"} objects
+    ({"path", "mode", "linkname"} for symlinks), and "sha256sums", the output
+    format of sha256sum (regular files only), to check an extracted archive
+    with `sha256sum -c`. Hard links are listed as regular files.
+    """
+
+    SUFFIXES = {"json": ".manifest.json", "sha256sums": ".sha256sums"}
+
+    def __init__(self, manifest_format):
+        if manifest_format not in self.SUFFIXES:
+            raise ValueError("unknown manifest format: {0}".format(manifest_format))
+        self.format = manifest_format
+        self.entries = []
+        self.files = {}
+
+    def reader(self, arcname, mode, size, fileobj):
+        """
+        Records a regular file, and returns the ChecksumReader through which
+        the archive must read its content.
+        """
+        reader = ChecksumReader(fileobj, size)
+        self.entries.append((arcname, mode, size, reader))
+        self.files[arcname] = (mode, size, reader)
+        return reader
+
+    def add_hardlink(self, arcname, linkname):
+        """
+        Records a hard link to the regular file linkname, recorded before: it
+        is listed as a copy of that file.
+        """
+        mode, size, reader = self.files[linkname]
+        self.entries.append((arcname, mode, size, reader))
+
+    def add_data(self, arcname, mode, data):
+        """
+        Records a regular file or a symlink (data being its target) whose
+        content is in memory.
+        """
+        if not isinstance(data, bytes):
+            data = data.encode("utf-8")
+        if stat.S_ISLNK(mode):
+            self.entries.append((arcname, mode, None, data.decode("utf-8")))
+            return
+        reader = self.reader(arcname, mode, len(data), io.BytesIO(data))
+        reader.read()
+
+    def write(self, manifest_path):
+        files = []
+        for arcname, mode, size, content in self.entries:
+            entry = {"path": arcname, "mode": "{0:04o}".format(stat.S_IMODE(mode))}
+            if size is None:
+                entry["linkname"] = content
+            elif content.remaining:
+                raise IOError("{0} was not archived entirely".format(arcname))
+            else:
+                entry["size"] = size
+                entry["sha256"] = content.sha256.hexdigest()
+            files.append(entry)
+
+        with io.open(manifest_path, "w", encoding="utf-8") as f:
+            if self.format == "json":
+                import json
+
+                f.write(json.dumps({"files": files}, indent=1, ensure_ascii=False))
+                f.write("\n")
+            else:
+                for entry in files:
+                    if "sha256" in entry:
+                        f.write("{0}  {1}\n".format(entry["sha256"], entry["path"]))
+
+
+class GitObjectStore(object):
+    """
+    Object database of a repository, read with a single long-running
+    `git cat-file --batch` process.
+
+    Blobs are streamed from the pipe of the process, so archiving a revision
+    neither reads nor needs a working tree: bare and partially checked-out
+    clones work as well. Git runs with the working tree pinned to git_dir,
+    so that the core.worktree of a submodule that is not checked out does not
+    matter.
+    """
+
+    BUFFER_SIZE = 1024 * 1024
+
+    def __init__(self, git_dir):
+        """
+        @param git_dir: Absolute path to the git directory of the repository.
+        @type git_dir: str
+        """
+        self.git_dir = git_dir
+        self.process = None
+        self.pending = False
+        self.prefix = ("git", "--git-dir=" + git_dir, "--work-tree=" + git_dir)
+
+    def git(self, *args):
+        """
+        Runs git in git_dir.
+
+        @return: Raw output of the command.
+        @rtype: bytes
+
+        @raise CalledProcessError: If the command fails.
+        """
+        cmd = self.prefix + args
+        p = Popen(cmd, stdout=PIPE, stderr=PIPE, cwd=self.git_dir)
+        output, error = p.communicate()
+        if p.returncode:
+            raise CalledProcessError(
+                returncode=p.returncode, cmd=" ".join(cmd), output=error
+            )
+        return output
+
+    def list_tree(self, revision):
+        """
+        Entries of the tree of revision, recursively.
+
+        @return: Iterator of (mode, type, sha, path) tuples, type being "blob"
+            or "commit" (a submodule).
+        @rtype: Iterable
+        """
+        for record in GitArchiver.stream_git(
+            self.prefix[1:] + ("ls-tree", "-r", "-z", "--full-tree", revision),
+            self.git_dir,
+        ):
+            info, file_path = record.split("\t", 1)
+            mode, type_, sha = info.split(" ")
+            yield mode, type_, sha, file_path
+
+    def has_commit(self, sha):
+        try:
+            self.git("cat-file", "-e", "{0}^{{commit}}".format(sha))
+        except CalledProcessError:
+            return False
+        return True
+
+    def open_blob(self, sha):
+        """
+        Requests a blob from cat-file.
+
+        The returned file object must be read for exactly size bytes before
+        the next request.
+
+        @return: (size, file object reading the blob)
+        @rtype: tuple
+        """
+        if self.process is None:
+            self.process = Popen(
+                self.prefix + ("cat-file", "--batch"),
+                stdin=PIPE,
+                stdout=PIPE,
+                cwd=self.git_dir,
+                bufsize=self.BUFFER_SIZE,
+            )
+        elif self.pending:
+            # Each blob is followed by a newline.
+            self.process.stdout.read(1)
+
+        self.process.stdin.write(sha.encode("ascii") + b"\n")
+        self.process.stdin.flush()
+        header = self.process.stdout.readline().split()
+        if len(header) != 3 or header[1] != b"blob":
+            raise ValueError("{0} is not a blob in {1}".format(sha, self.git_dir))
+        self.pending = True
+        return int(header[2]), self.process.stdout
+
+    def read_blob(self, sha):
+        size, f = self.open_blob(sha)
+        return f.read(size)
+
+    def close(self):
+        if self.process is not None:
+            self.process.stdin.close()
+            self.process.stdout.close()
+            self.process.wait()
+            self.process = None
+
+
+class ExcludeMatcher(object):
+    """
+    export-ignore patterns of GitArchiver.get_exclude_patterns compiled into a
+    directory trie.
+
+    The patterns of each .gitattributes (and the global ones) are compiled once
+    into a single regex. Each trie node stands for a directory and holds the
+    regexes that apply to it: those of the directory and of all its ancestors.
+    A file is classified by walking its directory components once and matching
+    its name and its path against these regexes, with the same semantics as
+    GitArchiver.is_file_excluded.
+    """
+
+    class Node(object):
+        __slots__ = ("regexes", "children")
+
+        def __init__(self, regexes):
+            self.regexes = regexes
+            self.children = {}
+
+    def __init__(self, exclude_patterns):
+        """
+        @param exclude_patterns: Exclude patterns with format specified for
+            GitArchiver.get_exclude_patterns.
+        @type exclude_patterns: dict
+        """
+        self.own_regexes = {}
+        for key, patterns in exclude_patterns.items():
+            if patterns:
+                self.own_regexes[key] = re.compile(
+                    "|".join(
+                        "(?:{0})".format(translate(path.normcase(p))) for p in patterns
+                    )
+                )
+        self.root = self.Node(self.regexes_of((), []))
+        self._last_dir = None
+        self._last_node = None
+
+    def regexes_of(self, key, inherited):
+        if key in self.own_regexes:
+            return inherited + [self.own_regexes[key]]
+        return inherited
+
+    def node(self, dir_path):
+        """
+        Trie node of dir_path, a directory relative to the repository ('' for
+        the top-level). Nodes are built on first use.
+        """
+        if dir_path == self._last_dir:
+            return self._last_node
+        key = (curdir,)
+        node = self.child(self.root, key, curdir)
+        for component in re.split(r"[/\\]", dir_path) if dir_path else []:
+            key += (component,)
+            node = self.child(node, key, component)
+        self._last_dir, self._last_node = dir_path, node
+        return node
+
+    def child(self, node, key, component):
+        child = node.children.get(component)
+        if child is None:
+            child = self.Node(self.regexes_of(key, node.regexes))
+            node.children[component] = child
+        return child
+
+    def is_excluded(self, repo_file_path):
+        """
+        @param repo_file_path: Path to a file, relative to the repository.
+        @type repo_file_path: str
+
+        @return: True if file should be excluded. Otherwise False.
+        @rtype: bool
+        """
+        regexes = self.node(path.dirname(repo_file_path)).regexes
+        if not regexes:
+            return False
+        file_name = path.normcase(path.basename(repo_file_path))
+        file_path = path.normcase(repo_file_path)
+        for regex in regexes:
+            if regex.match(file_name) or regex.match(file_path):
+                return True
+        return False
+
+
+class GitAttributeExcludes(object):
+    """
+    export-ignore attributes of a repository, evaluated by git itself.
+
+    All files and their parent directories are sent to a single
+    `git check-attr --stdin -z export-ignore` process, which applies the exact
+    git semantics: .gitattributes at every level, .git/info/attributes,
+    core.attributesfile, macros and negation ("-export-ignore"). As with
+    `git archive`, a path is excluded when it or one of its parent directories
+    has export-ignore set.
+    """
+
+    def __init__(self, repo_abspath, repo_file_paths):
+        """
+        @param repo_abspath: Absolute path to the git repository.
+        @type repo_abspath: str
+
+        @param repo_file_paths: Paths relative to repo_abspath, with "/" as
+            separator, as listed by git ls-files.
+        @type repo_file_paths: Iterable
+        """
+        candidates = set()
+        for repo_file_path in repo_file_paths:
+            candidates.add(repo_file_path)
+            parent = posixpath.dirname(repo_file_path)
+            while parent and parent not in candidates:
+                candidates.add(parent)
+                parent = posixpath.dirname(parent)
+        self.excluded = set(
+            self.check_attr(repo_abspath, sorted(candidates), "export-ignore", "set")
+        )
+
+    @staticmethod
+    def check_attr(repo_abspath, paths, attribute, value):
+        """
+        Paths among paths whose attribute has the given value (e.g. "set",
+        "unset", "unspecified" or a string value), in one git process.
+
+        @raise CalledProcessError: If git check-attr fails.
+        """
+        cmd = ["git", "check-attr", "--stdin", "-z", attribute]
+        p = Popen(cmd, stdin=PIPE, stdout=PIPE, cwd=repo_abspath)
+        output, _ = p.communicate(b"".join(os.fsencode(p_) + b"\0" for p_ in paths))
+        if p.returncode:
+            raise CalledProcessError(returncode=p.returncode, cmd=" ".join(cmd))
+
+        # -z output is a sequence of <path> NUL <attribute> NUL <info> NUL.
+        fields = output.split(b"\0")
+        matches = []
+        for i in range(0, len(fields) - 2, 3):
+            if fields[i + 2].decode("utf-8") == value:
+                matches.append(os.fsdecode(fields[i]))
+        return matches
+
+    def is_excluded(self, repo_file_path):
+        """
+        @param repo_file_path: Path relative to the repository. Paths inside
+            submodules only match through their ancestors: the files of a
+            submodule are checked against its own attributes.
+        @type repo_file_path: str
+
+        @return: True if file should be excluded. Otherwise False.
+        @rtype: bool
+        """
+        candidate = repo_file_path.replace(os.sep, "/")
+        while candidate:
+            if candidate in self.excluded:
+                return True
+            candidate = posixpath.dirname(candidate)
+        return False
+
+
 class GitArchiver(object):
     """
     GitArchiver
@@ -53,6 +454,12 @@ class GitArchiver(object):
 
     LOG = logging.getLogger("GitArchiver")
 
+    # Larger files are not read ahead, to bound the memory of the pipeline.
+    PREFETCH_MAX_SIZE = 4 * 1024 * 1024
+
+    # Name, at the root of delta archives, of the manifest of deleted files.
+    DELTA_MANIFEST = ".git-archive-delta.json"
+
     def __init__(
         self,
         prefix="",
@@ -60,6 +467,12 @@ class GitArchiver(object):
         force_sub=False,
         extra=None,
         main_repo_abspath=None,
+        prefetch=0,
+        check_attr=False,
+        jobs=1,
+        revision=None,
+        base_revision=None,
+        manifest=None,
     ):
         """
         @param prefix: Prefix used to prepend all paths in the resulting archive.
@@ -89,6 +502,42 @@ class GitArchiver(object):
             will be replaced with abspath to top-level directory of the repository.
             If None, current cwd is used.
         @type main_repo_abspath: str
+
+        @param prefetch: Number of threads reading file metadata and contents
+            ahead of the archive writer (see prefetch_files). 0 disables the
+            pipeline: files are read one at a time by the writer.
+        @type prefetch: int
+
+        @param check_attr: Let git evaluate export-ignore with one
+            `git check-attr` process per repository (see GitAttributeExcludes)
+            instead of parsing .gitattributes files in Python.
+        @type check_attr: bool
+
+        @param jobs: Number of threads listing (and with force_sub, initializing)
+            submodules concurrently. Files are archived in the same order as
+            with 1, the default: a serial traversal.
+        @type jobs: int
+
+        @param revision: Commit (or tree) to archive from the object database
+            with GitObjectStore, instead of the files of the working tree. The
+            repository may then be bare. Submodules are archived at the commit
+            recorded in revision, when that commit is available in their
+            repository. prefetch, jobs and force_sub do not apply, and
+            .gitattributes are read from revision.
+        @type revision: str
+
+        @param base_revision: Create a delta archive: only the files of
+            revision (HEAD by default) that differ from base_revision,
+            submodules included, and a DELTA_MANIFEST listing the files of
+            base_revision that revision deletes. See apply_delta_archives.
+        @type base_revision: str
+
+        @param manifest: Format of an ArchiveManifest to write next to the
+            archive, named after it with the suffix of the format: "json" or
+            "sha256sums". Checksums are computed while files are archived,
+            without reading them again. Files of directories given in extra are
+            not listed.
+        @type manifest: str
         """
         if extra is None:
             extra = []
@@ -98,13 +547,30 @@ class GitArchiver(object):
         elif not path.isabs(main_repo_abspath):
             raise ValueError("main_repo_abspath must be an absolute path")
 
-        try:
-            main_repo_abspath = path.abspath(
-                self.run_git_shell(
-                    "git rev-parse --show-toplevel", main_repo_abspath
+        if manifest is not None and manifest not in ArchiveManifest.SUFFIXES:
+            raise ValueError("unknown manifest format: {0}".format(manifest))
+
+        if base_revision is not None and revision is None:
+            revision = "HEAD"
+
+        if revision is not None and check_attr:
+            raise ValueError("check_attr evaluates the working tree, not a revision")
+
+        # Bare repositories have no top-level: use their git directory, which
+        # is enough to archive a revision.
+        options = ["--show-toplevel"]
+        if revision is not None:
+            options.append("--absolute-git-dir")
+        for option in options:
+            try:
+                repo_abspath = self.run_git(
+                    ["rev-parse", option], main_repo_abspath, quiet=True
                 ).rstrip()
-            )
-        except CalledProcessError:
+            except CalledProcessError:
+                continue
+            main_repo_abspath = path.abspath(repo_abspath)
+            break
+        else:
             raise ValueError(
                 "{0} is not part of a git repository".format(main_repo_abspath)
             )
@@ -114,6 +580,13 @@ class GitArchiver(object):
         self.extra = extra
         self.force_sub = force_sub
         self.main_repo_abspath = main_repo_abspath
+        self.prefetch = prefetch
+        self.check_attr = check_attr
+        self.jobs = jobs
+        self.revision = revision
+        self.base_revision = base_revision
+        self.manifest = manifest
+        self._owner_names = {}
 
     def create(self, output_path, dry_run=False, output_format=None):
         """
@@ -143,18 +616,67 @@ class GitArchiver(object):
                 )
             )
 
+        manifest = None
+        if not dry_run and self.manifest is not None:
+            manifest = ArchiveManifest(self.manifest)
+
+        output = None
+        if not dry_run and self.revision is not None:
+            # Blobs are copied from cat-file in large blocks: write them so.
+            output = io.open(
+                path.abspath(output_path), "wb", buffering=GitObjectStore.BUFFER_SIZE
+            )
+
         if not dry_run:
             if output_format == "zip":
-                archive = ZipFile(path.abspath(output_path), "w")
-
-                def add_file(file_path, arcname):
-                    if not path.islink(file_path):
-                        archive.write(file_path, arcname, ZIP_DEFLATED)
+                archive = ZipFile(output or path.abspath(output_path), "w")
+
+                def writestr(i, data):
+                    if manifest is not None:
+                        manifest.add_data(i.filename, i.external_attr >> 16, data)
+                    archive.writestr(i, data)
+
+                def writestream(i, size, f):
+                    if manifest is not None:
+                        f = manifest.reader(i.filename, i.external_attr >> 16, size, f)
+                    i.file_size = size
+                    with archive.open(i, "w") as dest:
+                        while size:
+                            chunk = f.read(min(size, GitObjectStore.BUFFER_SIZE))
+                            if not chunk:
+                                raise IOError("{0} ended early".format(i.filename))
+                            dest.write(chunk)
+                            size -= len(chunk)
+
+                def write(file_path, arcname):
+                    # As ZipFile.write, but through writestream.
+                    i = ZipInfo.from_file(file_path, arcname)
+                    if i.is_dir():
+                        archive.write(file_path, arcname)
+                        return
+                    i.compress_type = ZIP_DEFLATED
+                    with open(file_path, "rb") as f:
+                        writestream(i, i.file_size, f)
+
+                def add_file(file_path, arcname, entry=None):
+                    if isinstance(entry, GitBlob):
+                        i, size, f = self.zip_blob(arcname, entry)
+                        if stat.S_ISLNK(i.external_attr >> 16):
+                            writestr(i, f.read(size))
+                        else:
+                            writestream(i, size, f)
+                    elif entry is not None:
+                        if entry.linkname is None and entry.data is None:
+                            write(file_path, arcname)
+                        else:
+                            writestr(*self.zip_entry(arcname, entry))
+                    elif not path.islink(file_path):
+                        write(file_path, arcname)
                     else:
                         i = ZipInfo(arcname)
                         i.create_system = 3
                         i.external_attr = 0xA1ED0000
-                        archive.writestr(i, readlink(file_path))
+                        writestr(i, readlink(file_path))
 
             elif output_format in ["tar", "bz2", "gz", "xz", "tgz", "txz"]:
                 if output_format == "tar":
@@ -166,30 +688,82 @@ class GitArchiver(object):
                 else:
                     t_mode = "w:{0}".format(output_format)
 
-                archive = tarfile.open(path.abspath(output_path), t_mode)
+                archive = tarfile.open(
+                    path.abspath(output_path),
+                    t_mode,
+                    fileobj=output,
+                    copybufsize=GitObjectStore.BUFFER_SIZE,
+                )
 
-                def add_file(file_path, arcname):
-                    archive.add(file_path, arcname)
+                def addfile(info, f=None):
+                    if manifest is not None:
+                        if info.isreg():
+                            f = manifest.reader(
+                                info.name, stat.S_IFREG | info.mode, info.size, f
+                            )
+                        elif info.issym():
+                            manifest.add_data(
+                                info.name,
+                                stat.S_IFLNK | info.mode,
+                                info.linkname.encode("utf-8"),
+                            )
+                        elif info.islnk():
+                            manifest.add_hardlink(info.name, info.linkname)
+                    archive.addfile(info, f)
+
+                def add_file(file_path, arcname, entry=None):
+                    if entry is None:
+                        # As TarFile.add, but through addfile.
+                        info = archive.gettarinfo(file_path, arcname)
+                        if info.isdir():
+                            archive.add(file_path, arcname)
+                        elif not info.isreg():
+                            addfile(info)
+                        else:
+                            with open(file_path, "rb") as f:
+                                addfile(info, f)
+                        return
+                    if isinstance(entry, GitBlob):
+                        addfile(*self.tar_blob(arcname, entry))
+                        return
+                    info = self.tar_entry(arcname, entry, archive.inodes)
+                    if not info.isreg():
+                        addfile(info)
+                    elif entry.data is not None:
+                        addfile(info, io.BytesIO(entry.data))
+                    else:
+                        with open(file_path, "rb") as f:
+                            addfile(info, f)
 
             else:
                 raise RuntimeError("unknown format: {0}".format(output_format))
 
-            def archiver(file_path, arcname):
+            def archiver(file_path, arcname, entry=None):
                 self.LOG.debug("Compressing {0} => {1}...".format(file_path, arcname))
-                add_file(file_path, arcname)
+                add_file(file_path, arcname, entry)
 
         else:
             archive = None
 
-            def archiver(file_path, arcname):
+            def archiver(file_path, arcname, entry=None):
                 self.LOG.info("{0} => {1}".format(file_path, arcname))
 
-        self.archive_all_files(archiver)
-
-        if archive is not None:
-            archive.close()
-
-    def get_exclude_patterns(self, repo_abspath, repo_file_paths):
+        try:
+            self.archive_all_files(archiver)
+        finally:
+            if archive is not None:
+                archive.close()
+            if output is not None:
+                output.close()
+
+        if manifest is not None:
+            manifest_path = output_path + ArchiveManifest.SUFFIXES[self.manifest]
+            self.LOG.debug("Writing manifest {0}...".format(manifest_path))
+            manifest.write(manifest_path)
+
+    def get_exclude_patterns(
+        self, repo_abspath, repo_file_paths, read_file=None, git_dir=None
+    ):
         """
         Returns exclude patterns for a given repo. It looks for .gitattributes files in
         repo_file_paths.
@@ -201,9 +775,17 @@ class GitArchiver(object):
         @param repo_abspath: Absolute path to the git repository.
         @type repo_abspath: str
 
-        @param repo_file_paths: List of paths relative to the repo_abspath that are
-            under git control.
-        @type repo_file_paths:  list
+        @param repo_file_paths: Paths relative to the repo_abspath that are under
+            git control. Only .gitattributes files are used.
+        @type repo_file_paths:  Iterable
+
+        @param read_file: Callable returning the content of one of
+            repo_file_paths. By default files are read from the working tree.
+        @type read_file: Callable
+
+        @param git_dir: Git directory of the repository, for info/attributes.
+            Defaults to repo_abspath/.git.
+        @type git_dir: str
 
         @return: Dictionary representing exclude patterns.
             Keys are tuples of strings. Values are lists of strings.
@@ -213,41 +795,51 @@ class GitArchiver(object):
         if not self.exclude:
             return None
 
+        def parse_attributes(attributes):
+            patterns = []
+            for line in attributes:
+                tokens = line.strip().split()
+                if "export-ignore" in tokens[1:]:
+                    patterns.append(tokens[0])
+            return patterns
+
         def read_attributes(attributes_abspath):
             patterns = []
             if path.isfile(attributes_abspath):
                 attributes = open(attributes_abspath, "r").readlines()
-                patterns = []
-                for line in attributes:
-                    tokens = line.strip().split()
-                    if "export-ignore" in tokens[1:]:
-                        patterns.append(tokens[0])
+                patterns = parse_attributes(attributes)
             return patterns
 
         exclude_patterns = {(): []}
 
         # There may be no gitattributes.
         try:
-            global_attributes_abspath = self.run_git_shell(
-                "git config --get core.attributesfile", repo_abspath
+            global_attributes_abspath = self.run_git(
+                ["config", "--get", "core.attributesfile"],
+                git_dir or repo_abspath,
+                quiet=True,
             ).rstrip()
             exclude_patterns[()] = read_attributes(global_attributes_abspath)
         except Exception:
             # And it's valid to not have them.
             pass
 
-        for attributes_abspath in [
-            path.join(repo_abspath, f)
-            for f in repo_file_paths
-            if f.endswith(".gitattributes")
-        ]:
+        for f in repo_file_paths:
+            if not f.endswith(".gitattributes"):
+                continue
+            attributes_abspath = path.join(repo_abspath, f)
             # Each .gitattributes affects only files within its directory.
             key = tuple(
                 self.get_path_components(repo_abspath, path.dirname(attributes_abspath))
             )
-            exclude_patterns[key] = read_attributes(attributes_abspath)
+            if read_file is None:
+                exclude_patterns[key] = read_attributes(attributes_abspath)
+            else:
+                exclude_patterns[key] = parse_attributes(read_file(f).splitlines())
 
-        local_attributes_abspath = path.join(repo_abspath, ".git", "info", "attributes")
+        if git_dir is None:
+            git_dir = path.join(repo_abspath, ".git")
+        local_attributes_abspath = path.join(git_dir, "info", "attributes")
         key = tuple(self.get_path_components(repo_abspath, repo_abspath))
 
         if key in exclude_patterns:
@@ -261,6 +853,10 @@ class GitArchiver(object):
         """
         Checks whether file at a given path is excluded.
 
+        walk_git_files passes an ExcludeMatcher compiled once per repository,
+        which classifies each file in a single pass over its path, or a
+        GitAttributeExcludes with check_attr.
+
         @param repo_abspath: Absolute path to the git repository.
         @type repo_abspath: str
 
@@ -268,16 +864,21 @@ class GitArchiver(object):
         @type repo_file_path: str
 
         @param exclude_patterns: Exclude patterns with format specified for
-            get_exclude_patterns.
-        @type exclude_patterns: dict
+            get_exclude_patterns, their ExcludeMatcher, or a
+            GitAttributeExcludes.
+        @type exclude_patterns: dict or ExcludeMatcher or GitAttributeExcludes
 
         @return: True if file should be excluded. Otherwise False.
         @rtype: bool
         """
-        if exclude_patterns is None or not len(exclude_patterns):
+        if isinstance(exclude_patterns, (ExcludeMatcher, GitAttributeExcludes)):
+            if exclude_patterns.is_excluded(repo_file_path):
+                self.LOG.debug("Excluded by export-ignore: %s", repo_file_path)
+                return True
             return False
 
-        from fnmatch import fnmatch
+        if exclude_patterns is None or not len(exclude_patterns):
+            return False
 
         file_name = path.basename(repo_file_path)
         components = self.get_path_components(
@@ -313,16 +914,237 @@ class GitArchiver(object):
 
         @param archiver: Callable that accepts 2 arguments:
             abspath to file on the system and relative path within archive.
+            With prefetch enabled, a third argument holds the PrefetchedEntry
+            of the file, and with revision, its GitBlob.
         @type archiver: Callable
         """
         for file_path in self.extra:
             archiver(path.abspath(file_path), path.join(self.prefix, file_path))
 
-        for file_path in self.walk_git_files():
-            archiver(
+        if self.revision is not None:
+            base_blobs = None
+            if self.base_revision is not None:
+                base_blobs = dict(
+                    (file_path, (blob.sha, blob.mode))
+                    for file_path, blob in self.walk_git_revision(self.base_revision)
+                )
+
+            for file_path, blob in self.walk_git_revision(self.revision):
+                if base_blobs is not None:
+                    if base_blobs.pop(file_path, None) == (blob.sha, blob.mode):
+                        continue
+                archiver(
+                    path.join(self.main_repo_abspath, file_path),
+                    path.join(self.prefix, file_path),
+                    blob,
+                )
+
+            if base_blobs is not None:
+                # Files left are the ones revision deletes.
+                self.archive_delta_manifest(
+                    archiver,
+                    [
+                        path.join(self.prefix, file_path)
+                        for file_path in sorted(base_blobs)
+                    ],
+                )
+            return
+
+        files = (
+            (
                 path.join(self.main_repo_abspath, file_path),
                 path.join(self.prefix, file_path),
             )
+            for file_path in self.walk_git_files()
+        )
+        if not self.prefetch:
+            for file_abspath, arcname in files:
+                archiver(file_abspath, arcname)
+            return
+
+        for file_abspath, arcname, entry in self.prefetch_files(files):
+            if entry is not None:
+                archiver(file_abspath, arcname, entry)
+
+    def archive_delta_manifest(self, archiver, deleted):
+        """
+        Archive the DELTA_MANIFEST of a delta archive.
+
+        @param deleted: Names, within the archive, of the files deleted since
+            base_revision.
+        @type deleted: list
+        """
+        import json
+        import tempfile
+
+        manifest = {
+            "base": self.run_git(
+                ["rev-parse", "--verify", self.base_revision], self.main_repo_abspath
+            ).strip(),
+            "revision": self.run_git(
+                ["rev-parse", "--verify", self.revision], self.main_repo_abspath
+            ).strip(),
+            "deleted": deleted,
+        }
+        fd, manifest_abspath = tempfile.mkstemp(suffix=".json")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(manifest, f, indent=1)
+            archiver(manifest_abspath, self.DELTA_MANIFEST)
+        finally:
+            os.remove(manifest_abspath)
+
+    def prefetch_files(self, files):
+        """
+        Read files ahead of the archive writer with self.prefetch threads.
+
+        While the writer compresses one file, the following ones are stat'ed and
+        read concurrently, so archiving is bound by compression rather than by
+        file system latency. Results are yielded in the order of files, and at
+        most 4 files per thread are held in memory.
+
+        @param files: Iterable of (abspath, arcname) tuples.
+        @type files: Iterable
+
+        @return: Iterator of (abspath, arcname, entry) tuples, entry being a
+            PrefetchedEntry, or None for directories (e.g. uninitialized
+            submodules), which are not archived.
+        @rtype: Iterable
+        """
+        from collections import deque
+        from concurrent.futures import ThreadPoolExecutor
+
+        window = deque()
+        with ThreadPoolExecutor(max_workers=self.prefetch) as pool:
+            for file_abspath, arcname in files:
+                future = pool.submit(self.read_entry, file_abspath)
+                window.append((file_abspath, arcname, future))
+                if len(window) >= 4 * self.prefetch:
+                    file_abspath, arcname, future = window.popleft()
+                    yield file_abspath, arcname, future.result()
+            while window:
+                file_abspath, arcname, future = window.popleft()
+                yield file_abspath, arcname, future.result()
+
+    def read_entry(self, file_abspath):
+        """
+        Stat and read a file for the prefetch pipeline.
+
+        @return: PrefetchedEntry, or None if file_abspath is a directory.
+        @rtype: PrefetchedEntry
+        """
+        st = os.lstat(file_abspath)
+        if stat.S_ISDIR(st.st_mode):
+            return None
+        if stat.S_ISLNK(st.st_mode):
+            return PrefetchedEntry(st, linkname=readlink(file_abspath))
+        if st.st_size > self.PREFETCH_MAX_SIZE:
+            return PrefetchedEntry(st)
+        with open(file_abspath, "rb") as f:
+            return PrefetchedEntry(st, data=f.read())
+
+    def tar_entry(self, arcname, entry, inodes):
+        """
+        TarInfo for a prefetched file, as tarfile.gettarinfo would build it but
+        without stat'ing the file again.
+
+        @param inodes: The inodes dictionary of the TarFile. As with
+            gettarinfo, a file whose inode was already archived under another
+            name becomes a hard link to it.
+        @type inodes: dict
+        """
+        st = entry.stat
+        info = tarfile.TarInfo(arcname)
+        info.mode = stat.S_IMODE(st.st_mode)
+        info.uid = st.st_uid
+        info.gid = st.st_gid
+        info.uname, info.gname = self.owner_names(st.st_uid, st.st_gid)
+        info.mtime = st.st_mtime
+        inode = (st.st_ino, st.st_dev)
+        if entry.linkname is not None:
+            info.type = tarfile.SYMTYPE
+            info.linkname = entry.linkname
+        elif st.st_nlink > 1 and inode in inodes and arcname != inodes[inode]:
+            info.type = tarfile.LNKTYPE
+            info.linkname = inodes[inode]
+        else:
+            info.type = tarfile.REGTYPE
+            info.size = st.st_size
+            if inode[0]:
+                inodes[inode] = arcname
+        return info
+
+    def zip_entry(self, arcname, entry):
+        """
+        (ZipInfo, data) for a prefetched symlink or in-memory regular file.
+        """
+        if entry.linkname is not None:
+            i = ZipInfo(arcname)
+            i.create_system = 3
+            i.external_attr = 0xA1ED0000
+            return i, entry.linkname
+        i = ZipInfo(arcname, time.localtime(entry.stat.st_mtime)[:6])
+        i.external_attr = (entry.stat.st_mode & 0xFFFF) << 16
+        i.compress_type = ZIP_DEFLATED
+        return i, entry.data
+
+    def tar_blob(self, arcname, blob):
+        """
+        (TarInfo, file object) for a GitBlob, owned by root as with git archive.
+        The file object streams the blob from cat-file.
+        """
+        size, f = blob.store.open_blob(blob.sha)
+        info = tarfile.TarInfo(arcname)
+        info.uname = info.gname = "root"
+        info.mtime = blob.mtime
+        if blob.mode == "120000":
+            info.type = tarfile.SYMTYPE
+            info.mode = 0o777
+            info.linkname = f.read(size).decode("utf-8")
+            return info, None
+        info.mode = 0o755 if blob.mode == "100755" else 0o644
+        info.size = size
+        return info, f
+
+    def zip_blob(self, arcname, blob):
+        """
+        (ZipInfo, size, file object) for a GitBlob. The file object streams the
+        blob (the target of a symlink) from cat-file.
+        """
+        size, f = blob.store.open_blob(blob.sha)
+        if blob.mode == "120000":
+            i = ZipInfo(arcname)
+            i.create_system = 3
+            i.external_attr = 0xA1ED0000
+            return i, size, f
+        i = ZipInfo(arcname, time.localtime(blob.mtime)[:6])
+        i.external_attr = (0o100755 if blob.mode == "100755" else 0o100644) << 16
+        i.compress_type = ZIP_DEFLATED
+        return i, size, f
+
+    def owner_names(self, uid, gid):
+        """
+        Cached (user name, group name) of uid and gid, "" when unknown.
+        """
+        key = (uid, gid)
+        if key not in self._owner_names:
+            uname = gname = ""
+            try:
+                import grp
+                import pwd
+            except ImportError:
+                pass
+            else:
+                try:
+                    uname = pwd.getpwuid(uid)[0]
+                except KeyError:
+                    pass
+                try:
+                    gname = grp.getgrgid(gid)[0]
+                except KeyError:
+                    pass
+            self._owner_names[key] = (uname, gname)
+        return self._owner_names[key]
 
     def walk_git_files(self, repo_path=""):
         """
@@ -341,37 +1163,266 @@ class GitArchiver(object):
             main_repo_abspath.
         @rtype: Iterable
         """
-        repo_abspath = path.join(self.main_repo_abspath, repo_path)
-        repo_file_paths = self.run_git_shell(
-            "git ls-files --cached --full-name --no-empty-directory", repo_abspath
-        ).splitlines()
-        exclude_patterns = self.get_exclude_patterns(repo_abspath, repo_file_paths)
+        if self.jobs > 1:
+            return self.walk_git_files_concurrently(repo_path)
+        return self.walk_git_files_serially(repo_path)
 
-        for repo_file_path in repo_file_paths:
-            # Git puts path in quotes if file path has unicode characters.
-            repo_file_path = repo_file_path.strip(
-                '"'
-            )  # file path relative to current repo
-            repo_file_abspath = path.join(
-                repo_abspath, repo_file_path
-            )  # absolute file path
-            main_repo_file_path = path.join(
-                repo_path, repo_file_path
-            )  # file path relative to the main repo
+    def walk_git_files_serially(self, repo_path):
+        """
+        walk_git_files listing one repository at a time.
+        """
+        file_paths, exclude_patterns, submodule_paths = self.list_git_repo(repo_path)
+        for file_path in file_paths:
+            yield file_path
+
+        for submodule_path in submodule_paths:
+            for submodule_file_path in self.walk_git_files_serially(
+                path.join(repo_path, submodule_path)
+            ):
+                if self.is_submodule_file_excluded(
+                    repo_path, submodule_file_path, exclude_patterns
+                ):
+                    continue
+
+                yield submodule_file_path
+
+    def walk_git_files_concurrently(self, repo_path):
+        """
+        walk_git_files listing repositories with self.jobs threads.
+
+        Each listing submits the listings of its submodules as soon as it is
+        done, so the whole submodule tree is listed (and with force_sub,
+        initialized) in parallel, while files are yielded in the order of the
+        serial traversal: the files of a repository, then its submodules in
+        .gitmodules order.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        def list_repo(repo_path):
+            file_paths, exclude_patterns, submodule_paths = self.list_git_repo(
+                repo_path
+            )
+            file_paths = list(file_paths)
+            submodules = [
+                pool.submit(list_repo, path.join(repo_path, submodule_path))
+                for submodule_path in submodule_paths
+            ]
+            return repo_path, file_paths, exclude_patterns, submodules
+
+        def merge(listing):
+            repo_path, file_paths, exclude_patterns, submodules = listing.result()
+            for file_path in file_paths:
+                yield file_path
+
+            for submodule in submodules:
+                for submodule_file_path in merge(submodule):
+                    if self.is_submodule_file_excluded(
+                        repo_path, submodule_file_path, exclude_patterns
+                    ):
+                        continue
+
+                    yield submodule_file_path
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            for file_path in merge(pool.submit(list_repo, repo_path)):
+                yield file_path
+
+    def walk_git_revision(self, revision):
+        """
+        An iterator method that yields (file path relative to main_repo_abspath,
+        GitBlob) for each file of revision that should be included in the
+        archive, with submodules, reading only the object databases.
+
+        Git processes are closed once the iteration is done.
+        """
+        git_dir = path.abspath(
+            self.run_git(
+                ["rev-parse", "--absolute-git-dir"], self.main_repo_abspath
+            ).rstrip()
+        )
+        store = GitObjectStore(git_dir)
+        try:
+            mtime = int(store.git("show", "-s", "--format=%ct", revision + "^{commit}"))
+        except CalledProcessError:
+            # A tree has no commit time: git archive uses the current time.
+            mtime = int(time.time())
+
+        # In a bare repository, main_repo_abspath is the git directory.
+        worktree_abspath = self.main_repo_abspath
+        if git_dir == self.main_repo_abspath:
+            worktree_abspath = None
+
+        stores = [store]
+        try:
+            for file_path, blob in self.walk_git_objects(
+                stores, store, revision, mtime, "", worktree_abspath
+            ):
+                yield file_path, blob
+        finally:
+            for store in stores:
+                store.close()
+
+    def walk_git_objects(
+        self, stores, store, revision, mtime, repo_path, worktree_abspath
+    ):
+        """
+        walk_git_revision for the repository at repo_path.
 
-            # Only list symlinks and files.
-            if not path.islink(repo_file_abspath) and path.isdir(repo_file_abspath):
+        @param stores: List to which the GitObjectStore of each submodule is
+            appended, so it can be closed.
+        @type stores: list
+
+        @param worktree_abspath: Working tree of the repository, if any. It is
+            only used to find the repositories of submodules.
+        @type worktree_abspath: str
+        """
+        entries = list(store.list_tree(revision))
+        exclude_patterns = None
+        if self.exclude:
+            attributes = dict(
+                (file_path, sha)
+                for mode, type_, sha, file_path in entries
+                if type_ == "blob" and file_path.endswith(".gitattributes")
+            )
+            exclude_patterns = ExcludeMatcher(
+                self.get_exclude_patterns(
+                    path.join(self.main_repo_abspath, repo_path),
+                    list(attributes),
+                    read_file=lambda f: store.read_blob(attributes[f]).decode("utf-8"),
+                    git_dir=store.git_dir,
+                )
+            )
+
+        submodules = []
+        for mode, type_, sha, repo_file_path in entries:
+            if self.is_file_excluded(
+                path.join(self.main_repo_abspath, repo_path),
+                repo_file_path,
+                exclude_patterns,
+            ):
                 continue
+            if type_ == "commit":
+                submodules.append((repo_file_path, sha))
+            elif type_ == "blob":
+                yield (
+                    path.join(repo_path, repo_file_path),
+                    GitBlob(store, sha, mode, mtime),
+                )
 
-            if self.is_file_excluded(repo_abspath, repo_file_path, exclude_patterns):
+        if not submodules:
+            return
+
+        names = {}
+        try:
+            output = store.git(
+                "config",
+                "-z",
+                "--blob",
+                "{0}:.gitmodules".format(revision),
+                "--get-regexp",
+                r"^submodule\..*\.path$",
+            )
+        except CalledProcessError:
+            output = b""
+        for record in output.decode("utf-8").split("\0"):
+            if record:
+                key, submodule_path = record.split("\n", 1)
+                names[submodule_path] = key[len("submodule.") : -len(".path")]
+
+        for submodule_path, sha in submodules:
+            submodule_worktree = None
+            if worktree_abspath is not None:
+                submodule_worktree = path.join(worktree_abspath, submodule_path)
+            # The repository of a submodule is usually absorbed in the git
+            # directory of its parent, which works without a checkout.
+            git_dirs = [
+                path.join(
+                    store.git_dir, "modules", names.get(submodule_path, submodule_path)
+                )
+            ]
+            if submodule_worktree is not None and path.isdir(submodule_worktree):
+                try:
+                    git_dirs.append(
+                        self.run_git(
+                            ["rev-parse", "--absolute-git-dir"],
+                            submodule_worktree,
+                            quiet=True,
+                        ).rstrip()
+                    )
+                except CalledProcessError:
+                    pass
+
+            submodule_store = None
+            for git_dir in git_dirs:
+                if not path.isdir(git_dir):
+                    continue
+                submodule_store = GitObjectStore(path.abspath(git_dir))
+                if submodule_store.has_commit(sha):
+                    break
+                submodule_store = None
+
+            if submodule_store is None:
+                self.LOG.warning(
+                    "Skipping submodule {0}: commit {1} is not available".format(
+                        path.join(repo_path, submodule_path), sha
+                    )
+                )
                 continue
 
-            yield main_repo_file_path
+            stores.append(submodule_store)
+            for submodule_file_path, blob in self.walk_git_objects(
+                stores,
+                submodule_store,
+                sha,
+                mtime,
+                path.join(repo_path, submodule_path),
+                submodule_worktree,
+            ):
+                if self.is_submodule_file_excluded(
+                    repo_path, submodule_file_path, exclude_patterns
+                ):
+                    continue
+
+                yield submodule_file_path, blob
+
+    def list_git_repo(self, repo_path):
+        """
+        List the files of a single repository, without its submodules.
+
+        With force_sub, submodules of the repository are initialized and updated.
+
+        @param repo_path: Path to the git repository relative to
+            main_repo_abspath.
+        @type repo_path: str
+
+        @return: (iterator over the file paths relative to main_repo_abspath
+            that should be included, exclude patterns of the repository, paths
+            of the submodules that are not excluded, relative to the repository)
+        @rtype: tuple
+        """
+        repo_abspath = path.join(self.main_repo_abspath, repo_path)
+        ls_files = ["ls-files", "-z", "--cached", "--full-name", "--no-empty-directory"]
+        if self.exclude and self.check_attr:
+            exclude_patterns = GitAttributeExcludes(
+                repo_abspath, self.stream_git(ls_files, repo_abspath)
+            )
+        else:
+            # Only .gitattributes are needed up front: the listing of all files
+            # is streamed afterwards.
+            exclude_patterns = self.get_exclude_patterns(
+                repo_abspath,
+                self.stream_git(
+                    ls_files + ["--", ":(glob)**/.gitattributes"], repo_abspath
+                ),
+            )
+            if exclude_patterns:
+                exclude_patterns = ExcludeMatcher(exclude_patterns)
 
         if self.force_sub:
-            self.run_git_shell("git submodule init", repo_abspath)
-            self.run_git_shell("git submodule update", repo_abspath)
+            self.run_git(["submodule", "init"], repo_abspath)
+            self.run_git(["submodule", "update"], repo_abspath)
 
+        submodule_paths = []
         try:
             repo_gitmodules_abspath = path.join(repo_abspath, ".gitmodules")
 
@@ -383,26 +1434,68 @@ class GitArchiver(object):
 
                 if m:
                     submodule_path = m.group(1)
-                    submodule_abspath = path.join(repo_path, submodule_path)
 
                     if self.is_file_excluded(
                         repo_abspath, submodule_path, exclude_patterns
                     ):
                         continue
 
-                    for submodule_file_path in self.walk_git_files(submodule_abspath):
-                        rel_file_path = submodule_file_path.replace(
-                            repo_path, "", 1
-                        ).strip("/")
-                        if self.is_file_excluded(
-                            repo_abspath, rel_file_path, exclude_patterns
-                        ):
-                            continue
-
-                        yield submodule_file_path
+                    submodule_paths.append(submodule_path)
         except IOError:
             pass
 
+        file_paths = self.iter_repo_files(
+            repo_path, self.stream_git(ls_files, repo_abspath), exclude_patterns
+        )
+        return file_paths, exclude_patterns, submodule_paths
+
+    def iter_repo_files(self, repo_path, repo_file_paths, exclude_patterns):
+        """
+        Filters the paths listed by git ls-files in the repository at repo_path.
+
+        @return: Iterator over the file paths relative to main_repo_abspath that
+            should be included.
+        @rtype: Iterable
+        """
+        repo_abspath = path.join(self.main_repo_abspath, repo_path)
+        for repo_file_path in repo_file_paths:
+            # file path relative to current repo
+            repo_file_abspath = path.join(
+                repo_abspath, repo_file_path
+            )  # absolute file path
+            main_repo_file_path = path.join(
+                repo_path, repo_file_path
+            )  # file path relative to the main repo
+
+            # Only list symlinks and files. The prefetch pipeline stats files
+            # in its worker threads and drops directories itself.
+            if (
+                not self.prefetch
+                and not path.islink(repo_file_abspath)
+                and path.isdir(repo_file_abspath)
+            ):
+                continue
+
+            if self.is_file_excluded(repo_abspath, repo_file_path, exclude_patterns):
+                continue
+
+            yield main_repo_file_path
+
+    def is_submodule_file_excluded(self, repo_path, file_path, exclude_patterns):
+        """
+        Checks whether a file of a submodule is excluded by the patterns of the
+        repository at repo_path.
+
+        @param file_path: Path of the file relative to main_repo_abspath.
+        @type file_path: str
+        """
+        rel_file_path = file_path.replace(repo_path, "", 1).strip("/")
+        return self.is_file_excluded(
+            path.join(self.main_repo_abspath, repo_path),
+            rel_file_path,
+            exclude_patterns,
+        )
+
     @staticmethod
     def get_path_components(repo_abspath, abspath):
         """
@@ -454,38 +1547,151 @@ class GitArchiver(object):
         return components
 
     @staticmethod
-    def run_git_shell(cmd, cwd=None):
+    def run_git(args, cwd=None, quiet=False):
         """
-        Runs git shell command, reads output and decodes it into unicode string.
+        Runs git with args, without a shell, and decodes its output.
 
-        @param cmd: Command to be executed.
-        @type cmd: str
+        @param args: Arguments of git.
+        @type args: list
 
         @type cwd: str
         @param cwd: Working directory.
 
+        @param quiet: Capture the error output of git instead of printing it,
+            for commands that are allowed to fail.
+        @type quiet: bool
+
         @rtype: str
         @return: Output of the command.
 
         @raise CalledProcessError:  Raises exception if return code of the command is
             non-zero.
         """
-        p = Popen(cmd, shell=True, stdout=PIPE, cwd=cwd)
-        output, _ = p.communicate()
-        output = (
-            output.decode("unicode_escape").encode("raw_unicode_escape").decode("utf-8")
-        )
+        cmd = ["git"] + list(args)
+        p = Popen(cmd, stdout=PIPE, stderr=PIPE if quiet else None, cwd=cwd)
+        output, error = p.communicate()
+        output = os.fsdecode(output)
 
         if p.returncode:
-            if sys.version_info > (2, 6):
-                raise CalledProcessError(
-                    returncode=p.returncode, cmd=cmd, output=output
-                )
-            else:
-                raise CalledProcessError(returncode=p.returncode, cmd=cmd)
+            raise CalledProcessError(
+                returncode=p.returncode, cmd=" ".join(cmd), output=output, stderr=error
+            )
 
         return output
 
+    @staticmethod
+    def stream_git(args, cwd=None):
+        """
+        Runs git with args, which must include -z, and yields the NUL-separated
+        records of its output as they are read. Memory stays bounded by the
+        longest record rather than by the size of the whole output, and each
+        record is decoded once (os.fsdecode: git does not quote paths with -z).
+
+        @param args: Arguments of git.
+        @type args: list
+
+        @type cwd: str
+        @param cwd: Working directory.
+
+        @rtype: Iterable
+        @return: Iterator over the records.
+
+        @raise CalledProcessError: Raises exception once all records are read if
+            return code of the command is non-zero.
+        """
+        cmd = ["git"] + list(args)
+        p = Popen(cmd, stdout=PIPE, cwd=cwd)
+        try:
+            tail = b""
+            for chunk in iter(lambda: p.stdout.read(64 * 1024), b""):
+                records = (tail + chunk).split(b"\0")
+                tail = records.pop()
+                for record in records:
+                    yield os.fsdecode(record)
+            if tail:
+                yield os.fsdecode(tail)
+        finally:
+            # Closing early (e.g. on errors of the consumer) ends git by SIGPIPE.
+            p.stdout.close()
+            returncode = p.wait()
+
+        if returncode:
+            raise CalledProcessError(returncode=returncode, cmd=" ".join(cmd))
+
+    @staticmethod
+    def run_git_shell(cmd, cwd=None):
+        """
+        Runs git shell command, reads output and decodes it into unicode string.
+
+        Kept for compatibility: cmd is split with shlex and run by run_git, no
+        shell is involved.
+
+        @param cmd: Command to be executed, starting with "git".
+        @type cmd: str
+        """
+        import shlex
+
+        return GitArchiver.run_git(shlex.split(cmd)[1:], cwd)
+
+
+def apply_delta_archives(archive_paths, directory):
+    """
+    Reconstruct a tree from a full archive followed by delta archives of
+    GitArchiver (see base_revision), applied in order: the files of each
+    archive are extracted into directory, then the files its DELTA_MANIFEST
+    lists are removed, along with the directories this leaves empty.
+
+    All archives should be created with the same prefix.
+
+    @param archive_paths: Paths to tar (possibly compressed) or zip archives.
+    @type archive_paths: list
+
+    @param directory: Directory to extract the archives to.
+    @type directory: str
+    """
+    import json
+
+    directory = path.abspath(directory)
+    manifest_name = GitArchiver.DELTA_MANIFEST
+    for archive_path in archive_paths:
+        manifest = None
+        if is_zipfile(archive_path):
+            with ZipFile(archive_path) as archive:
+                names = archive.namelist()
+                if manifest_name in names:
+                    manifest = archive.read(manifest_name)
+                archive.extractall(directory, [n for n in names if n != manifest_name])
+        else:
+            with tarfile.open(archive_path) as archive:
+                members = []
+                for member in archive.getmembers():
+                    if member.name == manifest_name:
+                        manifest = archive.extractfile(member).read()
+                    else:
+                        members.append(member)
+                if hasattr(tarfile, "tar_filter"):
+                    archive.extractall(directory, members, filter="tar")
+                else:
+                    archive.extractall(directory, members)
+
+        if manifest is None:
+            continue
+
+        for arcname in json.loads(manifest.decode("utf-8"))["deleted"]:
+            file_abspath = path.normpath(path.join(directory, arcname))
+            if path.commonpath([directory, file_abspath]) != directory:
+                raise ValueError(
+                    "{0} deletes {1}, outside of {2}".format(
+                        archive_path, arcname, directory
+                    )
+                )
+            if path.lexists(file_abspath):
+                os.remove(file_abspath)
+            parent = path.dirname(file_abspath)
+            while parent != directory and path.isdir(parent) and not os.listdir(parent):
+                os.rmdir(parent)
+                parent = path.dirname(parent)
+
 
 def main():
     from optparse import OptionParser
@@ -522,6 +1728,15 @@ def main():
         help="don't read .gitattributes for patterns containing export-ignore attrib",
     )
 
+    parser.add_option(
+        "--check-attr",
+        action="store_true",
+        dest="check_attr",
+        default=False,
+        help="let git check-attr evaluate export-ignore (exact .gitattributes"
+        " semantics, including macros and negation)",
+    )
+
     parser.add_option(
         "--force-submodules",
         action="store_true",
@@ -538,6 +1753,66 @@ def main():
         help="any additional files to include in the archive",
     )
 
+    parser.add_option(
+        "--prefetch",
+        type="int",
+        dest="prefetch",
+        default=0,
+        metavar="JOBS",
+        help="read files ahead of the archive writer with JOBS threads"
+        " (default: 0, disabled)",
+    )
+
+    parser.add_option(
+        "--revision",
+        type="string",
+        dest="revision",
+        default=None,
+        metavar="REV",
+        help="archive REV from the object database instead of the working tree"
+        " (works in bare repositories)",
+    )
+
+    parser.add_option(
+        "--base",
+        type="string",
+        dest="base_revision",
+        default=None,
+        metavar="REV",
+        help="archive only the files changed since REV (in --revision, default"
+        " HEAD), with a manifest of the deleted ones",
+    )
+
+    parser.add_option(
+        "--apply-delta",
+        action="append",
+        dest="apply_delta",
+        default=[],
+        metavar="ARCHIVE",
+        help="extract ARCHIVE into OUTPUT_FILE, a directory, and remove the files"
+        " it deletes if it is a delta archive; repeat for a full archive followed"
+        " by its deltas",
+    )
+
+    parser.add_option(
+        "--manifest",
+        type="choice",
+        choices=sorted(ArchiveManifest.SUFFIXES),
+        dest="manifest",
+        default=None,
+        metavar="FORMAT",
+        help="write the size, mode and SHA-256 of the archived files next to"
+        " OUTPUT_FILE, as json or sha256sums",
+    )
+
+    parser.add_option(
+        "--jobs",
+        type="int",
+        dest="jobs",
+        default=1,
+        help="list and initialize submodules with JOBS threads (default: 1)",
+    )
+
     parser.add_option(
         "--dry-run",
         action="store_true",
@@ -552,6 +1827,13 @@ def main():
 
     output_file_path = args[0]
 
+    if options.apply_delta:
+        try:
+            apply_delta_archives(options.apply_delta, output_file_path)
+        except Exception as e:
+            parser.exit(2, "{0}\n".format(e))
+        sys.exit(0)
+
     if path.isdir(output_file_path):
         parser.error("You cannot use directory as output")
 
@@ -590,7 +1872,16 @@ def main():
         GitArchiver.LOG.addHandler(handler)
         GitArchiver.LOG.setLevel(logging.DEBUG if options.verbose else logging.INFO)
         archiver = GitArchiver(
-            options.prefix, options.exclude, options.force_sub, options.extra
+            options.prefix,
+            options.exclude,
+            options.force_sub,
+            options.extra,
+            prefetch=options.prefetch,
+            check_attr=options.check_attr,
+            jobs=options.jobs,
+            revision=options.revision,
+            base_revision=options.base_revision,
+            manifest=options.manifest,
         )
         archiver.create(output_file_path, options.dry_run)
     except Exception as e:
@@ -1,10 +1,13 @@
 from typing import Optional, Callable, Iterator, Iterable, List, Set, Mapping, Tuple, Any, Dict
 from functools import cmp_to_key
 import ast
+import hashlib
+import heapq
 import warnings
 import importlib
 import itertools
 import inspect
+import keyword
 import logging
 import platform
 import sys
@@ -14,29 +17,54 @@ from argparse import ArgumentParser
 
 logger = logging.getLogger(__name__)
 
-_visited_objects = []
 
-# A list of function docstring pre-processing hooks
-function_docstring_preprocessing_hooks: List[Callable[[str], str]] = []
+class VisitedObjects(object):
+    """
+    Objects already parsed, keyed by id(), along with memoized
+    inspect.getmembers and inspect.getmro results.
 
-PYBIND11_STUBGEN_ADD_DLL_DIRECTORY_NAME = "PYBIND11_STUBGEN_ADD_DLL_DIRECTORY"
+    Objects are kept referenced so their ids are not reused while the registry
+    lives. Membership tests and append are O(1), as opposed to a list.
+    """
 
+    def __init__(self):
+        self.objects = {}  # type: Dict[int, Any]
+        self.members = {}  # type: Dict[int, Tuple[Any, List[Tuple[str, Any]], Dict[str, Any]]]
+        self.mros = {}  # type: Dict[int, Tuple[type, Tuple[type, ...]]]
 
-class DirectoryWalkerGuard(object):
+    def __contains__(self, obj):
+        return id(obj) in self.objects
 
-    def __init__(self, dirname):
-        self.dirname = dirname
+    def __len__(self):
+        return len(self.objects)
 
-    def __enter__(self):
-        if not os.path.exists(self.dirname):
-            os.mkdir(self.dirname)
+    def append(self, obj):
+        self.objects[id(obj)] = obj
 
-        assert os.path.isdir(self.dirname)
+    def getmembers(self, obj):  # type: (Any) -> List[Tuple[str, Any]]
+        key = id(obj)
+        if key not in self.members:
+            members = inspect.getmembers(obj)
+            self.members[key] = (obj, members, dict(members))
+        return self.members[key][1]
 
-        os.chdir(self.dirname)
+    def getmembers_dict(self, obj):  # type: (Any) -> Dict[str, Any]
+        self.getmembers(obj)
+        return self.members[id(obj)][2]
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        os.chdir(os.path.pardir)
+    def getmro(self, klass):  # type: (type) -> Tuple[type, ...]
+        key = id(klass)
+        if key not in self.mros:
+            self.mros[key] = (klass, inspect.getmro(klass))
+        return self.mros[key][1]
+
+
+_visited_objects = VisitedObjects()
+
+# A list of function docstring pre-processing hooks
+function_docstring_preprocessing_hooks: List[Callable[[str], str]] = []
+
+PYBIND11_STUBGEN_ADD_DLL_DIRECTORY_NAME = "PYBIND11_STUBGEN_ADD_DLL_DIRECTORY"
 
 
 _default_pybind11_repr_re = re.compile(r'(<(?P<class>\w+(\.\w+)*) object at 0x[0-9a-fA-F]+>)|'
@@ -55,6 +83,133 @@ def replace_default_pybind11_repr(line):
     return default_reprs, _default_pybind11_repr_re.sub(replacement, line)
 
 
+class SignatureArgument(object):
+    """
+    An argument of a docstring signature: name, type and default value, the
+    latter two being Python expressions as text.
+    """
+
+    def __init__(self, name, type_name, default=None):  # type: (str, str, Optional[str]) -> None
+        self.name = name
+        self.type_name = type_name
+        self.default = default
+
+    def to_string(self):  # type: () -> str
+        if self.default is None:
+            return "{}: {}".format(self.name, self.type_name)
+        return "{}: {} = {}".format(self.name, self.type_name, self.default)
+
+
+# boost::python argument lists, as rendered in docstrings:
+#     ` (Model)model, (Data)data [, (float)prec=1e-12 [, (bool)verbose]]`
+_boost_python_nominal_arg_re = re.compile(r"\s*\((?P<type>[^\W\d][\w.]*)\)(?P<name>[^\W\d]\w*)")
+_boost_python_optional_arg_re = re.compile(
+    r" \[,\s*\((?P<type>[^\W\d][\w.]*)\)(?P<name>[^\W\d]\w*)"
+    r"""(?:=(?P<default>[^\s,\[\]()'"=]+|'[^'\\,\[\]\n]*'|"[^"\\,\[\]\n]*"))?""")
+
+
+def boost_python_arguments(args):  # type: (str) -> Optional[List[SignatureArgument]]
+    """
+    Single-pass parse of a boost::python argument list. Returns None for
+    what it does not recognize (e.g. defaults holding parentheses or commas),
+    left to FunctionSignature.boost_python_arguments_fallback.
+
+    Names are those of the fallback: an argument without default followed by
+    optional ones is suffixed with '_' (`model_`), as the space before `[` is.
+    """
+    arguments = []  # type: List[SignatureArgument]
+    pos = 0
+    while True:
+        m = _boost_python_nominal_arg_re.match(args, pos)
+        if m is None:
+            return None
+        arguments.append(SignatureArgument(m.group("name"), m.group("type")))
+        pos = m.end()
+        if not args.startswith(",", pos):
+            break
+        pos += 1
+
+    n_optional = 0
+    while True:
+        m = _boost_python_optional_arg_re.match(args, pos)
+        if m is None:
+            break
+        if arguments[-1].default is None:
+            arguments[-1].name += "_"
+        arguments.append(SignatureArgument(m.group("name"), m.group("type"), m.group("default")))
+        n_optional += 1
+        pos = m.end()
+
+    if args[pos:] != "]" * n_optional:
+        return None
+    return arguments
+
+
+def _signature_grammar(depth=3):  # type: (int) -> Tuple[Any, Any]
+    """
+    Regular expressions recognizing the subset of Python found in docstring
+    signatures, compiled once: an expression (dotted names, subscripts and
+    lists nested up to depth, numbers, strings, ellipsis), and an argument
+    `*name: expression = expression` followed by a comma or the end.
+
+    They are conservative: what they match is valid Python, anything else
+    (calls, tuples, keywords, escapes, bare `*` or `/`, deeper nesting...) is
+    left to ast.parse to decide.
+    """
+    name = r"(?!(?:{})(?!\w))[A-Za-z_]\w*".format("|".join(keyword.kwlist))
+    first_name = r"(?!(?:{})(?!\w))[A-Za-z_]\w*".format(
+        "|".join(k for k in keyword.kwlist if k not in ("None", "True", "False")))
+    # No leading zeros in integers (`01`), which are invalid
+    number = r"(?:(?:0|[1-9]\d*)(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?"
+    atom = r"""-\s*{number}|{number}|'[^'\\\n]*'|"[^"\\\n]*"|\.\.\.""".format(number=number)
+    dotted_name = r"{}(?:\.{})*".format(first_name, name)
+
+    expression = r"(?:{}|{})".format(atom, dotted_name)
+    for _ in range(depth):
+        # Each item is followed by a comma or the closing bracket
+        items = r"(?:{}\s*(?:,\s*|(?=\])))+".format(expression)
+        expression = r"(?:{atom}|{name}(?:\[\s*{items}\])*|\[\s*(?:{items})?\])".format(
+            atom=atom, name=dotted_name, items=items)
+
+    argument = (r"\s*(?P<star>\*{{0,2}})(?P<name>{name})(?:\s*:\s*{e})?(?P<default>\s*=\s*{e})?"
+                r"\s*(?:,(?!\s*\Z)|\Z)").format(name=name, e=expression)
+
+    return re.compile(r"\s*{}\s*".format(expression), re.ASCII), re.compile(argument, re.ASCII)
+
+
+_signature_expression_re, _signature_argument_re = _signature_grammar()
+
+
+def is_valid_signature(name, args, rtype):  # type: (str, str, str) -> bool
+    """
+    Whether `def name(args) -> rtype: ...` is certainly valid Python, without
+    ast.parse. False means unsure.
+    """
+    if not name.isidentifier() or keyword.iskeyword(name) or not _signature_expression_re.fullmatch(rtype):
+        return False
+    has_default = has_star = has_double_star = False
+    pos = 0
+    end = len(args) if args and not args.isspace() else 0
+    while pos < end:
+        m = _signature_argument_re.match(args, pos)
+        if m is None or has_double_star:
+            return False
+        star = m.group("star")
+        default = m.group("default") is not None
+        if star:
+            if default or (star == "*" and has_star):
+                return False
+            has_star = has_star or star == "*"
+            has_double_star = star == "**"
+        elif not has_star:
+            if has_default and not default:
+                # non-default argument follows default argument
+                return False
+            has_default = default
+        pos = m.end()
+    return True
+
+
 class FunctionSignature(object):
     # When True don't raise an error when invalid signatures/defaultargs are
     # encountered (yes, global variables, blame me)
@@ -63,6 +218,10 @@ class FunctionSignature(object):
 
     signature_downgrade = True
 
+    # When False, signatures are converted and validated the former way only:
+    # boost_python_arguments_fallback and ast.parse (see v2/scripts/bench_pybind11_stubgen.py)
+    use_tokenizer = True
+
     # Number of invalid default values found so far
     n_invalid_default_values = 0
 
@@ -88,68 +247,23 @@ class FunctionSignature(object):
                 for invalid_default in invalid_defaults:
                     logger.log(lvl, "    {}".format(invalid_default))
 
+            arguments = None
             if USE_BOOST_PYTHON:
                 if args:
-                    find_optional_args = re.findall(r'\[(.*?)\]$', args)
-                    optional_args = None
-                    if find_optional_args:
-                        optional_args = find_optional_args[0]
-                    if optional_args:
-                        nominal_args = args.replace("[" + optional_args + "]","")
+                    if FunctionSignature.use_tokenizer:
+                        arguments = boost_python_arguments(args)
+                    if arguments is not None:
+                        args = ", ".join(a.to_string() for a in arguments)
                     else:
-                        nominal_args = args
-
-                    num_nominal_args = 0
-                    if nominal_args:
-                        nominal_args = nominal_args.split(",")
-                        num_nominal_args = len(nominal_args)
-
-                    num_optional_args = 0
-                    if optional_args:
-                        optional_args = optional_args.split("[,")
-                        num_optional_args = len(optional_args)
-                        if num_optional_args > 1:
-                            optional_args[-1] = re.sub(']'*(num_optional_args-1)+'$', '', optional_args[-1]) # Replace at the end
-                    new_args = ""
-
-                    if nominal_args:
-                        for k,arg in enumerate(nominal_args):
-                            type_name = re.findall(r'\((.*?)\)', arg)[0]
-                            arg_name = arg.split(")")[1]
-                            arg_name = arg_name.replace(' ','_')
-
-                            new_args += arg_name + ": " + type_name
-                            if k < num_nominal_args-1:
-                                new_args += ", "
-
-                    if num_optional_args > 0 and num_nominal_args > 0:
-                        new_args += ", "
-
-                    if optional_args and True:
-                        for k,arg in enumerate(optional_args):
-                            # Check for default value
-                            split_arg_equal = arg.split('=',maxsplit=1)
-                            main_arg = split_arg_equal[0]
-                            type_name = re.findall(r'\((.*?)\)', main_arg)[0]
-
-                            arg_name = main_arg.split(")")[1]
-                            arg_name = arg_name.replace(' ','_')
-                            new_args += arg_name + ": " + type_name
-                            optional_value = None
-                            if len(split_arg_equal) > 1:
-                                optional_value = split_arg_equal[1]
-                                new_args += " = " + optional_value
-
-                            if k < num_optional_args-1:
-                                new_args += ", "
-
-                    new_args = new_args.replace(" ,", ",")
-                    self.args = new_args
-                    args = new_args
+                        args = self.boost_python_arguments_fallback(args)
+                    self.args = args
 
                 rtype = rtype.split(" :")[0]
                 self.rtype = rtype
 
+            if FunctionSignature.use_tokenizer and is_valid_signature(self.name, self.args, self.rtype):
+                return
+
             function_def_str = "def {sig.name}({sig.args}) -> {sig.rtype}: ...".format(sig=self)
             try:
                 ast.parse(function_def_str)
@@ -167,6 +281,68 @@ class FunctionSignature(object):
                 logger.log(lvl, function_def_str)
                 logger.log(lvl, " " * (e.offset - 1) + "^-- Invalid syntax")
 
+    @staticmethod
+    def boost_python_arguments_fallback(args):  # type: (str) -> str
+        """
+        Converts any boost::python argument list to Python syntax, splitting
+        it on brackets and commas. Used for what boost_python_arguments does
+        not recognize, e.g. defaults holding parentheses or commas.
+        """
+        find_optional_args = re.findall(r'\[(.*?)\]$', args)
+        optional_args = None
+        if find_optional_args:
+            optional_args = find_optional_args[0]
+        if optional_args:
+            nominal_args = args.replace("[" + optional_args + "]","")
+        else:
+            nominal_args = args
+
+        num_nominal_args = 0
+        if nominal_args:
+            nominal_args = nominal_args.split(",")
+            num_nominal_args = len(nominal_args)
+
+        num_optional_args = 0
+        if optional_args:
+            optional_args = optional_args.split("[,")
+            num_optional_args = len(optional_args)
+            if num_optional_args > 1:
+                optional_args[-1] = re.sub(']'*(num_optional_args-1)+'$', '', optional_args[-1]) # Replace at the end
+        new_args = ""
+
+        if nominal_args:
+            for k,arg in enumerate(nominal_args):
+                type_name = re.findall(r'\((.*?)\)', arg)[0]
+                arg_name = arg.split(")")[1]
+                arg_name = arg_name.replace(' ','_')
+
+                new_args += arg_name + ": " + type_name
+                if k < num_nominal_args-1:
+                    new_args += ", "
+
+        if num_optional_args > 0 and num_nominal_args > 0:
+            new_args += ", "
+
+        if optional_args and True:
+            for k,arg in enumerate(optional_args):
+                # Check for default value
+                split_arg_equal = arg.split('=',maxsplit=1)
+                main_arg = split_arg_equal[0]
+                type_name = re.findall(r'\((.*?)\)', main_arg)[0]
+
+                arg_name = main_arg.split(")")[1]
+                arg_name = arg_name.replace(' ','_')
+                new_args += arg_name + ": " + type_name
+                optional_value = None
+                if len(split_arg_equal) > 1:
+                    optional_value = split_arg_equal[1]
+                    new_args += " = " + optional_value
+
+                if k < num_optional_args-1:
+                    new_args += ", "
+
+        return new_args.replace(" ,", ",")
+
     def __eq__(self, other):
         return isinstance(other, FunctionSignature) and (self.name, self.args, self.rtype) == (
             other.name, other.args, other.rtype)
@@ -639,17 +815,18 @@ class ClassStubsGenerator(StubsGenerator):
             return
         _visited_objects.append(self.klass)
 
-        bases = inspect.getmro(self.klass)[1:]
+        bases = _visited_objects.getmro(self.klass)[1:]
 
         def is_base_member(name, member):
             for base in bases:
-                if hasattr(base, name) and getattr(base, name) is member:
+                base_members = _visited_objects.getmembers_dict(base)
+                if name in base_members and base_members[name] is member:
                     return True
             return False
 
         is_pybind11 = any(base.__name__ == 'pybind11_object' for base in bases)
 
-        for name, member in inspect.getmembers(self.klass):
+        for name, member in _visited_objects.getmembers(self.klass):
             # check if attribute is in __dict__ (fast path) before slower search in base classes
             if name not in self.klass.__dict__ and is_base_member(name, member):
                 continue
@@ -754,7 +931,7 @@ class ModuleStubsGenerator(StubsGenerator):
             return
         _visited_objects.append(self.module)
         logger.debug("Parsing '%s' module" % self.module.__name__)
-        for name, member in inspect.getmembers(self.module):
+        for name, member in _visited_objects.getmembers(self.module):
             if inspect.ismodule(member):
                 m = ModuleStubsGenerator(member)
                 if m.module.__name__.split('.')[:-1] == self.module.__name__.split('.'):
@@ -787,24 +964,38 @@ class ModuleStubsGenerator(StubsGenerator):
                                  self.attributes):
             x.parse()
 
-        def class_ordering(a, b):  # type: (ClassStubsGenerator, ClassStubsGenerator) -> int
-            if a.klass is b.klass:
-                return 0
-            if issubclass(a.klass, b.klass):
-                return -1
-            if issubclass(b.klass, a.klass):
-                return 1
-            return 0
-
         # reorder classes so base classes would be printed before derived
-        # print([ k.klass.__name__ for k in self.classes ])
-        for i in range(len(self.classes)):
-            for j in range(i + 1, len(self.classes)):
-                if class_ordering(self.classes[i], self.classes[j]) < 0:
-                    t = self.classes[i]
-                    self.classes[i] = self.classes[j]
-                    self.classes[j] = t
-        # print( [ k.klass.__name__ for k in self.classes ] )
+        self.classes = self.sort_classes(self.classes)
+
+    @staticmethod
+    def sort_classes(classes):  # type: (List[ClassStubsGenerator]) -> List[ClassStubsGenerator]
+        """
+        Topological sort of classes over their MRO edges, so that every base
+        class comes before the classes deriving from it, whatever the depth of
+        the hierarchy. Ties are broken by class name, then by position, which
+        makes the order deterministic. O((classes + edges) log classes).
+        """
+        index = {id(c.klass): i for i, c in enumerate(classes)}
+        derived = [[] for _ in classes]  # type: List[List[int]]
+        bases_left = [0] * len(classes)
+        for i, c in enumerate(classes):
+            for base in _visited_objects.getmro(c.klass)[1:]:
+                j = index.get(id(base))
+                if j is not None and j != i:
+                    derived[j].append(i)
+                    bases_left[i] += 1
+
+        ready = [(c.klass.__name__, i) for i, c in enumerate(classes) if not bases_left[i]]
+        heapq.heapify(ready)
+        result = []
+        while ready:
+            _, i = heapq.heappop(ready)
+            result.append(classes[i])
+            for k in derived[i]:
+                bases_left[k] -= 1
+                if not bases_left[k]:
+                    heapq.heappush(ready, (classes[k].klass.__name__, k))
+        return result
 
     def get_involved_modules_names(self):
         result = set(self.imported_modules)
@@ -874,20 +1065,32 @@ class ModuleStubsGenerator(StubsGenerator):
     def short_name(self):
         return self.module.__name__.split(".")[-1]
 
-    def write(self):
-        if not os.path.exists(self.short_name + self.stub_suffix):
-            logger.debug("mkdir `%s`" % (self.short_name + self.stub_suffix))
-            os.mkdir(self.short_name + self.stub_suffix)
-
-        with DirectoryWalkerGuard(self.short_name + self.stub_suffix):
-            with open("__init__.pyi", "w", encoding="utf-8") as init_pyi:
-                init_pyi.write("\n".join(self.to_lines()))
-            for m in self.submodules:
-                m.write()
+    def stub_directories(self, directory):  # type: (str) -> List[Tuple[ModuleStubsGenerator, str]]
+        """
+        (module, absolute path of its stubs directory) for this module, whose
+        stubs go to directory, and its submodules, recursively.
+        """
+        module_dir = os.path.join(os.path.abspath(directory), self.short_name + self.stub_suffix)
+        result = [(self, module_dir)]
+        for m in self.submodules:
+            result.extend(m.stub_directories(module_dir))
+        return result
 
-            if self.write_setup_py:
-                with open("setup.py", "w") as setuppy:
-                    setuppy.write("""from setuptools import setup
+    def write(self, directory=os.curdir, jobs=1):
+        """
+        Writes the stubs of the module and its submodules to directory.
+        """
+        write_stubs(self.stub_directories(directory), jobs)
+
+    def write_files(self, module_dir):  # type: (str) -> None
+        """
+        Renders and writes the stubs of this module only, to the existing
+        module_dir.
+        """
+        write_if_changed(os.path.join(module_dir, "__init__.pyi"), "\n".join(self.to_lines()))
+
+        if self.write_setup_py:
+            write_if_changed(os.path.join(module_dir, "setup.py"), """from setuptools import setup
 import os
 
 
@@ -913,14 +1116,150 @@ setup(
 )""".format(package_name=self.short_name))
 
 
-def recursive_mkdir_walker(subdirs, callback):  # type: (List[str], Callable) -> None
-    if len(subdirs) == 0:
-        callback()
+def write_if_changed(path, content):  # type: (str, str) -> bool
+    """
+    Writes content to path unless the file already holds exactly that, so
+    that unchanged stubs keep their modification time. Returns whether the
+    file was written.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == content:
+                return False
+    except (OSError, UnicodeDecodeError):
+        pass
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return True
+
+
+# Stubs being written by write_stubs, inherited by forked workers.
+_stubs_to_write = []  # type: List[Tuple[ModuleStubsGenerator, str]]
+
+
+def _write_stubs_of(i):  # type: (int) -> Tuple[int, int]
+    """
+    Writes the i-th stubs of _stubs_to_write. Returns how much rendering
+    increased FunctionSignature.n_invalid_signatures and n_invalid_default_values,
+    which a forked worker has to report to its parent.
+    """
+    module, module_dir = _stubs_to_write[i]
+    n_invalid_signatures = FunctionSignature.n_invalid_signatures
+    n_invalid_default_values = FunctionSignature.n_invalid_default_values
+    module.write_files(module_dir)
+    return (FunctionSignature.n_invalid_signatures - n_invalid_signatures,
+            FunctionSignature.n_invalid_default_values - n_invalid_default_values)
+
+
+def write_stubs(stub_directories, jobs=1):  # type: (List[Tuple[ModuleStubsGenerator, str]], int) -> None
+    """
+    Renders and writes the stubs of parsed modules to their directories (see
+    ModuleStubsGenerator.stub_directories), with jobs workers.
+
+    Rendering is pure Python, so workers are processes, forked to inherit the
+    parsed modules; threads where fork is not available. Largest modules are
+    started first. Invalid signatures and default values met while rendering
+    in a process are added to the FunctionSignature counters of this one.
+    """
+    global _stubs_to_write
+    for _, module_dir in stub_directories:
+        if not os.path.exists(module_dir):
+            logger.debug("mkdir `%s`" % module_dir)
+            os.mkdir(module_dir)
+
+    if jobs <= 1 or len(stub_directories) <= 1:
+        for module, module_dir in stub_directories:
+            module.write_files(module_dir)
+        return
+
+    import concurrent.futures
+    import multiprocessing
+
+    use_processes = "fork" in multiprocessing.get_all_start_methods()
+    if use_processes:
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs, mp_context=multiprocessing.get_context("fork"))
     else:
-        if not os.path.exists(subdirs[0]):
-            os.mkdir(subdirs[0])
-        with DirectoryWalkerGuard(subdirs[0]):
-            recursive_mkdir_walker(subdirs[1:], callback)
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=jobs)
+
+    order = sorted(range(len(stub_directories)),
+                   key=lambda i: -(len(stub_directories[i][0].classes) + len(stub_directories[i][0].free_functions)))
+    _stubs_to_write = stub_directories
+    try:
+        with executor:
+            for n_invalid_signatures, n_invalid_default_values in executor.map(_write_stubs_of, order):
+                if use_processes:
+                    FunctionSignature.n_invalid_signatures += n_invalid_signatures
+                    FunctionSignature.n_invalid_default_values += n_invalid_default_values
+    finally:
+        _stubs_to_write = []
+
+
+def api_fingerprint(modules, salt=""):  # type: (List[Any], str) -> str
+    """
+    SHA-256 of what the stubs of modules are generated from: names, kinds and
+    docstrings of their members, class bases, attribute values, recursively
+    through classes and submodules. Much cheaper than parsing, since no
+    signature is interpreted. salt is hashed first.
+    """
+    digest = hashlib.sha256(salt.encode("utf-8"))
+    seen = set()  # type: Set[int]
+
+    def feed(*items):
+        for item in items:
+            digest.update(str(item).encode("utf-8", "backslashreplace"))
+            digest.update(b"\0")
+
+    def walk(obj, name):
+        feed("begin", name)
+        if id(obj) in seen:
+            return
+        seen.add(id(obj))
+        if inspect.isclass(obj):
+            feed("bases", *map(StubsGenerator.fully_qualified_name, _visited_objects.getmro(obj)[1:]))
+            members = sorted(vars(obj).items())
+        else:
+            members = _visited_objects.getmembers(obj)
+        for member_name, member in members:
+            if inspect.ismodule(member):
+                if member.__name__.split('.')[:-1] == obj.__name__.split('.'):
+                    walk(member, member_name)
+                else:
+                    feed("module", member_name, member.__name__)
+            elif inspect.isclass(member):
+                feed("class", member_name, member.__module__)
+                walk(member, member_name)
+            elif inspect.isroutine(member):
+                feed("routine", member_name, member.__doc__)
+                if inspect.isfunction(member):
+                    try:
+                        feed(inspect.signature(member))
+                    except (TypeError, ValueError):
+                        pass
+            elif isinstance(member, property):
+                feed("property", member_name, member.__doc__,
+                     getattr(member.fget, "__doc__", None), getattr(member.fset, "__doc__", None),
+                     member.fset is None)
+            else:
+                value = re.sub(r" at 0x[0-9a-fA-F]+>", ">", repr(member))
+                feed("attribute", member_name, StubsGenerator.fully_qualified_name(type(member)), value)
+        feed("end", name)
+
+    for module in modules:
+        walk(module, module.__name__)
+    return digest.hexdigest()
+
+
+def stubs_fingerprint_salt(sys_args):  # type: (Any) -> str
+    """
+    What the stubs depend on besides the modules: this script, the Python
+    version and the options shaping the output.
+    """
+    with open(__file__, "rb") as f:
+        script_digest = hashlib.sha256(f.read()).hexdigest()
+    options = {k: v for k, v in vars(sys_args).items() if k not in ("fingerprint_file", "jobs", "log_level")}
+    return "{}\n{}\n{}".format(script_digest, platform.python_version(), sorted(options.items()))
+
 
 def main(args=None):
     parser = ArgumentParser(prog='pybind11-stubgen', description="Generates stubs for specified modules")
@@ -942,6 +1281,12 @@ def main(args=None):
     parser.add_argument("module_names", nargs="+", metavar="MODULE_NAME", type=str, help="modules names")
     parser.add_argument("--log-level", default="INFO", help="Set output log level")
     parser.add_argument("--boost-python", action="store_true")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of workers rendering and writing (sub)modules stubs, forked processes where "
+                             "available (default: 1)")
+    parser.add_argument("--fingerprint-file", metavar="PATH",
+                        help="file recording a fingerprint of the modules public API; stubs are not regenerated "
+                             "while it matches, only the file is touched")
 
     sys_args = parser.parse_args(args or sys.argv[1:])
 
@@ -993,32 +1338,61 @@ def main(args=None):
         handlers=handlers
     )
 
-    output_path = sys_args.output_dir
+    output_path = os.path.abspath(sys_args.output_dir)
 
     if not os.path.exists(output_path):
         os.mkdir(output_path)
 
-    with DirectoryWalkerGuard(output_path):
-        for _module_name in sys_args.module_names:
-            _module = ModuleStubsGenerator(_module_name)
-            _module.parse()
-            if FunctionSignature.n_fatal_errors() == 0:
-                _module.stub_suffix = sys_args.root_module_suffix
-                _module.write_setup_py = not sys_args.no_setup_py
-                recursive_mkdir_walker(_module_name.split(".")[:-1], lambda: _module.write())
-
-        if FunctionSignature.n_invalid_signatures > 0:
-            logger.info("Useful link: Avoiding C++ types in docstrings:")
-            logger.info("      https://pybind11.readthedocs.io/en/latest/advanced/misc.html"
-                        "#avoiding-cpp-types-in-docstrings")
-
-        if FunctionSignature.n_invalid_default_values > 0:
-            logger.info("Useful link: Default argument representation:")
-            logger.info("      https://pybind11.readthedocs.io/en/latest/advanced/functions.html"
-                        "#default-arguments-revisited")
-
-        if FunctionSignature.n_fatal_errors() > 0:
-            exit(1)
+    fingerprint = None
+    if sys_args.fingerprint_file:
+        fingerprint = api_fingerprint(
+            [importlib.import_module(name) for name in sys_args.module_names],
+            stubs_fingerprint_salt(sys_args))
+        root_stubs = [os.path.join(output_path, *name.split(".")[:-1],
+                                   name.split(".")[-1] + sys_args.root_module_suffix, "__init__.pyi")
+                      for name in sys_args.module_names]
+        try:
+            with open(sys_args.fingerprint_file, encoding="utf-8") as f:
+                up_to_date = f.read().strip() == fingerprint and all(map(os.path.exists, root_stubs))
+        except OSError:
+            up_to_date = False
+        if up_to_date:
+            logger.info("Public API of %s unchanged, stubs are up to date" % ", ".join(sys_args.module_names))
+            os.utime(sys_args.fingerprint_file)
+            return
+        if os.path.exists(sys_args.fingerprint_file):
+            os.remove(sys_args.fingerprint_file)
+
+    # Parse everything first, then render and write all (sub)modules at once.
+    stub_directories = []
+    for _module_name in sys_args.module_names:
+        _module = ModuleStubsGenerator(_module_name)
+        _module.parse()
+        if FunctionSignature.n_fatal_errors() == 0:
+            _module.stub_suffix = sys_args.root_module_suffix
+            _module.write_setup_py = not sys_args.no_setup_py
+            module_parent_dir = os.path.join(output_path, *_module_name.split(".")[:-1])
+            os.makedirs(module_parent_dir, exist_ok=True)
+            stub_directories.extend(_module.stub_directories(module_parent_dir))
+
+    write_stubs(stub_directories, sys_args.jobs)
+
+    if FunctionSignature.n_invalid_signatures > 0:
+        logger.info("Useful link: Avoiding C++ types in docstrings:")
+        logger.info("      https://pybind11.readthedocs.io/en/latest/advanced/misc.html"
+                    "#avoiding-cpp-types-in-docstrings")
+
+    if FunctionSignature.n_invalid_default_values > 0:
+        logger.info("Useful link: Default argument representation:")
+        logger.info("      https://pybind11.readthedocs.io/en/latest/advanced/functions.html"
+                    "#default-arguments-revisited")
+
+    if FunctionSignature.n_fatal_errors() > 0:
+        exit(1)
+
+    if fingerprint is not None:
+        with open(sys_args.fingerprint_file, "w", encoding="utf-8") as f:
+            f.write(fingerprint + "\n")
 
 
 if __name__ == "__main__":
@@ -4740,6 +4740,9 @@ jrl_boostpy_add_stubs(
 
 ### Description
   Generates Boost.Python stubs for the given module using the pybind11-stubgen fork included in this repo.
+  A fingerprint of the module public API (names, docstring signatures) is kept in
+  `${CMAKE_CURRENT_BINARY_DIR}/<name>.stubs-fingerprint`: when the module is rebuilt without API change,
+  the stubs are not regenerated and their `.pyi` files are left untouched.
 
 
 ### Arguments
@@ -4786,19 +4789,23 @@ function(jrl_boostpy_add_stubs name)
     # The stubs will be generated in <arg_OUTPUT_PATH>/<module_subpath>/__init__.pyi
     # Example: for module 'coal.coal_pywrap', the stubs will be in <arg_OUTPUT_PATH>/coal/coal_pywrap/__init__.pyi
     set(stub_output ${arg_OUTPUT_PATH}/${module_subpath}/__init__.pyi)
+    # The fingerprint file is the stamp of the command, touched on every run,
+    # while the stubs are only rewritten when the module public API changed.
+    set(stub_fingerprint ${CMAKE_CURRENT_BINARY_DIR}/${name}.stubs-fingerprint)
 
     add_custom_command(
-        OUTPUT ${stub_output}
+        OUTPUT ${stub_fingerprint}
+        BYPRODUCTS ${stub_output}
         COMMAND
             ${CMAKE_COMMAND} -E env ${pythonpath} ${python} ${stubgen_py} --output-dir
             ${arg_OUTPUT_PATH} ${arg_MODULE} ${loglevel} --boost-python --ignore-invalid=signature
-            --no-setup-py --no-root-module-suffix
+            --no-setup-py --no-root-module-suffix --fingerprint-file ${stub_fingerprint}
         WORKING_DIRECTORY ${CMAKE_CURRENT_BINARY_DIR}
-        DEPENDS ${arg_DEPENDS}
+        DEPENDS ${arg_DEPENDS} ${stubgen_py}
         VERBATIM
         COMMENT "Generating Boost.Python stubs for module '${arg_MODULE}'"
     )
-    add_custom_target(${name} ALL DEPENDS ${stub_output})
+    add_custom_target(${name} ALL DEPENDS ${stub_fingerprint})
     if(arg_DEPENDS)
         add_dependencies(${name} ${arg_DEPENDS})
     endif()
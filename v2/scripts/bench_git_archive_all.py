@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmarks of git-archive-all.py (at the root of the repository).
+
+Not part of the test suite. Run with:
+    python bench_git_archive_all.py                # 100000 files
+    python bench_git_archive_all.py --files 20000
+"""
+
+import argparse
+import importlib.util
+from itertools import product
+from os import curdir, path
+from pathlib import Path
+from timeit import default_timer
+
+# Import the benchmarked module (its file name is not a valid module name)
+SCRIPT = Path(__file__).resolve().parents[2] / "git-archive-all.py"
+_spec = importlib.util.spec_from_file_location("git_archive_all", SCRIPT)
+gaa = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(gaa)
+
+
+def benchmark_exclude_matching(file_count=100000):
+    """
+    Time is_file_excluded over a synthetic tree of file_count files, with the
+    raw patterns of get_exclude_patterns and with their ExcludeMatcher.
+
+    The tree is 4 directories deep, with a .gitattributes (2 patterns) in every
+    directory but the leaves, 10 files per leaf directory, and a few global
+    patterns. Nothing is written to disk.
+
+    @return: (seconds with the raw patterns, seconds with the matcher)
+    @rtype: tuple
+    """
+    archiver = gaa.GitArchiver.__new__(gaa.GitArchiver)
+    repo_abspath = path.abspath("synthetic-repo")
+    fanout = max(2, int(round((file_count / 10.0) ** 0.25)))
+    names = ["d{0}".format(i) for i in range(fanout)]
+
+    exclude_patterns = {(): ["*.orig", "*.rej"], (curdir,): ["/build", "*.tmp"]}
+    files = []
+    for depth in range(1, 5):
+        for dirs in product(names, repeat=depth):
+            if depth < 4:
+                exclude_patterns[(curdir,) + dirs] = ["*.{0}".format(dirs[-1]), "x*"]
+                continue
+            for i in range(10):
+                if len(files) < file_count:
+                    suffix = ("c", "tmp", "d0", "h")[i % 4]
+                    files.append("/".join(dirs + ("f{0}.{1}".format(i, suffix),)))
+
+    timings = []
+    results = []
+    for patterns in (exclude_patterns, gaa.ExcludeMatcher(exclude_patterns)):
+        start = default_timer()
+        results.append(
+            [archiver.is_file_excluded(repo_abspath, f, patterns) for f in files]
+        )
+        timings.append(default_timer() - start)
+
+    if results[0] != results[1]:
+        raise RuntimeError("ExcludeMatcher disagrees with the raw patterns")
+    return tuple(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=100000)
+    args = parser.parse_args()
+
+    raw, compiled = benchmark_exclude_matching(args.files)
+    print(
+        "{0} files: {1:.3f}s with raw patterns, {2:.3f}s compiled ({3:.1f}x)".format(
+            args.files, raw, compiled, raw / max(compiled, 1e-9)
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
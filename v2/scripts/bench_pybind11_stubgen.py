@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Benchmarks of the vendored pybind11_stubgen.py (in v2/external-modules).
+
+Not part of the test suite. Run with:
+    python bench_pybind11_stubgen.py                      # 5000 classes
+    python bench_pybind11_stubgen.py --classes 20000 --submodules 8 --jobs 4
+    python bench_pybind11_stubgen.py --signatures 100000
+"""
+
+import argparse
+import re
+import sys
+import tempfile
+import types
+from pathlib import Path
+from timeit import default_timer
+
+# Import the benchmarked module by name, so that forked workers can find its
+# functions when pickled
+STUBGEN_DIR = (
+    Path(__file__).resolve().parents[1]
+    / "external-modules"
+    / "pybind11-stubgen-e48d1f1"
+)
+sys.path.insert(0, str(STUBGEN_DIR))
+import pybind11_stubgen as stubgen  # noqa: E402
+
+
+def synthetic_module(module_name, class_count, submodule_count=0):
+    """
+    Build and register in sys.modules a module mimicking a large pybind11
+    extension: class_count classes deriving from each other in chains of 10,
+    each with 4 documented methods, a property and a field, plus free functions.
+    Derived classes sort before their bases by name. Classes are split evenly
+    between the module and its submodule_count submodules.
+    """
+    metaclass = type("pybind11_type", (type,), {"__module__": "pybind11_builtins"})
+    base = metaclass("pybind11_object", (object,), {"__module__": "pybind11_builtins"})
+    class_count //= submodule_count + 1
+    module = types.ModuleType(
+        module_name, "Synthetic module of {0} classes".format(class_count)
+    )
+
+    def documented(doc):
+        def function(*args, **kwargs):
+            pass
+
+        function.__doc__ = doc
+        return function
+
+    classes = []
+    for i in range(class_count):
+        name = "C{0:05d}".format(class_count - i)
+        qualified_name = "{0}.{1}".format(module_name, name)
+        attributes = {
+            "__module__": module_name,
+            "__doc__": "Class {0}.".format(name),
+            "field": i,
+        }
+        for j in range(4):
+            attributes["method{0}".format(j)] = documented(
+                "method{j}(self: {q}, x: int, y: float = 1.0) -> {r}\n\n"
+                "Method {j} of {n}.\n".format(
+                    j=j,
+                    q=qualified_name,
+                    n=name,
+                    r="{0}.{1}".format(module_name, classes[-1].__name__)
+                    if i % 10
+                    else "None",
+                )
+            )
+        attributes["value"] = property(
+            documented("(self: {0}) -> int\n".format(qualified_name))
+        )
+        klass = metaclass(name, (classes[-1] if i % 10 else base,), attributes)
+        classes.append(klass)
+        setattr(module, name, klass)
+
+    for i in range(class_count // 10):
+        name = "function{0}".format(i)
+        setattr(module, name, documented("{0}(arg0: int) -> int\n".format(name)))
+
+    sys.modules[module_name] = module
+    for i in range(submodule_count):
+        submodule = synthetic_module("{0}.sub{1}".format(module_name, i), class_count)
+        setattr(module, "sub{0}".format(i), submodule)
+    return module
+
+
+def benchmark(class_count=5000, submodule_count=0, jobs=1):
+    """
+    Time the parsing of a synthetic_module of class_count classes and the
+    writing of its stubs with jobs workers, to a temporary directory.
+
+    @return: (seconds parsing, seconds writing)
+    @rtype: tuple
+    """
+    stubgen._visited_objects = stubgen.VisitedObjects()
+    generator = stubgen.ModuleStubsGenerator(
+        synthetic_module("_stubgen_benchmark", class_count, submodule_count)
+    )
+    start = default_timer()
+    generator.parse()
+    parsed = default_timer()
+    with tempfile.TemporaryDirectory() as directory:
+        generator.write(directory, jobs)
+    return parsed - start, default_timer() - parsed
+
+
+# First lines of docstrings in the formats of pinocchio and eigenpy
+# (boost::python), and of pybind11 bindings, for signature_benchmark.
+BOOST_PYTHON_SIGNATURES_CORPUS = [
+    "__init__( (object)self [, (int)nq=0 [, (int)nv=0]]) -> None :",
+    "__init__( (object)self, (numpy.ndarray)rotation, (numpy.ndarray)translation) -> None :",
+    "__init__( (object)arg1, (SE3)other) -> object :",
+    "__mul__( (SE3)arg1, (SE3)arg2) -> object :",
+    "__eq__( (SE3)arg1, (SE3)arg2) -> object :",
+    "__str__( (SE3)arg1) -> object :",
+    "__getitem__( (object)arg1, (object)arg2) -> object :",
+    "Identity() -> SE3 :",
+    "act( (SE3)self, (numpy.ndarray)point) -> numpy.ndarray :",
+    "setRandom( (SE3)self) -> SE3 :",
+    "forwardKinematics( (Model)model, (Data)data, (numpy.ndarray)q) -> None :",
+    "forwardKinematics( (Model)model, (Data)data, (numpy.ndarray)q, (numpy.ndarray)v) -> None :",
+    "computeJointJacobians( (Model)model, (Data)data, (numpy.ndarray)q) -> numpy.ndarray :",
+    "rnea( (Model)model, (Data)data, (numpy.ndarray)q, (numpy.ndarray)v, (numpy.ndarray)a) -> numpy.ndarray :",
+    "aba( (Model)model, (Data)data, (numpy.ndarray)q, (numpy.ndarray)v, (numpy.ndarray)tau"
+    " [, (Convention)convention=pinocchio.pinocchio_pywrap_default.Convention.LOCAL]) -> numpy.ndarray :",
+    "buildModelFromUrdf( (str)urdf_filename, (JointModel)root_joint) -> Model :",
+    "buildModelFromUrdf( (str)urdf_filename [, (bool)mimic=False]) -> Model :",
+    "getFrameId( (Model)self, (str)name [, (FrameType)type=pinocchio.pinocchio_pywrap_default.FrameType(31)]) -> int :",
+    "isNormalized( (Model)model, (numpy.ndarray)q [, (float)prec=1e-12]) -> bool :",
+    "randomConfiguration( (Model)model, (numpy.ndarray)lower_bound, (numpy.ndarray)upper_bound) -> numpy.ndarray :",
+    "append( (StdVec_Vector3)arg1, (object)arg2) -> None :",
+    "reserve( (StdVec_Vector3)self, (int)new_cap) -> None :",
+    "tolist( (StdVec_Vector3)self [, (bool)deep_copy=False]) -> list :",
+    "compute( (LDLT)self, (numpy.ndarray)matrix) -> LDLT :",
+    "solve( (LDLT)self, (numpy.ndarray)b) -> numpy.ndarray :",
+    "rankUpdate( (LDLT)self, (numpy.ndarray)w [, (float)sigma=1.0]) -> LDLT :",
+    "matrixL( (LDLT)self) -> numpy.ndarray :",
+    "sharedMemory( (bool)value) -> None :",
+    "seed( (int)seed_value) -> None :",
+]
+PYBIND11_SIGNATURES_CORPUS = [
+    "__init__(self: coal.Box, x: float, y: float, z: float) -> None",
+    "__init__(self: coal.Transform3f, R: numpy.ndarray[numpy.float64[3, 3]], p: numpy.ndarray[numpy.float64[3, 1]]) -> None",
+    "collide(o1: coal.CollisionObject, o2: coal.CollisionObject, request: coal.CollisionRequest,"
+    " result: coal.CollisionResult) -> int",
+    "solve(self: proxsuite.proxqp.dense.QP, x: Optional[numpy.ndarray[numpy.float64[m, 1]]] = None,"
+    " y: Optional[numpy.ndarray[numpy.float64[m, 1]]] = None) -> None",
+    "setTolerance(self: tsid.Solver, eps: float = 1e-09, verbose: bool = False) -> None",
+    "getNeighbors(self: Graph, node: int) -> List[int]",
+    "setCallback(self: Solver, callback: Callable[[int, float], bool]) -> None",
+    "items(self: Map) -> Iterator[Tuple[str, float]]",
+    "format(*args, **kwargs) -> str",
+    "load(path: str, options: Dict[str, str] = {}, *, strict: bool = True) -> Model",
+]
+
+
+def signature_benchmark(count=100000):
+    """
+    Time the construction of count FunctionSignature from each corpus above,
+    with the tokenizer and the former way (see FunctionSignature.use_tokenizer).
+    Both must give the same signatures.
+
+    @return: {corpus label: (seconds with the tokenizer, seconds formerly)}
+    @rtype: dict
+    """
+    FunctionSignature = stubgen.FunctionSignature
+    signature_re = re.compile(
+        r"(?P<name>\w+)\((?P<args>.*)\)\s*->\s*(?P<rtype>[^()]+)$"
+    )
+    results = {}
+    use_boost_python = stubgen.USE_BOOST_PYTHON
+    use_tokenizer = FunctionSignature.use_tokenizer
+    try:
+        for label, corpus in (
+            ("boost-python", BOOST_PYTHON_SIGNATURES_CORPUS),
+            ("pybind11", PYBIND11_SIGNATURES_CORPUS),
+        ):
+            stubgen.USE_BOOST_PYTHON = label == "boost-python"
+            lines = [signature_re.match(line).groups() for line in corpus]
+            lines = (lines * (count // len(lines) + 1))[:count]
+            timings = []
+            signatures = []
+            for FunctionSignature.use_tokenizer in (True, False):
+                start = default_timer()
+                signatures.append(
+                    [
+                        FunctionSignature(name, args, rtype)
+                        for name, args, rtype in lines
+                    ]
+                )
+                timings.append(default_timer() - start)
+            if signatures[0] != signatures[1]:
+                raise RuntimeError("The tokenizer disagrees with the former parsing")
+            results[label] = tuple(timings)
+    finally:
+        stubgen.USE_BOOST_PYTHON = use_boost_python
+        FunctionSignature.use_tokenizer = use_tokenizer
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--classes", type=int, default=5000)
+    parser.add_argument("--submodules", type=int, default=0)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument(
+        "--signatures",
+        type=int,
+        metavar="COUNT",
+        help="time parsing COUNT docstring signatures instead",
+    )
+    args = parser.parse_args()
+
+    if args.signatures is not None:
+        for label, (tokenizer_time, former_time) in signature_benchmark(
+            args.signatures
+        ).items():
+            print(
+                "{0}: {1} signatures in {2:.3f}s ({3:.0f}/s), "
+                "formerly {4:.3f}s ({5:.0f}/s)".format(
+                    label,
+                    args.signatures,
+                    tokenizer_time,
+                    args.signatures / tokenizer_time,
+                    former_time,
+                    args.signatures / former_time,
+                )
+            )
+        return
+
+    parse_time, write_time = benchmark(args.classes, args.submodules, args.jobs)
+    print(
+        "Parsed {0} classes in {1:.3f}s, wrote their stubs in {2:.3f}s "
+        "with {3} jobs".format(args.classes, parse_time, write_time, args.jobs)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -53,6 +53,9 @@ uv run --no-project jrl_release.py --bump patch --git-commit --git-tag
 | `--output-format {text,json}` | Output format (default: text). |
 | `--confirm` | Skip interactive prompts. |
 | `--list-files` | List tracked files. |
+| `--workspace <DIR>` | With `--check-version`, check every git repository under DIR. |
+| `--jobs <N>` | Worker threads used to read version files, or worker processes with `--workspace` (default: automatic). |
+| `--no-cache` | Ignore the discovery/version cache kept in the git directory. |
 | `--git-commit [MSG]` | Commit changes. Optional message (`{version}` placeholder). |
 | `--git-tag [NAME]` | Create a tag. Optional name (`{version}` placeholder). |
 | `--git-tag-message <MSG>` | Tag annotation (`{version}` placeholder). |
@@ -60,7 +63,11 @@ uv run --no-project jrl_release.py --bump patch --git-commit --git-tag
 | `--push-tag` | Push the tag to the main repository. Only works with github for now. |
 | `--git-archive` | Create a .tar.gz archive. |
 | `--sign-archive` | GPG-sign the archive. Needs a configured signing key. |
+| `--archive-format {tar.gz,tar.xz}` | Compression of the archive (default: tar.gz), compressed by `--jobs` threads. |
+| `--archive-cache-size <MIB>` | Size limit of the archive cache (default: 2048, 0 disables it). |
 | `--gh-release` | Create Github release. Needs a configured gh cli. |
+| `--serve` | Run a daemon answering check/list/bump requests on a Unix socket. |
+| `--socket [PATH]` | Daemon socket (default: derived from `--root`). With `--check-version`, ask a running daemon first. |
 
 **Git defaults**: commit `chore: bump version to {version}`, tag `v{version}`, tag message `Release version {version}`.
 
@@ -91,6 +98,50 @@ Discovery skips hidden directories (`.git`, `.pixi`, `.venv`, …), git submodul
 and — honoring your `.gitignore` via `git check-ignore` — ignored dirs like
 `build/` or `dist/`. All discovered files must agree on a single
 version to bump version.
+
+## Workspaces
+
+`--check-version --workspace DIR` checks every top-level git repository found
+under DIR (repositories nested in another one are part of it). Repositories
+are checked in parallel worker processes and reported together; with
+`--output-format json` the report is a single document listing each
+repository's result. A repository that fails to be checked is reported as an
+error without stopping the others.
+
+## Daemon
+
+`--serve` keeps the discovered files and parsed versions warm and answers
+newline-delimited JSON requests on a Unix socket (`--socket PATH`). By
+default the socket is named after the project and lives in a `jrl_release`
+directory private to the user: in `$XDG_RUNTIME_DIR`, else in the git
+directory of the project, else in the temp directory:
+
+```
+{"command": "check"}                      -> the --check-version JSON payload
+{"command": "list"}                       -> the --list-files JSON payload
+{"command": "bump", "bump": "patch"}      -> bump all files (no git operations)
+{"command": "bump", "version": "1.2.3", "dry_run": true}
+{"command": "shutdown"}
+```
+
+Answers are re-validated against file mtimes on every request. Add
+`--socket` to `--check-version` to ask a running daemon first; the check runs
+locally when no daemon answers.
+
+## Cache
+
+Inside a git repository, discovered packages and parsed versions are cached
+in `.git/jrl_release_cache.json`. Entries are keyed on the mtime and size of
+the directories and files they come from, so only changed files are parsed
+again.
+
+Release archives are cached in `~/.cache/jrl_release/archives` (or under
+`$XDG_CACHE_HOME`), keyed on the git tree, the commit time, the format and the
+compression level, plus the attribute files outside the tree and, when
+`export-subst` is used, the commit. Archives are reproducible, so a retried
+release reuses the stored archive and signs it again when `--sign` is given.
+Least-recently-used entries are evicted beyond `--archive-cache-size` MiB.
+Pass `--no-cache` to bypass both caches.
 """
 
 import sys
@@ -98,26 +149,22 @@ import re
 import os
 import argparse
 import datetime
-import importlib.metadata
+import hashlib
+import io
 import json
+import socket
 import subprocess
-import shutil
+import stat
 import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from abc import ABC, abstractmethod
-from typing import List, Optional, Tuple, Dict
-
-import tomlkit
-import cmake_parser
-from ruamel.yaml import YAML
-from rich.console import Console
-from rich.table import Table
-from rich import box
-from rich.prompt import Confirm
-from rich.panel import Panel
-from rich.markdown import Markdown
-from rich.text import Text
-from packaging.version import parse as parse_version, InvalidVersion
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# tomlkit, ruamel.yaml, cmake_parser, packaging and rich are imported by the
+# code paths that need them: --version and --short stay cheap to start.
 
 # Ensure UTF-8 output so rich box-drawing and ✓/✗ symbols render on Windows.
 # Prevents UnicodeEncodeError: 'charmap' codec can't encode characters.
@@ -127,7 +174,29 @@ for _stream in (sys.stdout, sys.stderr):
     except (AttributeError, ValueError):
         pass
 
-console = Console()
+
+class LazyConsole:
+    """rich Console created (and rich imported) on first use.
+
+    Plain-text invocations (--version, --short, json output) print nothing
+    through the console when they succeed, so they never import rich.
+    """
+
+    def __init__(self, **kwargs):
+        self._kwargs = kwargs
+        self._console = None
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if self._console is None:
+            from rich.console import Console
+
+            self._console = Console(**self._kwargs)
+        return getattr(self._console, name)
+
+
+console = LazyConsole()
 
 STYLE_INFO = "bold blue"
 STYLE_SUCCESS = "green"
@@ -145,6 +214,22 @@ STYLE_HIGHLIGHT = "cyan"
 GITHUB_URL = "https://github.com/"
 
 
+def confirm(prompt: str, default: bool = True) -> bool:
+    """Interactive yes/no question (rich.prompt.Confirm, imported on demand)."""
+    from rich.prompt import Confirm
+
+    return Confirm.ask(prompt, default=default)
+
+
+def file_stat_key(path: Path) -> Optional[List[int]]:
+    """``[mtime_ns, size]`` of ``path``, or None when it cannot be stat'ed."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
 class VersionNotPresent(Exception):
     """Raised when a file exists but has no version field configured."""
 
@@ -156,15 +241,75 @@ class VersionExtractor(ABC):
         self.file_path = file_path
         # Display label; discovery overrides it with a root-relative path.
         self.label = file_path.name
+        # Parsed file shared by get_version/render_version/get_url, see document.
+        self._document = None
+        self._document_stat: Optional[List[int]] = None
+        self._pending_document = None
 
     @abstractmethod
     def get_version(self) -> str:
         pass
 
     @abstractmethod
-    def update_version(self, new_version: str) -> None:
+    def render_version(self, new_version: str) -> Optional[str]:
+        """New file content with ``new_version`` applied, without writing it.
+
+        Returns None when the file should be left untouched.
+        """
         pass
 
+    def update_version(self, new_version: str) -> None:
+        new_content = self.render_version(new_version)
+        if new_content is not None:
+            with open(self.file_path, "w", encoding="utf-8") as f:
+                f.write(new_content)
+            self.mark_written()
+
+    def load_document(self):
+        """Read and parse the file. The default document is its raw text."""
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    @property
+    def document(self):
+        """The parsed file, loaded on first use and reused until it changes on disk."""
+        stat = file_stat_key(self.file_path)
+        if self._document is None or stat != self._document_stat:
+            self._document = self.load_document()
+            self._document_stat = stat
+        return self._document
+
+    def preload_document(self) -> None:
+        """Load the document now, so get_version() reuses what render_version() edits."""
+        self.document
+
+    def cached_document(self):
+        """The document if it is already loaded and still fresh, else None."""
+        if self._document is None:
+            return None
+        if file_stat_key(self.file_path) != self._document_stat:
+            return None
+        return self._document
+
+    def invalidate_document(self) -> None:
+        self._document = None
+        self._pending_document = None
+
+    def stage_document(self, document) -> None:
+        """Remember the document render_version() produced.
+
+        The cached document is dropped, as rendering may have modified it in
+        place; mark_written() adopts ``document`` once it is on disk.
+        """
+        self._document = None
+        self._pending_document = document
+
+    def mark_written(self) -> None:
+        """Adopt the last rendered document after its content reached the disk."""
+        self._document = self._pending_document
+        self._document_stat = file_stat_key(self.file_path)
+        self._pending_document = None
+
     def check_file_exists(self) -> bool:
         return self.file_path.exists()
 
@@ -191,34 +336,26 @@ class VersionExtractor(ABC):
 class XmlVersionExtractor(VersionExtractor):
     def get_version(self) -> str:
         # Simple regex for package.xml to avoid parsing namespaces or losing comments
-        with open(self.file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-        match = re.search(r"<version>(.*?)</version>", content)
+        match = re.search(r"<version>(.*?)</version>", self.document)
         if match:
             return match.group(1).strip()
         raise VersionNotPresent(f"No <version> tag found in {self.name}")
 
-    def update_version(self, new_version: str) -> None:
-        with open(self.file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-
+    def render_version(self, new_version: str) -> Optional[str]:
         # Replace only the first occurrence which is standard for the package version
         new_content = re.sub(
             r"<version>(.*?)</version>",
             f"<version>{new_version}</version>",
-            content,
+            self.document,
             count=1,
         )
-
-        with open(self.file_path, "w", encoding="utf-8") as f:
-            f.write(new_content)
+        self.stage_document(new_content)
+        return new_content
 
     def get_url(self) -> str | None:
         if not self.file_path.exists():
             return None
-        with open(self.file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-        for url in re.findall(r"<url[^>]*>(.*?)</url>", content, re.I):
+        for url in re.findall(r"<url[^>]*>(.*?)</url>", self.document, re.I):
             if valid_url := self.validate_url(url):
                 return valid_url
         return None
@@ -229,11 +366,14 @@ class TomlVersionExtractor(VersionExtractor):
         super().__init__(file_path)
         self.keys = keys
 
-    def get_version(self) -> str:
+    def load_document(self):
+        import tomlkit
+
         with open(self.file_path, "r", encoding="utf-8") as f:
-            data = tomlkit.load(f)
+            return tomlkit.load(f)
 
-        value = data
+    def get_version(self) -> str:
+        value = self.document
         for key in self.keys:
             if key in value:
                 value = value[key]
@@ -244,9 +384,8 @@ class TomlVersionExtractor(VersionExtractor):
 
         return str(value)
 
-    def update_version(self, new_version: str) -> None:
-        with open(self.file_path, "r", encoding="utf-8") as f:
-            data = tomlkit.load(f)
+    def render_version(self, new_version: str) -> Optional[str]:
+        data = self.document
 
         # Navigate to the key
         container = data
@@ -258,14 +397,15 @@ class TomlVersionExtractor(VersionExtractor):
 
         container[self.keys[-1]] = new_version
 
-        with open(self.file_path, "w", encoding="utf-8") as f:
-            tomlkit.dump(data, f)
+        import tomlkit
+
+        self.stage_document(data)
+        return tomlkit.dumps(data)
 
     def get_url(self) -> str | None:
         if not self.file_path.exists():
             return None
-        with open(self.file_path, "r", encoding="utf-8") as f:
-            data = tomlkit.load(f)
+        data = self.document
         if "project" in data and "urls" in data["project"]:
             for url in data["project"]["urls"].values():
                 if valid_url := self.validate_url(url):
@@ -277,14 +417,23 @@ class YamlVersionExtractor(VersionExtractor):
     def __init__(self, file_path: Path, keys: List[str]):
         super().__init__(file_path)
         self.keys = keys
-        self.yaml = YAML()
-        self.yaml.preserve_quotes = True
+        self._yaml = None
 
-    def get_version(self) -> str:
+    @property
+    def yaml(self):
+        if self._yaml is None:
+            from ruamel.yaml import YAML
+
+            self._yaml = YAML()
+            self._yaml.preserve_quotes = True
+        return self._yaml
+
+    def load_document(self):
         with open(self.file_path, "r", encoding="utf-8") as f:
-            data = self.yaml.load(f)
+            return self.yaml.load(f)
 
-        value = data
+    def get_version(self) -> str:
+        value = self.document
         for key in self.keys:
             if key in value:
                 value = value[key]
@@ -295,9 +444,8 @@ class YamlVersionExtractor(VersionExtractor):
 
         return str(value)
 
-    def update_version(self, new_version: str) -> None:
-        with open(self.file_path, "r", encoding="utf-8") as f:
-            data = self.yaml.load(f)
+    def render_version(self, new_version: str) -> Optional[str]:
+        data = self.document
 
         container = data
         for key in self.keys[:-1]:
@@ -305,39 +453,225 @@ class YamlVersionExtractor(VersionExtractor):
 
         container[self.keys[-1]] = new_version
 
-        with open(self.file_path, "w", encoding="utf-8") as f:
-            self.yaml.dump(data, f)
+        stream = io.StringIO()
+        self.yaml.dump(data, stream)
+        self.stage_document(data)
+        return stream.getvalue()
 
 
 class ConanfileVersionExtractor(VersionExtractor):
     def get_version(self) -> str:
-        content = self.file_path.read_text()
-        if match := re.search(r'\s*version\s*=\s*["\']([^"\']+)["\']', content):
+        if match := re.search(r'\s*version\s*=\s*["\']([^"\']+)["\']', self.document):
             return match.group(1)
         raise VersionNotPresent(f"Version not found in {self.name}")
 
-    def update_version(self, new_version: str) -> None:
+    def render_version(self, new_version: str) -> Optional[str]:
         pattern = re.compile(r'(\s*version\s*=\s*["\'])([^"\']+)(["\'])')
-        content = self.file_path.read_text()
+        content = self.document
         if not pattern.search(content):
             raise VersionNotPresent(f"Version not found in {self.name}")
         new_content, count = pattern.subn(
             lambda m: f"{m.group(1)}{new_version}{m.group(3)}", content, count=1
         )
-        self.file_path.write_text(new_content)
+        self.stage_document(new_content)
+        return new_content
+
+
+# One lexical token of a CMake listfile, see iter_cmake_commands().
+_CMAKE_TOKEN = re.compile(
+    r"""
+    (?P<space>\s+)
+    | (?P<bracket>\#?\[(?P<eq>=*)\[)
+    | (?P<comment>\#[^\n]*)
+    | (?P<quote>")
+    | (?P<lparen>\()
+    | (?P<rparen>\))
+    | (?P<word>(?:[^\s()#"\\]|\\.)+)
+    """,
+    re.VERBOSE,
+)
+_CMAKE_QUOTED_REST = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+_CMAKE_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+def iter_cmake_commands(lines: Iterable[str]) -> Iterator[Tuple[str, List[str]]]:
+    """Yield ``(name, args)`` for each command invocation in a CMake listfile.
+
+    ``lines`` is consumed lazily, so a caller that stops iterating early never
+    reads the rest of the file. Invocations may span several lines; line and
+    bracket comments are skipped, quoted and bracket arguments are returned
+    without their delimiters, and nested parentheses are dropped.
+
+    Raises ValueError on input that is not a valid listfile (unbalanced
+    parentheses, unterminated quotes or brackets).
+    """
+    lines = iter(lines)
+    buffer, pos = "", 0
+    name: Optional[str] = None  # identifier that may start an invocation
+    args: Optional[List[str]] = None  # arguments of the invocation being read
+    depth = 0
+
+    def read_until(pattern, anchored: bool):
+        # Match (or search) ``pattern`` at ``pos``, pulling in more lines until
+        # it succeeds. Consumed text is dropped from the buffer meanwhile.
+        nonlocal buffer, pos
+        while True:
+            if anchored:
+                found = pattern.match(buffer, pos)
+            else:
+                found = pattern.search(buffer, pos)
+            if found:
+                return found
+            line = next(lines, None)
+            if line is None:
+                raise ValueError("unterminated quoted or bracket argument")
+            buffer, pos = buffer[pos:] + line, 0
+
+    while True:
+        if pos >= len(buffer):
+            line = next(lines, None)
+            if line is None:
+                break
+            buffer, pos = line, 0
+            continue
+
+        match = _CMAKE_TOKEN.match(buffer, pos)
+        if match is None:
+            raise ValueError(f"unexpected character {buffer[pos]!r}")
+        kind = match.lastgroup
+        pos = match.end()
+
+        if kind == "space":
+            continue
+        if kind == "comment":
+            name = None if args is None else name
+            continue
+        if kind == "bracket":
+            is_comment = match.group().startswith("#")
+            closer = read_until(
+                re.compile(re.escape("]" + match.group("eq") + "]")), anchored=False
+            )
+            text = buffer[pos : closer.start()]
+            pos = closer.end()
+            if is_comment or args is None:
+                name = None if args is None else name
+            else:
+                args.append(text)
+            continue
+        if kind == "quote":
+            closing = read_until(_CMAKE_QUOTED_REST, anchored=True)
+            text = buffer[pos : closing.end() - 1]
+            pos = closing.end()
+            if args is None:
+                name = None
+            else:
+                args.append(text)
+            continue
+        if kind == "lparen":
+            if args is not None:
+                depth += 1
+            elif name is not None:
+                args, depth = [], 1
+            else:
+                raise ValueError("'(' outside of a command invocation")
+            continue
+        if kind == "rparen":
+            if args is None:
+                raise ValueError("')' outside of a command invocation")
+            depth -= 1
+            if depth == 0:
+                yield name, args
+                name, args = None, None
+            continue
+        # kind == "word"
+        if args is None:
+            word = match.group()
+            name = word if _CMAKE_IDENTIFIER.fullmatch(word) else None
+        else:
+            args.append(match.group())
+
+    if args is not None:
+        raise ValueError(f"unterminated invocation of {name}()")
 
 
 class CMakeListsVersionExtractor(VersionExtractor):
     """Specialized extractor for CMakeLists.txt that uses cmake-parser
     and handles both direct VERSION and variables (e.g., from package.xml)."""
 
+    def __init__(self, file_path: Path):
+        super().__init__(file_path)
+        # cmake-parser tree, along with the document text it was built from.
+        self._tree = None
+        self._tree_source: Optional[str] = None
+
+    def _parse_tree(self, content: str):
+        if self._tree_source is not content:
+            import cmake_parser
+
+            self._tree = cmake_parser.parse(content)
+            self._tree_source = content
+        return self._tree
+
     def get_version(self) -> str:
-        with open(self.file_path, "r", encoding="utf-8") as f:
-            content = f.read()
+        """Version from the first project() call (or its PROJECT_VERSION fallback).
+
+        The file is tokenized lazily and reading stops at the first project()
+        command, so long listfiles are never read past their header. Files the
+        tokenizer rejects, or whose header holds no version, go through the
+        full cmake-parser/regex path instead.
+
+        As in render_version(), the first literal set(PROJECT_VERSION ...) of
+        the file is the fallback used when project() reads a variable.
+        """
+        version = None
+        try:
+            content = self.cached_document()
+            if content is not None:
+                version = self._get_version_streamed(content.splitlines(keepends=True))
+            else:
+                with open(self.file_path, "r", encoding="utf-8") as f:
+                    version = self._get_version_streamed(f)
+        except ValueError:
+            pass  # not a listfile the tokenizer understands
+        if version is not None:
+            return version
+
+        return self._get_version_parsed()
+
+    def _get_version_streamed(self, lines: Iterable[str]) -> Optional[str]:
+        """Scan commands up to the first project(), see get_version().
+
+        Returns None when the header does not settle the version, e.g. when
+        project() reads a variable set further down.
+        """
+        fallback_version = None
+        for name, args in iter_cmake_commands(lines):
+            name = name.lower()
+            if name == "set":
+                # Only literal values: set(PROJECT_VERSION "${...}") is ignored.
+                if len(args) >= 2 and args[0] == "PROJECT_VERSION":
+                    if fallback_version is None and "${" not in args[1]:
+                        fallback_version = args[1]
+            elif name == "project":
+                if "VERSION" in args[1:]:
+                    version_idx = args.index("VERSION", 1)
+                    if (
+                        version_idx + 1 < len(args)
+                        and "${" not in args[version_idx + 1]
+                    ):
+                        return args[version_idx + 1]
+                # A variable version may still be set further down.
+                return fallback_version
+
+        return fallback_version
+
+    def _get_version_parsed(self) -> str:
+        """Full-file extraction with cmake-parser, falling back to regexes."""
+        content = self.document
 
         try:
             # Parse the CMakeLists.txt file
-            tree = cmake_parser.parse(content)
+            tree = self._parse_tree(content)
 
             fallback_version = None
             project_version = None
@@ -348,7 +682,12 @@ class CMakeListsVersionExtractor(VersionExtractor):
                     # Look for set(PROJECT_VERSION "...")
                     if node.name.lower() == "set":
                         args = self._get_command_args(node)
-                        if len(args) >= 2 and args[0] == "PROJECT_VERSION":
+                        if (
+                            fallback_version is None
+                            and len(args) >= 2
+                            and args[0] == "PROJECT_VERSION"
+                            and "${" not in args[1]
+                        ):
                             # Remove quotes from version string
                             fallback_version = args[1].strip('"')
 
@@ -361,7 +700,7 @@ class CMakeListsVersionExtractor(VersionExtractor):
                             if version_idx + 1 < len(args):
                                 ver = args[version_idx + 1]
                                 # Check if it's a variable reference
-                                if not ver.startswith("${"):
+                                if project_version is None and not ver.startswith("${"):
                                     project_version = ver.strip('"')
                         except ValueError:
                             pass
@@ -382,9 +721,7 @@ class CMakeListsVersionExtractor(VersionExtractor):
     def get_url(self) -> str | None:
         if not self.file_path.exists():
             return None
-        with open(self.file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-        if match := re.search(r'HOMEPAGE_URL\s+"([^"]+)"', content):
+        if match := re.search(r'HOMEPAGE_URL\s+"([^"]+)"', self.document):
             return self.validate_url(match.group(1))
         return None
 
@@ -426,9 +763,8 @@ class CMakeListsVersionExtractor(VersionExtractor):
 
         raise VersionNotPresent(f"No version found in {self.name}")
 
-    def update_version(self, new_version: str) -> None:
-        with open(self.file_path, "r", encoding="utf-8") as f:
-            content = f.read()
+    def render_version(self, new_version: str) -> Optional[str]:
+        content = self.document
 
         # 1. Update fallback version: matches set(PROJECT_VERSION 1.2.3) or set(PROJECT_VERSION "1.2.3")
         #    Always replaces it without quotes: set(PROJECT_VERSION 1.2.3)
@@ -452,9 +788,8 @@ class CMakeListsVersionExtractor(VersionExtractor):
             return f"{match.group(1)}{new_version}"
 
         content = project_pattern.sub(repl_project, content, count=1)
-
-        with open(self.file_path, "w", encoding="utf-8") as f:
-            f.write(content)
+        self.stage_document(content)
+        return content
 
 
 class DebianChangelogVersionExtractor(VersionExtractor):
@@ -467,10 +802,13 @@ class DebianChangelogVersionExtractor(VersionExtractor):
     def name(self) -> str:
         return "debian/changelog"
 
+    def _first_line(self) -> str:
+        lines = self.document.splitlines(keepends=True)
+        return lines[0] if lines else ""
+
     def get_version(self) -> str:
         """Extracts and returns the clean upstream version string (omitting the Debian suffix)."""
-        with open(self.file_path, "r", encoding="utf-8") as f:
-            first_line = f.readline()
+        first_line = self._first_line()
 
         if not first_line:
             raise VersionNotPresent(f"Changelog file {self.name} is empty")
@@ -487,27 +825,24 @@ class DebianChangelogVersionExtractor(VersionExtractor):
 
     def _get_raw_full_version(self) -> str:
         """Internal helper to get the un-stripped full version string with its suffix."""
-        with open(self.file_path, "r", encoding="utf-8") as f:
-            first_line = f.readline()
-        match = re.match(r"^[a-zA-Z0-9.+_-]+\s+\(([^)]+)\)", first_line)
+        match = re.match(r"^[a-zA-Z0-9.+_-]+\s+\(([^)]+)\)", self._first_line())
         return match.group(1) if match else ""
 
-    def update_version(self, new_version: str) -> None:
+    def render_version(self, new_version: str) -> Optional[str]:
         # Compare core upstream versions safely to avoid duplicate entries
         try:
             if self.get_version() == re.split(r"[-~]", new_version)[0]:
-                return  # Skip adding a duplicate entry
+                return None  # Skip adding a duplicate entry
         except VersionNotPresent:
             pass
 
-        # Grab the raw full version string to parse its suffix before reading full file
+        # Grab the raw full version string to parse its suffix
         try:
             current_full_version = self._get_raw_full_version()
         except Exception:
             current_full_version = ""
 
-        with open(self.file_path, "r", encoding="utf-8") as f:
-            content = f.read()
+        content = self.document
 
         # Parse the first line to reuse metadata
         first_line = content.splitlines()[0] if content.strip() else ""
@@ -539,11 +874,11 @@ class DebianChangelogVersionExtractor(VersionExtractor):
             formatted_version = f"{new_upstream}-1"
 
         # Fetch maintainer details
-        repo_dir = self.file_path.parent
-        name_ok, git_name = run_git_command(["config", "user.name"], cwd=repo_dir)
-        email_ok, git_email = run_git_command(["config", "user.email"], cwd=repo_dir)
+        session = GitSession(self.file_path.parent)
+        git_name = session.config("user.name")
+        git_email = session.config("user.email")
 
-        if name_ok and email_ok:
+        if git_name and git_email:
             maintainer = f"{git_name} <{git_email}>"
         else:
             maintainer = "Maintainer <maintainer@example.com>"
@@ -559,10 +894,9 @@ class DebianChangelogVersionExtractor(VersionExtractor):
             f" -- {maintainer}  {debian_date}\n\n"
         )
 
-        updated_content = new_entry + content
-
-        with open(self.file_path, "w", encoding="utf-8") as f:
-            f.write(updated_content)
+        new_content = new_entry + content
+        self.stage_document(new_content)
+        return new_content
 
 
 class ChangelogVersionExtractor(VersionExtractor):
@@ -570,19 +904,15 @@ class ChangelogVersionExtractor(VersionExtractor):
         super().__init__(file_path)
 
     def get_version(self) -> str:
-        with open(self.file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-
         # Look for ## [Version]
-        matches = re.findall(r"^## \[(.*?)\]", content, re.MULTILINE)
+        matches = re.findall(r"^## \[(.*?)\]", self.document, re.MULTILINE)
         for version in matches:
             if version.lower() != "unreleased":
                 return version
         raise VersionNotPresent(f"No released version found in {self.name}")
 
-    def update_version(self, new_version: str) -> None:
-        with open(self.file_path, "r", encoding="utf-8") as f:
-            content = f.read()
+    def render_version(self, new_version: str) -> Optional[str]:
+        content = self.document
 
         today = datetime.date.today().isoformat()
 
@@ -593,7 +923,7 @@ class ChangelogVersionExtractor(VersionExtractor):
             console.print(
                 f"[{STYLE_WARNING}]Warning: Could not find '## [Unreleased]' in CHANGELOG.md. Skipping update.[/{STYLE_WARNING}]"
             )
-            return
+            return None
 
         replacement = f"## [Unreleased]\n\n## [{new_version}] - {today}"
 
@@ -612,10 +942,8 @@ class ChangelogVersionExtractor(VersionExtractor):
                 f"[{STYLE_WARNING}]Warning: Link definitions in CHANGELOG.md can't be updated automatically.[/{STYLE_WARNING}]"
             )
 
-        with open(self.file_path, "w", encoding="utf-8") as f:
-            f.write(new_content)
-
-        console.print(f"[{STYLE_INFO}]Updated CHANGELOG.md.[/{STYLE_INFO}]")
+        self.stage_document(new_content)
+        return new_content
 
 
 def git_ignored_abs_dirs(repo_dir: Path) -> set:
@@ -656,7 +984,32 @@ def git_ignored_abs_dirs(repo_dir: Path) -> set:
     }
 
 
-def drop_git_ignored(root_dir: Path, paths: List[Path]) -> List[Path]:
+def git_toplevel(path: Path) -> Optional[Path]:
+    """Resolved top-level of the git repository containing ``path``, if any."""
+    ok, top = run_git_command(["rev-parse", "--show-toplevel"], path)
+    if not ok or not top:
+        return None
+    return Path(top).resolve()
+
+
+def enclosing_repo_dir(path: Path) -> Optional[Path]:
+    """Closest directory at or above ``path`` holding a ``.git`` entry, if any.
+
+    A filesystem-only stand-in for ``git rev-parse --show-toplevel``: both a
+    ``.git`` directory and a ``.git`` file (worktrees, submodules) count.
+    """
+    path = path.resolve()
+    for candidate in (path, *path.parents):
+        if (candidate / ".git").exists():
+            return candidate
+    return None
+
+
+def drop_git_ignored(
+    root_dir: Path,
+    paths: List[Path],
+    repo_tops: Optional[Dict[Path, Optional[Path]]] = None,
+) -> List[Path]:
     """Drop paths that git ignores, honoring each path's own enclosing repo.
 
     Candidates may live in independent nested git repositories even when
@@ -664,8 +1017,12 @@ def drop_git_ignored(root_dir: Path, paths: List[Path]) -> List[Path]:
     checkouts). Anchoring a single ``git check-ignore`` at ``root_dir`` would
     then bail out entirely and leak ignored build trees like ``output/`` into
     the results. Instead, resolve the repository that actually contains each
-    candidate and run ``git check-ignore`` there. Paths outside any repo are
-    always kept.
+    candidate and run one ``git check-ignore`` batch there. Paths outside any
+    repo are always kept.
+
+    ``repo_tops`` maps each candidate to its repository top-level (None when
+    outside any repo), as recorded by discover_package_roots() during its
+    walk. Candidates missing from it are resolved with ``git rev-parse``.
     """
     if not paths:
         return paths
@@ -673,10 +1030,13 @@ def drop_git_ignored(root_dir: Path, paths: List[Path]) -> List[Path]:
     # Group candidates by the git repo top-level that contains them.
     groups: Dict[Path, List[Path]] = {}
     for p in paths:
-        ok, top = run_git_command(["rev-parse", "--show-toplevel"], p.parent)
-        if not ok or not top:
+        if repo_tops is not None and p in repo_tops:
+            top = repo_tops[p]
+        else:
+            top = git_toplevel(p.parent)
+        if top is None:
             continue  # not inside any repo -> always kept
-        groups.setdefault(Path(top).resolve(), []).append(p)
+        groups.setdefault(top, []).append(p)
 
     ignored: set = set()
     for top_path, repo_paths in groups.items():
@@ -697,17 +1057,22 @@ def drop_git_ignored(root_dir: Path, paths: List[Path]) -> List[Path]:
             continue
 
         ignored_rel = {chunk for chunk in result.stdout.split("\0") if chunk}
-        ignored.update(p for p, r in zip(repo_paths, rel) if r in ignored_rel)
+        ignored.update(
+            p for p, r in zip(repo_paths, rel, strict=True) if r in ignored_rel
+        )
 
     return [p for p in paths if p not in ignored]
 
 
-def git_submodule_dirs(root_dir: Path) -> set:
-    """Absolute paths of git submodule working trees (empty outside a git repo)."""
-    ok, top = run_git_command(["rev-parse", "--show-toplevel"], root_dir)
-    if not ok or not top:
-        return set()
-    top = Path(top)
+def git_submodule_dirs(root_dir: Path, top: Optional[Path] = None) -> set:
+    """Absolute paths of git submodule working trees (empty outside a git repo).
+
+    ``top`` is the repository top-level of ``root_dir`` when already known.
+    """
+    if top is None:
+        top = git_toplevel(root_dir)
+        if top is None:
+            return set()
 
     ok, out = run_git_command(
         ["config", "--file", ".gitmodules", "-z", "--get-regexp", "path"], top
@@ -723,11 +1088,13 @@ def git_submodule_dirs(root_dir: Path) -> set:
     return dirs
 
 
-def drop_submodules(root_dir: Path, paths: List[Path]) -> List[Path]:
+def drop_submodules(
+    root_dir: Path, paths: List[Path], top: Optional[Path] = None
+) -> List[Path]:
     """Drop paths inside git submodules (they are versioned independently)."""
     if not paths:
         return paths
-    subdirs = git_submodule_dirs(root_dir)
+    subdirs = git_submodule_dirs(root_dir, top)
     if not subdirs:
         return paths
     kept = []
@@ -739,7 +1106,183 @@ def drop_submodules(root_dir: Path, paths: List[Path]) -> List[Path]:
     return kept
 
 
-def discover_package_roots(root_dir: Path) -> List[Path]:
+def global_ignore_files(cwd: Path) -> List[Path]:
+    """Git configuration and exclude files that apply to every repository.
+
+    These are the global/XDG config files (which may set ``core.excludesFile``)
+    and the global excludes file itself, so a cache keyed on them notices a
+    rule being added outside of the walked tree.
+    """
+    xdg_config = os.environ.get("XDG_CONFIG_HOME") or str(Path.home() / ".config")
+    files = [Path.home() / ".gitconfig", Path(xdg_config) / "git" / "config"]
+    excludes_file = Path(xdg_config) / "git" / "ignore"
+    try:
+        result = subprocess.run(
+            ["git", "config", "--path", "--get", "core.excludesFile"],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode == 0 and result.stdout.strip():
+            excludes_file = Path(result.stdout.strip())
+    except (FileNotFoundError, OSError):
+        pass  # no git: the default location is the best guess
+    files.append(excludes_file)
+    return files
+
+
+def git_dir_of(repo_dir: Path) -> Path:
+    """The git directory of the repository whose top-level is ``repo_dir``.
+
+    Follows the ``gitdir:`` pointer of worktrees and submodules, whose ``.git``
+    is a file rather than a directory.
+    """
+    dot_git = repo_dir / ".git"
+    if dot_git.is_file():
+        content = dot_git.read_text(encoding="utf-8").strip()
+        if content.startswith("gitdir:"):
+            git_dir = Path(content[len("gitdir:") :].strip())
+            return git_dir if git_dir.is_absolute() else repo_dir / git_dir
+    return dot_git
+
+
+class ReleaseCache:
+    """On-disk cache of discovery results and parsed versions.
+
+    Stored as ``jrl_release_cache.json`` in the git directory of the project,
+    so it never shows up in the working tree. Every entry records the
+    ``[mtime_ns, size]`` of the paths it was computed from and is discarded as
+    soon as one of them changes:
+
+    - discovery results are keyed on the mtime of every walked directory (a
+      package appearing or disappearing touches its parent) plus every file
+      that shaped it: the ``.gitignore``/``.gitmodules`` files of the walked
+      tree and of its parents up to the repository top-level, ``info/exclude``
+      and the repository config, and the global git config and excludes file;
+    - versions are keyed on the stat of the file they were read from.
+
+    Paths modified within ``RACY_WINDOW_NS`` of now are not cached, since a
+    further edit in the same timestamp tick would go unnoticed.
+    """
+
+    FILE_NAME = "jrl_release_cache.json"
+    FORMAT = 1
+    RACY_WINDOW_NS = 2_000_000_000
+
+    def __init__(self, path: Optional[Path]):
+        # A None path keeps the cache in memory only (e.g. for --serve).
+        self.path = path
+        self.dirty = False
+        self._lock = threading.Lock()
+        self.data = {"format": self.FORMAT, "discovery": {}, "versions": {}}
+        if path is None:
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") == self.FORMAT:
+                self.data = data
+        except (OSError, ValueError):
+            pass  # missing or corrupt cache -> start empty
+
+    @classmethod
+    def for_root(cls, root_dir: Path) -> Optional["ReleaseCache"]:
+        """Cache of the repository containing ``root_dir`` (None outside a repo)."""
+        repo_dir = enclosing_repo_dir(root_dir)
+        if repo_dir is None:
+            return None
+        git_dir = git_dir_of(repo_dir)
+        if not git_dir.is_dir():
+            return None
+        return cls(git_dir / cls.FILE_NAME)
+
+    def _is_fresh(self, stats: Dict[str, Optional[List[int]]]) -> bool:
+        return all(file_stat_key(Path(p)) == stat for p, stat in stats.items())
+
+    def _is_racy(self, stats: Dict[str, Optional[List[int]]]) -> bool:
+        limit = time.time_ns() - self.RACY_WINDOW_NS
+        return any(stat is not None and stat[0] > limit for stat in stats.values())
+
+    def package_roots(self, root_dir: Path) -> Optional[List[Path]]:
+        """Cached discover_package_roots() result, or None if stale/unknown."""
+        entry = self.data["discovery"].get(str(root_dir.resolve()))
+        if entry is None or not self._is_fresh(entry["watched"]):
+            return None
+        return [Path(p) for p in entry["package_roots"]]
+
+    def store_package_roots(
+        self,
+        root_dir: Path,
+        package_roots: List[Path],
+        watched: Dict[str, Optional[List[int]]],
+    ) -> None:
+        if self._is_racy(watched):
+            return
+        with self._lock:
+            self.data["discovery"][str(root_dir.resolve())] = {
+                "package_roots": [str(p) for p in package_roots],
+                "watched": watched,
+            }
+            self.dirty = True
+
+    def get_version(self, check: VersionExtractor) -> str:
+        """check.get_version(), served from the cache while the file is unchanged.
+
+        VersionNotPresent outcomes are cached too; other errors are not.
+        """
+        key = f"{check.__class__.__name__}:{check.file_path.resolve()}"
+        stat = file_stat_key(check.file_path)
+        entry = self.data["versions"].get(key)
+        if entry is not None and entry["stat"] == stat:
+            if entry["version"] is None:
+                raise VersionNotPresent(entry["message"])
+            return entry["version"]
+
+        try:
+            version = check.get_version()
+        except VersionNotPresent as e:
+            self._store_version(key, stat, None, str(e))
+            raise
+        self._store_version(key, stat, version, "")
+        return version
+
+    def _store_version(
+        self, key: str, stat: Optional[List[int]], version: Optional[str], message: str
+    ) -> None:
+        if stat is None or self._is_racy({key: stat}):
+            return
+        with self._lock:
+            self.data["versions"][key] = {
+                "stat": stat,
+                "version": version,
+                "message": message,
+            }
+            self.dirty = True
+
+    def save(self) -> None:
+        """Write the cache back if it changed. Failures are silently ignored."""
+        if not self.dirty or self.path is None:
+            return
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.data, f)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+
+
+def read_version(check: VersionExtractor, cache: Optional[ReleaseCache] = None) -> str:
+    """check.get_version(), going through ``cache`` when one is given."""
+    if cache is None:
+        return check.get_version()
+    return cache.get_version(check)
+
+
+def discover_package_roots(
+    root_dir: Path, cache: Optional[ReleaseCache] = None
+) -> List[Path]:
     """Discover nested ROS package roots (dirs with a package.xml, root excluded).
 
     Skips hidden directories (.git, .pixi, ...), git submodules, and — inside a
@@ -750,16 +1293,67 @@ def discover_package_roots(root_dir: Path) -> List[Path]:
     handled too: each one's ignore rules are learned when its top-level is
     reached, so an ignored `output/` build tree is pruned even when `root_dir`
     itself is not a git repo.
+
+    The walk also records which repository encloses every directory (a `.git`
+    entry starts a new one), so git is spawned per repository rather than per
+    candidate package.
+
+    With a ``cache``, the result is reused as long as none of the walked
+    directories or ignore files changed (see ReleaseCache).
     """
+    if cache is not None:
+        cached_roots = cache.package_roots(root_dir)
+        if cached_roots is not None:
+            return cached_roots
+    watched: Dict[str, Optional[List[int]]] = {}
+
+    root_top = enclosing_repo_dir(root_dir)
+    if cache is not None:
+        # Rules living outside the walk: global ones, and those of the repo
+        # root_dir sits in (info/exclude, config, .gitignore of its parents).
+        outside = global_ignore_files(root_dir)
+        if root_top is not None:
+            top_git_dir = git_dir_of(root_top)
+            outside += [top_git_dir / "info" / "exclude", top_git_dir / "config"]
+            resolved_root = root_dir.resolve()
+            outside += [
+                parent / name
+                for parent in resolved_root.parents
+                if parent == root_top or root_top in parent.parents
+                for name in (".gitignore", ".gitmodules")
+            ]
+        for path in outside:
+            watched[str(path)] = file_stat_key(path)
     # Seed from root_dir's own repo (covers root being, or living inside, a repo).
-    ignored_abs = git_ignored_abs_dirs(root_dir)
+    ignored_abs = git_ignored_abs_dirs(root_dir) if root_top else set()
+    repo_of_dir: Dict[Path, Optional[Path]] = {}
+    repo_tops: Dict[Path, Optional[Path]] = {}
     candidates = []
     for dirpath, dirnames, filenames in os.walk(root_dir):
         current = Path(dirpath)
-        # A nested repo brings its own .gitignore; learn what it ignores before
-        # descending, so its build trees are pruned regardless of root_dir.
-        if current != root_dir and (current / ".git").exists():
+        if current == root_dir:
+            repo = root_top
+        elif ".git" in dirnames or ".git" in filenames:
+            # A nested repo brings its own .gitignore; learn what it ignores
+            # before descending, so its build trees are pruned regardless of
+            # root_dir.
             ignored_abs |= git_ignored_abs_dirs(current)
+            repo = current.resolve()
+        else:
+            repo = repo_of_dir[current.parent]
+        repo_of_dir[current] = repo
+        if cache is not None:
+            watched[str(current)] = file_stat_key(current)
+            for name in (".gitignore", ".gitmodules"):
+                if name in filenames:
+                    watched[str(current / name)] = file_stat_key(current / name)
+            if repo == current.resolve():
+                nested_git_dir = git_dir_of(current)
+                for path in (
+                    nested_git_dir / "info" / "exclude",
+                    nested_git_dir / "config",
+                ):
+                    watched[str(path)] = file_stat_key(path)
         kept = []
         for d in dirnames:
             if d.startswith("."):
@@ -770,9 +1364,14 @@ def discover_package_roots(root_dir: Path) -> List[Path]:
         dirnames[:] = kept
         if current != root_dir and "package.xml" in filenames:
             candidates.append(current / "package.xml")
-    candidates = drop_git_ignored(root_dir, candidates)
-    candidates = drop_submodules(root_dir, candidates)
-    return sorted({package_xml.parent for package_xml in candidates})
+            repo_tops[current / "package.xml"] = repo
+    candidates = drop_git_ignored(root_dir, candidates, repo_tops)
+    if root_top:
+        candidates = drop_submodules(root_dir, candidates, root_top)
+    package_roots = sorted({package_xml.parent for package_xml in candidates})
+    if cache is not None:
+        cache.store_package_roots(root_dir, package_roots, watched)
+    return package_roots
 
 
 def build_root_checks(root_dir: Path) -> List[VersionExtractor]:
@@ -789,7 +1388,9 @@ def build_root_checks(root_dir: Path) -> List[VersionExtractor]:
     ]
 
 
-def collect_version_checks(root_dir: Path) -> List[VersionExtractor]:
+def collect_version_checks(
+    root_dir: Path, cache: Optional[ReleaseCache] = None
+) -> List[VersionExtractor]:
     """Root checks plus the same set of checks for each nested package.
 
     Each nested package is treated exactly like the repository root: the same
@@ -799,7 +1400,7 @@ def collect_version_checks(root_dir: Path) -> List[VersionExtractor]:
     checks = list(build_root_checks(root_dir))
     seen_paths = {check.file_path for check in checks}
 
-    for package_root in discover_package_roots(root_dir):
+    for package_root in discover_package_roots(root_dir, cache):
         for check in build_root_checks(package_root):
             if check.file_path in seen_paths:
                 continue
@@ -816,14 +1417,26 @@ def collect_version_checks(root_dir: Path) -> List[VersionExtractor]:
     return checks
 
 
+def positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"'{value}' is not a positive integer.")
+    return number
+
+
 def validate_semver(version: str) -> str:
+    from packaging.version import parse as parse_version, InvalidVersion
+
     try:
         parsed = parse_version(version)
         return str(parsed)
-    except InvalidVersion:
+    except InvalidVersion as e:
         raise argparse.ArgumentTypeError(
             f"'{version}' is not a valid Semantic Version."
-        )
+        ) from e
 
 
 def parse_semver(version: str) -> Tuple[int, int, int]:
@@ -850,6 +1463,7 @@ def bump_version(version: str, bump_type: str) -> str:
 
 def collect_versions(
     checks: List[VersionExtractor],
+    cache: Optional[ReleaseCache] = None,
 ) -> Tuple[set, List[str]]:
     """Collect distinct versions and parse errors across all files. No console output."""
     versions: set = set()
@@ -857,7 +1471,7 @@ def collect_versions(
     for check in checks:
         if check.check_file_exists():
             try:
-                versions.add(check.get_version())
+                versions.add(read_version(check, cache))
             except VersionNotPresent:
                 pass  # file exists but has no version configured; skip
             except Exception as e:
@@ -888,9 +1502,11 @@ def report_version_problems(versions: set, errors: List[str]) -> None:
         )
 
 
-def get_current_version(checks: List[VersionExtractor]) -> Optional[str]:
+def get_current_version(
+    checks: List[VersionExtractor], cache: Optional[ReleaseCache] = None
+) -> Optional[str]:
     """Consensus version across all files, reporting any problems."""
-    versions, errors = collect_versions(checks)
+    versions, errors = collect_versions(checks, cache)
     report_version_problems(versions, errors)
     return next(iter(versions)) if len(versions) == 1 else None
 
@@ -921,6 +1537,8 @@ def show_version_diff(
     old_version: str, new_version: str, bump_type: Optional[str] = None
 ) -> None:
     """Display a visual diff between old and new versions."""
+    from rich.panel import Panel
+
     old_parts = old_version.split(".")
     new_parts = new_version.split(".")
 
@@ -928,7 +1546,7 @@ def show_version_diff(
     old_colored_parts = []
     new_colored_parts = []
 
-    for old, new in zip(old_parts, new_parts):
+    for old, new in zip(old_parts, new_parts, strict=False):
         if old != new:
             old_colored_parts.append(f"[{STYLE_OLD_VALUE}]{old}[/{STYLE_OLD_VALUE}]")
             new_colored_parts.append(f"[{STYLE_NEW_VALUE}]{new}[/{STYLE_NEW_VALUE}]")
@@ -1026,22 +1644,103 @@ def run_git_command(args: List[str], cwd: Path) -> Tuple[bool, str]:
         return False, "git command not found"
 
 
+class GitSession:
+    """Repository facts shared by the git operations of one run.
+
+    Commit, tag, push and archive used to rediscover the repository with a
+    ``git`` process each. A session asks once and keeps the answers: whether
+    this is a repository (one ``rev-parse``), existing tags (one
+    ``for-each-ref``, kept up to date by create_tag()) and config (one
+    ``config --list``). Commands that change the working tree or the index are
+    never cached.
+    """
+
+    def __init__(self, root_dir: Path):
+        self.root_dir = root_dir
+        self._is_repo: Optional[bool] = None
+        self._tags: Optional[set] = None
+        self._config: Optional[Dict[str, str]] = None
+
+    def run(self, args: List[str]) -> Tuple[bool, str]:
+        return run_git_command(args, self.root_dir)
+
+    @property
+    def is_repo(self) -> bool:
+        if self._is_repo is None:
+            self._is_repo, _ = self.run(["rev-parse", "--git-dir"])
+        return self._is_repo
+
+    @property
+    def tags(self) -> set:
+        """Names of the existing tags."""
+        if self._tags is None:
+            ok, out = self.run(
+                ["for-each-ref", "--format=%(refname:strip=2)", "refs/tags"]
+            )
+            self._tags = set(out.split()) if ok else set()
+        return self._tags
+
+    def has_tag(self, tag_name: str) -> bool:
+        return tag_name in self.tags
+
+    def config(self, key: str) -> Optional[str]:
+        """Value of a git config ``key`` (all keys are read in one call)."""
+        if self._config is None:
+            ok, out = self.run(["config", "--list", "-z"])
+            self._config = {}
+            for record in out.split("\0") if ok else []:
+                name, _, value = record.partition("\n")
+                if name:
+                    self._config[name] = value
+        return self._config.get(key)
+
+    def resolve(self, revisions: List[str]) -> Dict[str, Optional[str]]:
+        """Object names of ``revisions`` (None when missing), in one process."""
+        if not revisions:
+            return {}
+        try:
+            result = subprocess.run(
+                ["git", "cat-file", "--batch-check=%(objectname)"],
+                cwd=self.root_dir,
+                input="".join(f"{rev}\n" for rev in revisions),
+                capture_output=True,
+                text=True,
+            )
+        except (FileNotFoundError, OSError):
+            return {rev: None for rev in revisions}
+        if result.returncode != 0:
+            return {rev: None for rev in revisions}
+        answers = result.stdout.splitlines()
+        return {
+            rev: None if answer.endswith(" missing") else answer
+            for rev, answer in zip(revisions, answers, strict=True)
+        }
+
+    def create_tag(self, args: List[str], tag_name: str) -> Tuple[bool, str]:
+        success, output = self.run(["tag", *args])
+        if success and self._tags is not None:
+            self._tags.add(tag_name)
+        return success, output
+
+
 def git_commit_version(
     root_dir: Path,
     version: str,
     auto_confirm: bool,
     custom_message: Optional[str] = None,
     files_to_stage: Optional[List[str]] = None,
+    session: Optional[GitSession] = None,
 ) -> bool:
     """Commit version changes to git."""
-    success, _ = run_git_command(["rev-parse", "--git-dir"], root_dir)
-    if not success:
+    if session is None:
+        session = GitSession(root_dir)
+    if not session.is_repo:
         console.print(
             f"[{STYLE_WARNING}]Not a git repository, skipping git commit.[/{STYLE_WARNING}]"
         )
         return False
 
-    _, status_output = run_git_command(["status", "--porcelain"], root_dir)
+    _, status_output = session.run(["status", "--porcelain"])
     if not status_output:
         console.print(f"[{STYLE_WARNING}]No changes to commit.[/{STYLE_WARNING}]")
         return False
@@ -1053,7 +1752,7 @@ def git_commit_version(
     )
 
     if not auto_confirm:
-        confirmed = Confirm.ask(
+        confirmed = confirm(
             f"[bold]Commit changes with message: '{commit_message}'?[/bold]",
             default=True,
         )
@@ -1064,13 +1763,13 @@ def git_commit_version(
     if files_to_stage:
         rel_paths = [str(Path(p).relative_to(root_dir)) for p in files_to_stage]
         console.print(f"[{STYLE_MUTED}]$ git add {' '.join(rel_paths)}[/{STYLE_MUTED}]")
-        run_git_command(["add"] + files_to_stage, root_dir)
+        session.run(["add"] + files_to_stage)
     else:
         console.print(f"[{STYLE_MUTED}]$ git add -u[/{STYLE_MUTED}]")
-        run_git_command(["add", "-u"], root_dir)
+        session.run(["add", "-u"])
 
     console.print(f"[{STYLE_MUTED}]$ git commit -m '{commit_message}'[/{STYLE_MUTED}]")
-    success, output = run_git_command(["commit", "-m", commit_message], root_dir)
+    success, output = session.run(["commit", "-m", commit_message])
     if success:
         console.print(
             f"[{STYLE_SUCCESS}]✓ Committed changes: {commit_message}[/{STYLE_SUCCESS}]"
@@ -1088,14 +1787,16 @@ def git_tag_version(
     custom_tag_name: Optional[str] = None,
     custom_tag_message: Optional[str] = None,
     sign: bool = False,
+    session: Optional[GitSession] = None,
 ) -> Tuple[bool, str]:
     """Create a git tag for the version.
 
     When ``sign`` is True the tag is GPG-signed (``git tag -s``); otherwise an
     annotated tag is created (``git tag -a``).
     """
-    success, _ = run_git_command(["rev-parse", "--git-dir"], root_dir)
-    if not success:
+    if session is None:
+        session = GitSession(root_dir)
+    if not session.is_repo:
         console.print(
             f"[{STYLE_WARNING}]Not a git repository, skipping git tag.[/{STYLE_WARNING}]"
         )
@@ -1110,17 +1811,14 @@ def git_tag_version(
         else f"Release version {version}"
     )
 
-    success, _ = run_git_command(["rev-parse", tag_name], root_dir)
-    if success:
+    if session.has_tag(tag_name):
         console.print(
             f"[{STYLE_WARNING}]Tag {tag_name} already exists.[/{STYLE_WARNING}]"
         )
         return False, ""
 
     if not auto_confirm:
-        confirmed = Confirm.ask(
-            f"[bold]Create git tag '{tag_name}'?[/bold]", default=True
-        )
+        confirmed = confirm(f"[bold]Create git tag '{tag_name}'?[/bold]", default=True)
         if not confirmed:
             console.print(f"[{STYLE_WARNING}]Git tag skipped.[/{STYLE_WARNING}]")
             return False
@@ -1129,8 +1827,8 @@ def git_tag_version(
     console.print(
         f"[{STYLE_MUTED}]$ git tag {tag_flag} {tag_name} -m '{tag_message}'[/{STYLE_MUTED}]"
     )
-    success, output = run_git_command(
-        ["tag", tag_flag, tag_name, "-m", tag_message], root_dir
+    success, output = session.create_tag(
+        [tag_flag, tag_name, "-m", tag_message], tag_name
     )
     if success:
         console.print(f"[{STYLE_SUCCESS}]✓ Created tag: {tag_name}[/{STYLE_SUCCESS}]")
@@ -1140,11 +1838,18 @@ def git_tag_version(
         return False, ""
 
 
-def push_tag(root_dir: Path, tag_name: str, project_url: str) -> bool:
+def push_tag(
+    root_dir: Path,
+    tag_name: str,
+    project_url: str,
+    session: Optional[GitSession] = None,
+) -> bool:
+    if session is None:
+        session = GitSession(root_dir)
     url = project_url.replace(GITHUB_URL, "git@github.com:")
     git_args = ["push", url, tag_name]
     console.print(f"[{STYLE_MUTED}]$ git {' '.join(git_args)}")
-    success, output = run_git_command(git_args, cwd=root_dir)
+    success, output = session.run(git_args)
     if success:
         console.print(f"[{STYLE_SUCCESS}]✓ Pushed tag: {tag_name}[/{STYLE_SUCCESS}]")
     else:
@@ -1152,90 +1857,514 @@ def push_tag(root_dir: Path, tag_name: str, project_url: str) -> bool:
     return success
 
 
-def git_archive(
-    root_dir: Path, archive_name: str, tag_name: str, sign: bool = False
-) -> bool:
-    """Create a .tar.gz archive from git for the version.
+# Archive formats of --archive-format: compression and input block size.
+# Each block is compressed on its own into a complete gzip member / xz stream;
+# both formats allow concatenation, so the output stays a regular archive.
+ARCHIVE_FORMATS = {
+    "tar.gz": {"block_size": 1 << 20, "default_level": 6},
+    "tar.xz": {"block_size": 8 << 20, "default_level": 6},
+}
 
-    When ``sign`` is True, a detached GPG .tar.gz.sig file is added.
-    """
-    git_args = ["archive", "--format", "tgz", "--output", archive_name, tag_name]
-    console.print(f"[{STYLE_MUTED}]$ git {' '.join(git_args)}")
-    success, output = run_git_command(git_args, cwd=root_dir)
-    if not success:
-        console.print(
-            f"[{STYLE_ERROR}]Failed to create archive: {output}[/{STYLE_ERROR}]"
-        )
-        return False
 
-    if sign:
-        call = [
-            "gpg",
-            "--detach-sign",
-            "--armor",
-            "-o",
-            f"{archive_name}.sig",
-            archive_name,
-        ]
-        console.print(f"[{STYLE_MUTED}]$ {' '.join(call)}")
-        result = subprocess.run(call, cwd=root_dir, capture_output=True, text=True)
-        if result.returncode != 0:
-            console.print(
-                f"[{STYLE_ERROR}]Failed to sign archive: {result.stderr}[/{STYLE_ERROR}]"
-            )
-            return False
+def archive_format_of(archive_name: str) -> str:
+    """The ARCHIVE_FORMATS key matching the extension of ``archive_name``."""
+    for fmt in ARCHIVE_FORMATS:
+        if archive_name.endswith(f".{fmt}"):
+            return fmt
+    raise ValueError(f"Unsupported archive extension: {archive_name}")
 
-    return True
 
+def compress_block(data: bytes, fmt: str, level: int) -> bytes:
+    """``data`` as one self-contained gzip member or xz stream."""
+    if fmt == "tar.gz":
+        import gzip
 
-def gh_release(
-    root_dir: Path,
-    target_version: str,
-    project_url: str,
-    archive_name: str | None = None,
-    sign: bool = False,
-    dry_run: bool = False,
-) -> Tuple[bool, str]:
-    """Create a github release and return (success, output)."""
+        # mtime=0 and no file name, like `gzip -n`: output is reproducible.
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    import lzma
 
-    title = f"Release v{target_version}"
-    repo = project_url.removeprefix(GITHUB_URL)
-    call = ["gh", "release", "create", "--title", title, "--repo", repo]
+    return lzma.compress(data, format=lzma.FORMAT_XZ, preset=level)
 
-    # include latest release notes
-    changelog = root_dir / "CHANGELOG.md"
-    if changelog.is_file():
-        notes = changelog.read_text().split("\n## ")
-        if len(notes) >= 3:  # 0: header, 1: unreleased, 2: latest
-            today = datetime.date.today().isoformat()
-            call = [
-                *call,
-                "--notes",
-                notes[1].replace("[Unreleased]", f"[{target_version}] - {today}")
-                if dry_run
-                else notes[2],
-            ]
-        else:
-            console.print(
-                f"[{STYLE_WARNING}]Warning: No release notes available in CHANGELOG.md yet.[/{STYLE_WARNING}]"
-            )
 
-    call = [*call, f"v{target_version}"]
+class BlockCompressor:
+    """Write-only stream compressing fixed-size blocks on a thread pool.
 
-    # include .tar.gz archive and .tar.gz.sig signature
-    if archive_name is not None:
-        call = [*call, archive_name]
-        if sign:
-            call = [*call, f"{archive_name}.sig"]
+    Blocks are handed to ``emit`` compressed and in order. At most
+    ``max_in_flight`` blocks are pending at once, which bounds memory use.
+    """
 
-    print_call = "$ '" + "' '".join(c.replace("'", "\\'") for c in call) + "'"
-    if dry_run:
-        return True, print_call
+    def __init__(self, pool, fmt: str, level: int, emit, max_in_flight: int):
+        from collections import deque
+
+        self.pool = pool
+        self.fmt = fmt
+        self.level = level
+        self.emit = emit
+        self.max_in_flight = max_in_flight
+        self.block_size = ARCHIVE_FORMATS[fmt]["block_size"]
+        self._buffer = bytearray()
+        self._in_flight = deque()
+
+    def write(self, data) -> int:
+        self._buffer += data
+        while len(self._buffer) >= self.block_size:
+            self._submit(bytes(self._buffer[: self.block_size]))
+            del self._buffer[: self.block_size]
+        return len(data)
+
+    def _submit(self, block: bytes) -> None:
+        self._in_flight.append(
+            self.pool.submit(compress_block, block, self.fmt, self.level)
+        )
+        if len(self._in_flight) >= self.max_in_flight:
+            self.emit(self._in_flight.popleft().result())
 
-    console.print(f"[{STYLE_MUTED}]$ {print_call}")
-    try:
-        result = subprocess.run(call, cwd=root_dir, capture_output=True, text=True)
-        if result.returncode != 0:
+    def close(self) -> None:
+        if self._buffer:
+            self._submit(bytes(self._buffer))
+            self._buffer.clear()
+        while self._in_flight:
+            self.emit(self._in_flight.popleft().result())
+
+
+def strip_pax_global_header(source, sink, block_size: int) -> None:
+    """Copy the tar stream ``source`` to ``sink`` without its pax global header.
+
+    ``git archive`` of a commit records the commit id in a leading pax global
+    header. Every entry already has the commit time as mtime and root
+    ownership, so without that header the output depends only on the tree
+    and the commit time. The rest of the stream is copied as is, ``block_size``
+    bytes at a time. Raises ValueError when the header cannot be read.
+    """
+    header = source.read(512)
+    if len(header) == 512 and header[156:157] == b"g":
+        try:
+            size = int(header[124:136].rstrip(b"\0 ").decode("ascii") or "0", 8)
+        except ValueError as e:
+            raise ValueError(f"bad pax global header size: {e}") from e
+        padded = -(-size // 512) * 512
+        if len(source.read(padded)) != padded:
+            raise ValueError("truncated pax global header")
+    else:
+        sink.write(header)
+    while block := source.read(block_size):
+        sink.write(block)
+
+
+def stream_archive(
+    root_dir: Path,
+    tree_ish: str,
+    output_path: Path,
+    fmt: str = "tar.gz",
+    level: Optional[int] = None,
+    jobs: Optional[int] = None,
+    sign: bool = False,
+    reproducible: bool = False,
+) -> str:
+    """Write a compressed tarball of ``tree_ish`` and return its SHA-256.
+
+    ``git archive --format tar`` is read as a stream and cut into blocks that
+    ``jobs`` threads compress concurrently (zlib and lzma release the GIL),
+    while the blocks are written in order. The SHA-256 is computed and, with
+    ``sign``, ``gpg --detach-sign`` is fed from the same compressed bytes, so
+    the archive is never read back from disk. Both files are written next to
+    their destination and renamed into place on success. The stderr of git
+    and gpg goes to temporary files, so neither can block on a full pipe.
+
+    With ``reproducible``, the commit id is left out (see
+    strip_pax_global_header()) and file modes follow git's default
+    ``tar.umask`` rather than the user's, so the archive is byte-for-byte the
+    same for any commit of the same tree and commit time.
+
+    Raises RuntimeError when git, the compressor or gpg fails.
+    """
+    options = ARCHIVE_FORMATS[fmt]
+    if level is None:
+        level = options["default_level"]
+    sig_path = output_path.with_name(output_path.name + ".sig")
+    tmp_path = output_path.with_name(f".{output_path.name}.tmp")
+    tmp_sig_path = sig_path.with_name(f".{sig_path.name}.tmp")
+    digest = hashlib.sha256()
+
+    def read_error(stderr) -> str:
+        stderr.seek(0)
+        return stderr.read().decode("utf-8", "replace").strip()
+
+    git_stderr = tempfile.TemporaryFile()
+    umask = ["-c", "tar.umask=0002"] if reproducible else []
+    git = subprocess.Popen(
+        ["git", *umask, "archive", "--format=tar", tree_ish],
+        cwd=root_dir,
+        stdout=subprocess.PIPE,
+        stderr=git_stderr,
+    )
+    gpg = None
+    gpg_stderr = None
+    if sign:
+        gpg_stderr = tempfile.TemporaryFile()
+        gpg = subprocess.Popen(
+            [
+                "gpg",
+                "--batch",
+                "--yes",
+                "--detach-sign",
+                "--armor",
+                "-o",
+                str(tmp_sig_path),
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=gpg_stderr,
+        )
+    try:
+        workers = jobs or os.cpu_count() or 1
+        tar_error = None
+        with open(tmp_path, "wb") as out, ThreadPoolExecutor(workers) as pool:
+
+            def emit(compressed: bytes) -> None:
+                out.write(compressed)
+                digest.update(compressed)
+                if gpg is not None:
+                    gpg.stdin.write(compressed)
+
+            sink = BlockCompressor(pool, fmt, level, emit, 2 * workers)
+            if not reproducible:
+                while block := git.stdout.read(options["block_size"]):
+                    sink.write(block)
+            else:
+                try:
+                    strip_pax_global_header(git.stdout, sink, options["block_size"])
+                except ValueError as e:
+                    tar_error = e
+                while git.stdout.read(1 << 16):
+                    pass  # drain git so that it can exit
+            sink.close()
+            out.flush()
+            os.fsync(out.fileno())
+
+        if git.wait() != 0:
+            raise RuntimeError(f"git archive failed: {read_error(git_stderr)}")
+        if tar_error is not None:
+            raise RuntimeError(f"invalid tar stream from git archive: {tar_error}")
+        if gpg is not None:
+            gpg.stdin.close()
+            if gpg.wait() != 0:
+                raise RuntimeError(f"gpg failed: {read_error(gpg_stderr)}")
+            os.replace(tmp_sig_path, sig_path)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        for proc in (git, gpg):
+            if proc is not None and proc.poll() is None:
+                proc.kill()
+                proc.wait()
+        for path in (tmp_path, tmp_sig_path):
+            path.unlink(missing_ok=True)
+        raise
+    finally:
+        git.stdout.close()
+        git_stderr.close()
+        if gpg is not None:
+            if not gpg.stdin.closed:
+                try:
+                    gpg.stdin.close()
+                except BrokenPipeError:
+                    pass
+            gpg_stderr.close()
+
+    return digest.hexdigest()
+
+
+def sign_file(path: Path) -> None:
+    """Write a detached armored GPG signature of ``path`` to ``<path>.sig``.
+
+    Raises RuntimeError when gpg fails.
+    """
+    sig_path = path.with_name(path.name + ".sig")
+    tmp_sig_path = sig_path.with_name(f".{sig_path.name}.tmp")
+    try:
+        result = subprocess.run(
+            [
+                "gpg",
+                "--batch",
+                "--yes",
+                "--detach-sign",
+                "--armor",
+                "-o",
+                str(tmp_sig_path),
+                str(path),
+            ],
+            capture_output=True,
+            text=True,
+        )
+    except FileNotFoundError as e:
+        raise RuntimeError("gpg failed: gpg executable not found") from e
+    if result.returncode != 0:
+        tmp_sig_path.unlink(missing_ok=True)
+        raise RuntimeError(f"gpg failed: {result.stderr.strip()}")
+    os.replace(tmp_sig_path, sig_path)
+
+
+def archive_key_context(
+    root_dir: Path, tag_name: str, commit: str, session: GitSession
+) -> str:
+    """Digest of what shapes ``git archive`` output besides the tree.
+
+    That is the attribute files living outside of the tree (the repository's
+    ``info/attributes`` and the global one), and the commit itself when an
+    ``export-subst`` attribute applies, as its placeholders expand from the
+    commit.
+    """
+    xdg_config = os.environ.get("XDG_CONFIG_HOME") or str(Path.home() / ".config")
+    global_attributes = session.config("core.attributesfile")
+    attribute_files = [
+        Path(os.path.expanduser(global_attributes))
+        if global_attributes
+        else Path(xdg_config) / "git" / "attributes"
+    ]
+    repo_dir = enclosing_repo_dir(root_dir)
+    if repo_dir is not None:
+        attribute_files.append(git_dir_of(repo_dir) / "info" / "attributes")
+
+    digest = hashlib.sha256()
+    outside_attributes = b""
+    for path in attribute_files:
+        try:
+            outside_attributes += path.read_bytes() + b"\0"
+        except OSError:
+            outside_attributes += b"\0"
+    digest.update(outside_attributes)
+
+    uses_subst = b"export-subst" in outside_attributes
+    if not uses_subst:
+        try:
+            result = subprocess.run(
+                ["git", "grep", "-q", "-e", "export-subst", tag_name, "--"]
+                + [":(glob)**/.gitattributes"],
+                cwd=root_dir,
+                capture_output=True,
+            )
+            # 1 = no match; anything else may be one, or an error: play safe.
+            uses_subst = result.returncode != 1
+        except (FileNotFoundError, OSError):
+            uses_subst = True
+    if uses_subst:
+        digest.update(commit.encode("ascii"))
+    return digest.hexdigest()[:16]
+
+
+class ArchiveCache:
+    """Content-addressed store of release archives, shared by all projects.
+
+    Entries are keyed on the git tree of the archived revision, the other
+    inputs of ``git archive`` (see archive_key_context()), the entry mtime,
+    the format and the compression level. Archives are reproducible (see
+    stream_archive()), so an entry is valid on any machine. Each entry
+    is the archive and its SHA-256 (``.sha256``). Signatures are not cached:
+    they depend on the signing key, so a reused archive is signed again.
+
+    Hits refresh the entry mtime; store() evicts least-recently-used entries
+    until the cache fits in ``max_bytes``.
+    """
+
+    DEFAULT_MAX_MIB = 2048
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_MIB << 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def default_dir() -> Path:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        return Path(base) / "jrl_release" / "archives"
+
+    @staticmethod
+    def key(tree: str, context: str, mtime: int, fmt: str, level: int) -> str:
+        return f"{tree}-{context}-{mtime}-{level}.{fmt}"
+
+    def lookup(self, key: str) -> Optional[Tuple[Path, str]]:
+        """(archive path, SHA-256) of ``key``, or None on a miss."""
+        archive = self.directory / key
+        paths = [archive, archive.with_name(key + ".sha256")]
+        try:
+            sha256 = paths[1].read_text(encoding="utf-8").strip()
+            for path in paths:
+                os.utime(path)
+        except OSError:
+            return None
+        return archive, sha256
+
+    def store(self, key: str, archive: Path, sha256: str) -> None:
+        """Copy a freshly built archive into the cache."""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            entry = self.directory / key
+            copy_file_atomic(archive, entry)
+            # Written last: an entry is complete once its checksum exists.
+            FileTransaction._replace_all(
+                {entry.with_name(key + ".sha256"): sha256.encode("ascii")}
+            )
+        except OSError:
+            return  # the cache is an optimization only
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove least-recently-used entries until the cache fits."""
+        entries: Dict[str, List[os.stat_result]] = {}
+        try:
+            with os.scandir(self.directory) as it:
+                for item in it:
+                    if item.is_file() and not item.name.startswith("."):
+                        key = item.name.removesuffix(".sha256")
+                        entries.setdefault(key, []).append(item.stat())
+        except OSError:
+            return
+        total = sum(st.st_size for stats in entries.values() for st in stats)
+        by_age = sorted(entries, key=lambda k: max(st.st_mtime for st in entries[k]))
+        for key in by_age:
+            if total <= self.max_bytes:
+                break
+            for suffix in ("", ".sha256"):
+                (self.directory / (key + suffix)).unlink(missing_ok=True)
+            total -= sum(st.st_size for st in entries[key])
+
+
+def copy_file_atomic(source: Path, destination: Path) -> None:
+    """Copy ``source`` over ``destination`` through a sibling temp file."""
+    import shutil
+
+    fd, temp_name = tempfile.mkstemp(
+        dir=destination.parent, prefix=f".{destination.name}.", suffix=".tmp"
+    )
+    os.close(fd)
+    try:
+        shutil.copyfile(source, temp_name)
+        os.replace(temp_name, destination)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+
+
+def git_archive(
+    root_dir: Path,
+    archive_name: str,
+    tag_name: str,
+    sign: bool = False,
+    session: Optional[GitSession] = None,
+    jobs: Optional[int] = None,
+    cache: Optional[ArchiveCache] = None,
+) -> bool:
+    """Create a compressed archive from git for the version.
+
+    The format follows the extension of ``archive_name`` (see
+    ARCHIVE_FORMATS). When ``sign`` is True, a detached GPG ``.sig`` file is
+    added, signed in the same pass (see stream_archive()). Entries get the
+    commit time of the tag as mtime, so the archive is reproducible and
+    ``cache`` can serve it again for any tag of the same tree (and the same
+    commit when ``export-subst`` is used).
+    """
+    if session is None:
+        session = GitSession(root_dir)
+    if session.is_repo and not session.has_tag(tag_name):
+        console.print(
+            f"[{STYLE_ERROR}]Failed to create archive: no tag named '{tag_name}'.[/{STYLE_ERROR}]"
+        )
+        return False
+    fmt = archive_format_of(archive_name)
+    level = ARCHIVE_FORMATS[fmt]["default_level"]
+    output_path = root_dir / archive_name
+
+    ok, commit_time = session.run(["log", "-1", "--format=%ct", tag_name])
+    mtime = int(commit_time) if ok and commit_time.isdigit() else None
+    key = None
+    if cache is not None and mtime is not None:
+        tree_rev, commit_rev = f"{tag_name}^{{tree}}", f"{tag_name}^{{commit}}"
+        resolved = session.resolve([tree_rev, commit_rev])
+        tree, commit = resolved.get(tree_rev), resolved.get(commit_rev)
+        if tree and commit:
+            context = archive_key_context(root_dir, tag_name, commit, session)
+            key = ArchiveCache.key(tree, context, mtime, fmt, level)
+    if key is not None and (hit := cache.lookup(key)):
+        cached, sha256 = hit
+        try:
+            copy_file_atomic(cached, output_path)
+            if sign:
+                sign_file(output_path)
+        except (OSError, RuntimeError):
+            pass  # build it instead
+        else:
+            console.print(
+                f"[{STYLE_SUCCESS}]✓ Reused cached {archive_name}[/{STYLE_SUCCESS}] [{STYLE_MUTED}]sha256 {sha256}[/{STYLE_MUTED}]"
+            )
+            return True
+
+    console.print(
+        f"[{STYLE_MUTED}]$ git archive --format tar {tag_name} | {fmt} > {archive_name}"
+        + (f" (+ {archive_name}.sig)" if sign else "")
+    )
+    try:
+        sha256 = stream_archive(
+            root_dir, tag_name, output_path, fmt, level, jobs, sign, mtime is not None
+        )
+    except (OSError, RuntimeError) as e:
+        console.print(f"[{STYLE_ERROR}]Failed to create archive: {e}[/{STYLE_ERROR}]")
+        return False
+    if key is not None:
+        cache.store(key, output_path, sha256)
+
+    console.print(
+        f"[{STYLE_SUCCESS}]✓ Created {archive_name}[/{STYLE_SUCCESS}] [{STYLE_MUTED}]sha256 {sha256}[/{STYLE_MUTED}]"
+    )
+    return True
+
+
+def gh_release(
+    root_dir: Path,
+    target_version: str,
+    project_url: str,
+    archive_name: str | None = None,
+    sign: bool = False,
+    dry_run: bool = False,
+) -> Tuple[bool, str]:
+    """Create a github release and return (success, output)."""
+
+    title = f"Release v{target_version}"
+    repo = project_url.removeprefix(GITHUB_URL)
+    call = ["gh", "release", "create", "--title", title, "--repo", repo]
+
+    # include latest release notes
+    changelog = root_dir / "CHANGELOG.md"
+    if changelog.is_file():
+        notes = changelog.read_text().split("\n## ")
+        if len(notes) >= 3:  # 0: header, 1: unreleased, 2: latest
+            today = datetime.date.today().isoformat()
+            call = [
+                *call,
+                "--notes",
+                notes[1].replace("[Unreleased]", f"[{target_version}] - {today}")
+                if dry_run
+                else notes[2],
+            ]
+        else:
+            console.print(
+                f"[{STYLE_WARNING}]Warning: No release notes available in CHANGELOG.md yet.[/{STYLE_WARNING}]"
+            )
+
+    call = [*call, f"v{target_version}"]
+
+    # include .tar.gz archive and .tar.gz.sig signature
+    if archive_name is not None:
+        call = [*call, archive_name]
+        if sign:
+            call = [*call, f"{archive_name}.sig"]
+
+    print_call = "$ '" + "' '".join(c.replace("'", "\\'") for c in call) + "'"
+    if dry_run:
+        return True, print_call
+
+    console.print(f"[{STYLE_MUTED}]$ {print_call}")
+    try:
+        result = subprocess.run(call, cwd=root_dir, capture_output=True, text=True)
+        if result.returncode != 0:
             return False, result.stderr.strip()
         return True, result.stdout.strip()
     except subprocess.CalledProcessError as e:
@@ -1274,12 +2403,12 @@ def update_pixi_lock(root_dir: Path, dry_run: bool = False) -> Optional[str]:
             )
             raise RuntimeError(f"'pixi list' failed with exit code {result.returncode}")
 
-    except subprocess.TimeoutExpired:
+    except subprocess.TimeoutExpired as e:
         console.print(
             f"[{STYLE_ERROR}]Error: 'pixi list' command timed out[/{STYLE_ERROR}]"
         )
-        raise RuntimeError("'pixi list' command timed out after 30 seconds")
-    except FileNotFoundError:
+        raise RuntimeError("'pixi list' command timed out after 30 seconds") from e
+    except FileNotFoundError as e:
         console.print(f"[{STYLE_ERROR}]Error: 'pixi' command not found[/{STYLE_ERROR}]")
         console.print(
             f"[{STYLE_ERROR}]pixi.lock exists but 'pixi' executable is not available.[/{STYLE_ERROR}]"
@@ -1287,7 +2416,9 @@ def update_pixi_lock(root_dir: Path, dry_run: bool = False) -> Optional[str]:
         console.print(
             f"[{STYLE_INFO}]Please install pixi: https://pixi.sh[/{STYLE_INFO}]"
         )
-        raise RuntimeError("'pixi' executable not found. Install from https://pixi.sh")
+        raise RuntimeError(
+            "'pixi' executable not found. Install from https://pixi.sh"
+        ) from e
     except Exception as e:
         console.print(
             f"[{STYLE_ERROR}]Error: Failed to run 'pixi list': {e}[/{STYLE_ERROR}]"
@@ -1301,59 +2432,127 @@ def update_pixi_lock(root_dir: Path, dry_run: bool = False) -> Optional[str]:
     return str(pixi_lock_path)
 
 
-def create_backups(file_paths: List[Path]) -> Dict[Path, Path]:
-    """Create backup copies of files in a temporary directory.
-
-    Returns a mapping of original paths to backup paths.
-    """
-    backups = {}
-    temp_dir = Path(tempfile.mkdtemp(prefix="release_backup_"))
+class FileTransaction:
+    """Multi-file write that lands all new contents together.
 
-    # Index-prefix the name so files sharing a basename don't collide.
-    for index, file_path in enumerate(file_paths):
-        if file_path.exists():
-            backup_path = temp_dir / f"{index:04d}_{file_path.name}"
-            shutil.copy2(file_path, backup_path)
-            backups[file_path] = backup_path
+    Contents are staged in memory, then commit() writes each one to a
+    temporary sibling file, fsyncs it, and only once every file is safely on
+    disk moves them over the originals with os.replace(). A failure before
+    that point leaves the tree untouched, and each individual replacement is
+    atomic, so a crash never leaves a half-written file behind. Should one of
+    the replacements fail, the files already replaced get their previous
+    contents back before the error propagates.
 
-    return backups
-
-
-def restore_backups(backups: Dict[Path, Path]) -> None:
-    """Restore files from backups and cleanup temporary directory."""
-    if not backups:
-        return
+    The previous contents are kept in memory so rollback() can undo a
+    committed transaction (e.g. when a later release step fails).
+    """
 
-    # Get temp directory from first backup
-    temp_dir = None
-    for original_path, backup_path in backups.items():
-        if backup_path.exists():
-            shutil.copy2(backup_path, original_path)
-            temp_dir = backup_path.parent
+    def __init__(self):
+        self.staged: Dict[Path, str] = {}
+        self.originals: Dict[Path, bytes] = {}
+        self.committed = False
 
-    # Clean up temp directory
-    if temp_dir and temp_dir.exists():
-        shutil.rmtree(temp_dir)
+    def stage(self, file_path: Path, new_content: str) -> None:
+        if file_path not in self.originals:
+            self.originals[file_path] = file_path.read_bytes()
+        self.staged[file_path] = new_content
 
+    def commit(self) -> None:
+        self._replace_all(
+            {path: content.encode("utf-8") for path, content in self.staged.items()},
+            self.originals,
+        )
+        self.committed = True
 
-def cleanup_backups(backups: Dict[Path, Path]) -> None:
-    """Remove backup files without restoring."""
-    if not backups:
-        return
+    def rollback(self) -> None:
+        if not self.committed:
+            return
+        self._replace_all(
+            self.originals,
+            {path: content.encode("utf-8") for path, content in self.staged.items()},
+        )
+        self.committed = False
+
+    @staticmethod
+    def _replace_all(
+        contents: Dict[Path, bytes], previous: Optional[Dict[Path, bytes]] = None
+    ) -> None:
+        """Write every file of ``contents`` or, as far as possible, none.
+
+        ``previous`` holds what the files contain now; if a replacement fails,
+        the files already replaced are restored from it.
+        """
+        temp_paths: Dict[Path, Path] = {}
+        try:
+            for file_path, data in contents.items():
+                fd, temp_name = tempfile.mkstemp(
+                    prefix=f".{file_path.name}.", suffix=".tmp", dir=file_path.parent
+                )
+                temp_paths[file_path] = Path(temp_name)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                if file_path.exists():
+                    os.chmod(temp_name, stat.S_IMODE(file_path.stat().st_mode))
+        except BaseException:
+            for temp_path in temp_paths.values():
+                temp_path.unlink(missing_ok=True)
+            raise
+
+        replaced: List[Path] = []
+        try:
+            for file_path, temp_path in temp_paths.items():
+                os.replace(temp_path, file_path)
+                replaced.append(file_path)
+        except BaseException:
+            for file_path, temp_path in temp_paths.items():
+                if file_path not in replaced:
+                    temp_path.unlink(missing_ok=True)
+            if previous is not None and replaced:
+                try:
+                    FileTransaction._replace_all(
+                        {file_path: previous[file_path] for file_path in replaced}
+                    )
+                except OSError as e:
+                    console.print(
+                        f"[{STYLE_ERROR}]Could not restore "
+                        f"{', '.join(map(str, replaced))}: {e}[/{STYLE_ERROR}]"
+                    )
+            raise
+
+        # Persist the renames themselves (not supported on every platform).
+        for directory in {file_path.parent for file_path in temp_paths}:
+            try:
+                dir_fd = os.open(directory, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                os.fsync(dir_fd)
+            except OSError:
+                pass
+            finally:
+                os.close(dir_fd)
 
-    # Get temp directory from first backup
-    temp_dir = None
-    for backup_path in backups.values():
-        temp_dir = backup_path.parent
-        break
 
-    # Clean up temp directory
-    if temp_dir and temp_dir.exists():
-        shutil.rmtree(temp_dir)
+def version_files_list(checks: List[VersionExtractor]) -> List[dict]:
+    """The --list-files JSON payload."""
+    return [
+        {
+            "name": check.label,
+            "path": str(check.file_path),
+            "exists": check.check_file_exists(),
+            "type": check.__class__.__name__.replace("VersionExtractor", ""),
+        }
+        for check in checks
+    ]
 
 
 def list_version_files(checks: List[VersionExtractor]) -> None:
     """List all files that are checked for versions."""
+    from rich import box
+    from rich.table import Table
+
     table = Table(title="Version Files", box=box.ROUNDED)
     table.add_column("File", style="cyan")
     table.add_column("Path", style="dim")
@@ -1373,96 +2572,146 @@ def list_version_files(checks: List[VersionExtractor]) -> None:
     sys.exit(0)
 
 
-def handle_check_version(checks: List[VersionExtractor], args) -> bool:
-    """Handle the --check-version command.
+def scan_version(check: VersionExtractor, cache: Optional[ReleaseCache] = None) -> dict:
+    """Read the version of a single file into a --check-version result row.
 
-    Returns True if all files agree on one version, False otherwise.
+    ``elapsed_ms`` records how long the extractor took, so slow files show up
+    in the JSON report.
     """
-    results = []
-    versions_found = set()
-    errors = False
+    result = {
+        "file": check.label,
+        "version": None,
+        "status": "Unknown",
+        "message": "",
+    }
 
-    if not args.short:
-        console.print(
-            f"[{STYLE_INFO}]Checking versions in {args.root}...[/{STYLE_INFO}]"
-        )
+    start = time.perf_counter()
+    if not check.check_file_exists():
+        result["status"] = "Missing"
+        result["message"] = "File not found"
+    else:
+        try:
+            result["version"] = read_version(check, cache)
+            result["status"] = "Found"
+        except VersionNotPresent as e:
+            result["status"] = "Warning"
+            result["message"] = str(e)
+        except Exception as e:
+            result["status"] = "Error"
+            result["message"] = str(e)
+    result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
 
-    for check in checks:
-        result = {
-            "file": check.label,
-            "version": None,
-            "status": "Unknown",
-            "message": "",
-        }
+    return result
 
-        if not check.check_file_exists():
-            result["status"] = "Missing"
-            result["message"] = "File not found"
-        else:
-            try:
-                version = check.get_version()
-                result["version"] = version
-                result["status"] = "Found"
-                versions_found.add(version)
-            except VersionNotPresent as e:
-                result["status"] = "Warning"
-                result["message"] = str(e)
-            except Exception as e:
-                result["status"] = "Error"
-                result["message"] = str(e)
-                errors = True
 
-        results.append(result)
+def scan_versions(
+    checks: List[VersionExtractor],
+    jobs: Optional[int] = None,
+    cache: Optional[ReleaseCache] = None,
+) -> List[dict]:
+    """Run scan_version() over all checks on a thread pool.
+
+    Each extractor reads its own file, so the checks are independent and can
+    be parsed concurrently. Rows are returned in the order of ``checks``
+    whatever the completion order. ``jobs`` is the number of worker threads
+    (None lets ThreadPoolExecutor pick, 1 scans sequentially).
+    """
+    if jobs == 1 or len(checks) < 2:
+        return [scan_version(check, cache) for check in checks]
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(lambda check: scan_version(check, cache), checks))
+
+
+def version_check_report(results: List[dict]) -> dict:
+    """The --check-version JSON payload for rows from scan_versions().
+
+    ``consensus_version`` is the single version found, "MISMATCH" when files
+    disagree, or None when no file carries a version. ``errors`` tells whether
+    a file failed to parse or files disagree.
+    """
+    versions_found = {res["version"] for res in results if res["status"] == "Found"}
+    errors = any(res["status"] == "Error" for res in results)
 
     consensus_version = None
     if len(versions_found) == 1:
-        consensus_version = list(versions_found)[0]
+        consensus_version = next(iter(versions_found))
     elif len(versions_found) > 1:
         errors = True
         consensus_version = "MISMATCH"
 
-    if args.output_format == "json":
-        consistent = not errors and len(versions_found) == 1
-        out_payload = {
-            "consensus_version": consensus_version,
-            "files": results,
-            "consistent": consistent,
-        }
-        print(json.dumps(out_payload, indent=2))
-        return consistent
+    return {
+        "consensus_version": consensus_version,
+        "files": results,
+        "consistent": not errors and len(versions_found) == 1,
+        "errors": errors,
+    }
 
-    # Standard Rich table output
-    table = Table(title="Version Check Summary", box=box.ROUNDED)
-    table.add_column("File", style="cyan")
-    table.add_column("Version", style="magenta")
-    table.add_column("Status", justify="center")
-    table.add_column("Details")
 
-    for res in results:
-        status_style = res["status"]
-        if res["status"] == "Found":
-            status_style = f"[{STYLE_SUCCESS}]Found[/{STYLE_SUCCESS}]"
-        elif res["status"] == "Missing":
-            status_style = f"[{STYLE_WARNING}]Missing[/{STYLE_WARNING}]"
-        elif res["status"] == "Warning":
-            status_style = f"[{STYLE_WARNING}]Warning[/{STYLE_WARNING}]"
-        elif res["status"] == "Error":
-            status_style = f"[{STYLE_ERROR}]Error[/{STYLE_ERROR}]"
-
-        version_display = res["version"] if res["version"] else "-"
-        if res["version"]:
-            if (
-                consensus_version
-                and consensus_version != "MISMATCH"
-                and res["version"] == consensus_version
-            ):
-                version_display = f"[{STYLE_SUCCESS}]{res['version']}[/{STYLE_SUCCESS}]"
-            elif consensus_version == "MISMATCH":
-                version_display = f"[{STYLE_ERROR}]{res['version']}[/{STYLE_ERROR}]"
+def handle_check_version(
+    checks: List[VersionExtractor],
+    args,
+    cache: Optional[ReleaseCache] = None,
+    results: Optional[List[dict]] = None,
+) -> bool:
+    """Handle the --check-version command.
+
+    ``results`` are scan_versions() rows computed elsewhere (e.g. by a --serve
+    daemon); ``checks`` are scanned when they are omitted.
+
+    Returns True if all files agree on one version, False otherwise.
+    """
+    if not args.short:
+        console.print(
+            f"[{STYLE_INFO}]Checking versions in {args.root}...[/{STYLE_INFO}]"
+        )
 
-        table.add_row(res["file"], version_display, status_style, res["message"])
+    if results is None:
+        results = scan_versions(checks, getattr(args, "jobs", None), cache)
+    versions_found = {res["version"] for res in results if res["status"] == "Found"}
+    report = version_check_report(results)
+    consensus_version = report["consensus_version"]
+    errors = report["errors"]
 
+    if args.output_format == "json":
+        print(json.dumps(report, indent=2))
+        return report["consistent"]
+
+    # Standard Rich table output; --short prints plain text and skips rich.
     if not args.short:
+        from rich import box
+        from rich.table import Table
+
+        table = Table(title="Version Check Summary", box=box.ROUNDED)
+        table.add_column("File", style="cyan")
+        table.add_column("Version", style="magenta")
+        table.add_column("Status", justify="center")
+        table.add_column("Details")
+
+        for res in results:
+            status_style = res["status"]
+            if res["status"] == "Found":
+                status_style = f"[{STYLE_SUCCESS}]Found[/{STYLE_SUCCESS}]"
+            elif res["status"] == "Missing":
+                status_style = f"[{STYLE_WARNING}]Missing[/{STYLE_WARNING}]"
+            elif res["status"] == "Warning":
+                status_style = f"[{STYLE_WARNING}]Warning[/{STYLE_WARNING}]"
+            elif res["status"] == "Error":
+                status_style = f"[{STYLE_ERROR}]Error[/{STYLE_ERROR}]"
+
+            version_display = res["version"] if res["version"] else "-"
+            if res["version"]:
+                if (
+                    consensus_version
+                    and consensus_version != "MISMATCH"
+                    and res["version"] == consensus_version
+                ):
+                    version_display = (
+                        f"[{STYLE_SUCCESS}]{res['version']}[/{STYLE_SUCCESS}]"
+                    )
+                elif consensus_version == "MISMATCH":
+                    version_display = f"[{STYLE_ERROR}]{res['version']}[/{STYLE_ERROR}]"
+
+            table.add_row(res["file"], version_display, status_style, res["message"])
         console.print(table)
 
     if args.short and consensus_version and consensus_version != "MISMATCH":
@@ -1517,20 +2766,179 @@ def handle_check_version(checks: List[VersionExtractor], args) -> bool:
         return True
 
 
+def discover_workspace_repos(workspace_dir: Path) -> List[Path]:
+    """Top-level git repositories below ``workspace_dir`` (sorted).
+
+    The walk stops at the first `.git` entry on each branch: repositories
+    nested in a found one (submodules, vendored checkouts) belong to it.
+    Hidden directories are skipped.
+    """
+    repos = []
+    for dirpath, dirnames, filenames in os.walk(workspace_dir):
+        if ".git" in dirnames or ".git" in filenames:
+            repos.append(Path(dirpath))
+            dirnames[:] = []
+            continue
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+    return sorted(repos)
+
+
+def check_workspace_repo(repo_dir: Path, use_cache: bool = True) -> dict:
+    """--check-version report for one workspace repository.
+
+    Runs in a worker process. Any exception is turned into an ``error`` entry
+    so a broken repository never aborts the rest of the workspace.
+    """
+    try:
+        cache = ReleaseCache.for_root(repo_dir) if use_cache else None
+        checks = collect_version_checks(repo_dir, cache)
+        report = version_check_report(scan_versions(checks, 1, cache))
+        if cache is not None:
+            cache.save()
+        report["error"] = None
+    except Exception as e:
+        report = {
+            "consensus_version": None,
+            "files": [],
+            "consistent": False,
+            "errors": True,
+            "error": f"{type(e).__name__}: {e}",
+        }
+    return {"root": str(repo_dir), **report}
+
+
+def check_workspace(
+    workspace_dir: Path, jobs: Optional[int] = None, use_cache: bool = True
+) -> dict:
+    """Aggregated --check-version report over every repository in a workspace.
+
+    Repositories are checked concurrently in worker processes (``jobs`` of
+    them; 1 checks them in this process). Reports keep the order of
+    discover_workspace_repos().
+    """
+    repos = discover_workspace_repos(workspace_dir)
+    if jobs == 1 or len(repos) < 2:
+        reports = [check_workspace_repo(repo, use_cache) for repo in repos]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        reports = []
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [
+                executor.submit(check_workspace_repo, repo, use_cache) for repo in repos
+            ]
+            for repo, future in zip(repos, futures, strict=True):
+                try:
+                    reports.append(future.result())
+                except Exception as e:  # e.g. the worker process died
+                    reports.append(
+                        {
+                            "root": str(repo),
+                            "consensus_version": None,
+                            "files": [],
+                            "consistent": False,
+                            "error": f"{type(e).__name__}: {e}",
+                        }
+                    )
+
+    return {
+        "workspace": str(workspace_dir),
+        "consistent": bool(reports) and all(r["consistent"] for r in reports),
+        "repositories": reports,
+    }
+
+
+def handle_check_workspace(workspace_dir: Path, args) -> bool:
+    """Handle --check-version --workspace. Returns True if every repo is consistent."""
+    from rich import box
+    from rich.table import Table
+
+    if args.output_format == "text":
+        console.print(
+            f"[{STYLE_INFO}]Checking versions of repositories in {workspace_dir}...[/{STYLE_INFO}]"
+        )
+    workspace = check_workspace(workspace_dir, args.jobs, not args.no_cache)
+
+    if args.output_format == "json":
+        print(json.dumps(workspace, indent=2))
+        return workspace["consistent"]
+
+    table = Table(title="Workspace Version Check", box=box.ROUNDED)
+    table.add_column("Repository", style="cyan")
+    table.add_column("Version", style="magenta")
+    table.add_column("Status", justify="center")
+    table.add_column("Details")
+
+    for report in workspace["repositories"]:
+        try:
+            repo_label = str(Path(report["root"]).relative_to(workspace_dir))
+        except ValueError:
+            repo_label = report["root"]
+        version = report["consensus_version"]
+        if report["error"]:
+            status = f"[{STYLE_ERROR}]Error[/{STYLE_ERROR}]"
+            details = report["error"]
+        elif report["consistent"]:
+            status = f"[{STYLE_SUCCESS}]OK[/{STYLE_SUCCESS}]"
+            details = ""
+        elif version == "MISMATCH":
+            status = f"[{STYLE_ERROR}]Mismatch[/{STYLE_ERROR}]"
+            found = {f["version"] for f in report["files"] if f["status"] == "Found"}
+            details = ", ".join(sorted(found))
+        elif version is None:
+            status = f"[{STYLE_WARNING}]No version[/{STYLE_WARNING}]"
+            details = ""
+        else:
+            status = f"[{STYLE_ERROR}]Error[/{STYLE_ERROR}]"
+            details = ", ".join(
+                f"{f['file']}: {f['message']}"
+                for f in report["files"]
+                if f["status"] == "Error"
+            )
+        table.add_row(repo_label, version or "-", status, details)
+
+    console.print(table)
+
+    if not workspace["repositories"]:
+        console.print(
+            f"\n[{STYLE_ERROR_STRONG}]FAILURE:[/{STYLE_ERROR_STRONG}] No git repositories found in {workspace_dir}."
+        )
+    elif workspace["consistent"]:
+        console.print(
+            f"\n[{STYLE_SUCCESS_STRONG}]SUCCESS:[/{STYLE_SUCCESS_STRONG}] All {len(workspace['repositories'])} repositories are consistent."
+        )
+    else:
+        failed = sum(not r["consistent"] for r in workspace["repositories"])
+        console.print(
+            f"\n[{STYLE_ERROR_STRONG}]FAILURE:[/{STYLE_ERROR_STRONG}] {failed} of {len(workspace['repositories'])} repositories failed the version check."
+        )
+    return workspace["consistent"]
+
+
 def perform_version_updates(
     checks: List[VersionExtractor],
     target_version: str,
     dry_run: bool = False,
+    transaction: Optional[FileTransaction] = None,
 ) -> Tuple[List[str], List[str], bool, List[Tuple[str, str, str]]]:
     """Apply version updates to all files.
 
+    Every new file content is rendered first and nothing is written unless all
+    of them succeed; the files are then committed together through
+    ``transaction`` (a fresh FileTransaction when omitted).
+
     Returns: (updated_files, updated_file_paths, failed, dry_run_rows)
     dry_run_rows contains (name, old_version, new_version) tuples when dry_run=True.
     """
+    from rich.text import Text
+
     updated_files = []
     updated_file_paths = []
     failed = False
     dry_run_rows: List[Tuple[str, str, str]] = []
+    staged_checks: List[VersionExtractor] = []
+    if transaction is None:
+        transaction = FileTransaction()
 
     for check in checks:
         if check.check_file_exists():
@@ -1539,13 +2947,17 @@ def perform_version_updates(
                     curr = check.get_version()
                     dry_run_rows.append((check.label, curr, target_version))
                 else:
+                    check.preload_document()
                     try:
                         old_version = check.get_version()
                     except VersionNotPresent:
                         continue
                     except Exception:
                         old_version = "?"
-                    check.update_version(target_version)
+                    new_content = check.render_version(target_version)
+                    if new_content is not None:
+                        transaction.stage(check.file_path, new_content)
+                        staged_checks.append(check)
                     dry_run_rows.append((check.label, old_version, target_version))
                     line = Text()
                     line.append(f"  {check.label:<28}", style="cyan")
@@ -1564,6 +2976,20 @@ def perform_version_updates(
                 if not dry_run:
                     failed = True
 
+    if not dry_run and not failed:
+        try:
+            transaction.commit()
+        except OSError as e:
+            console.print(
+                f"[{STYLE_ERROR}]Failed to write updated files: {e}[/{STYLE_ERROR}]"
+            )
+            failed = True
+    for check in staged_checks:
+        if failed:
+            check.invalidate_document()
+        else:
+            check.mark_written()
+
     return updated_files, updated_file_paths, failed, dry_run_rows
 
 
@@ -1573,6 +2999,8 @@ def show_dry_run_panel(
     git_lines: List[str],
 ) -> None:
     """Display a unified dry-run preview."""
+    from rich.text import Text
+
     console.print(
         f"\n[{STYLE_WARNING_STRONG}]Dry run — no files were modified[/{STYLE_WARNING_STRONG}]"
     )
@@ -1606,6 +3034,8 @@ def show_result_panel(
     pixi_lock_updated: bool,
 ) -> None:
     """Display a polished summary of completed version updates."""
+    from rich.text import Text
+
     if pixi_lock_updated:
         line = Text()
         line.append(f"  {'pixi.lock':<28}", style="cyan")
@@ -1617,6 +3047,205 @@ def show_result_panel(
     )
 
 
+def default_socket_path(root_dir: Path) -> Path:
+    """Per-project Unix socket path used by --serve and --socket.
+
+    The socket lives in a ``jrl_release`` directory only the current user can
+    access, created in ``$XDG_RUNTIME_DIR``, else in the git directory of the
+    project, else (outside a repository) in the temporary directory. Raises
+    RuntimeError when that directory exists but is not private to the user.
+    """
+    digest = hashlib.sha1(str(root_dir.resolve()).encode("utf-8")).hexdigest()[:12]
+    repo_dir = enclosing_repo_dir(root_dir)
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        socket_dir = Path(os.environ["XDG_RUNTIME_DIR"]) / "jrl_release"
+    elif repo_dir is not None:
+        socket_dir = git_dir_of(repo_dir) / "jrl_release"
+    else:
+        uid = os.getuid() if hasattr(os, "getuid") else os.getlogin()
+        socket_dir = Path(tempfile.gettempdir()) / f"jrl_release-{uid}"
+
+    socket_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+    st = os.lstat(socket_dir)
+    if not stat.S_ISDIR(st.st_mode) or (
+        hasattr(os, "getuid")
+        and (st.st_uid != os.getuid() or st.st_mode & (stat.S_IRWXG | stat.S_IRWXO))
+    ):
+        raise RuntimeError(
+            f"{socket_dir} must be a directory only accessible by the current user"
+        )
+    return socket_dir / f"{digest}.sock"
+
+
+class ReleaseService:
+    """Warm project state answering --serve requests.
+
+    Discovery results, parsed documents and versions are kept between
+    requests. Every request re-validates them against file mtimes (see
+    ReleaseCache and VersionExtractor.document), so answers always reflect
+    the files on disk while unchanged files are never parsed again.
+
+    Requests are dicts with a ``command`` key:
+
+    - ``{"command": "check"}``: the --check-version JSON payload;
+    - ``{"command": "list"}``: the --list-files JSON payload;
+    - ``{"command": "bump", "bump": "patch"}`` or
+      ``{"command": "bump", "version": "X.Y.Z"}``, with an optional
+      ``"dry_run": true``: update all files (no git operations);
+    - ``{"command": "ping"}`` and ``{"command": "shutdown"}``.
+
+    Responses are ``{"ok": true, "root": ..., "result": ...}`` or
+    ``{"ok": false, "error": "..."}``, ``root`` being the served project so
+    clients can tell whether the daemon answers for their project. Requests
+    are handled one at a time.
+    """
+
+    def __init__(self, root_dir: Path, jobs: Optional[int] = None):
+        self.root_dir = root_dir
+        self.jobs = jobs
+        self.cache = ReleaseCache.for_root(root_dir) or ReleaseCache(None)
+        self._package_roots: Optional[List[Path]] = None
+        self._checks: List[VersionExtractor] = []
+        self._lock = threading.Lock()
+
+    def checks(self) -> List[VersionExtractor]:
+        """Current checks, rebuilt only when the set of packages changed."""
+        package_roots = discover_package_roots(self.root_dir, self.cache)
+        if package_roots != self._package_roots:
+            self._checks = collect_version_checks(self.root_dir, self.cache)
+            self._package_roots = package_roots
+        return self._checks
+
+    def handle_request(self, request: dict) -> dict:
+        with self._lock:
+            return self._handle_request(request)
+
+    def _handle_request(self, request: dict) -> dict:
+        command = request.get("command") if isinstance(request, dict) else None
+        try:
+            if command == "check":
+                results = scan_versions(self.checks(), self.jobs, self.cache)
+                result = version_check_report(results)
+            elif command == "list":
+                result = version_files_list(self.checks())
+            elif command == "bump":
+                result = self.bump(request)
+            elif command in ("ping", "shutdown"):
+                result = None
+            else:
+                return {"ok": False, "error": f"Unknown command: {command!r}"}
+        except Exception as e:
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        finally:
+            self.cache.save()
+        return {"ok": True, "root": str(self.root_dir.resolve()), "result": result}
+
+    def bump(self, request: dict) -> dict:
+        checks = self.checks()
+        versions, errors = collect_versions(checks, self.cache)
+        current_version = next(iter(versions)) if len(versions) == 1 else None
+
+        if request.get("version"):
+            target_version = request["version"]
+            if not re.match(r"^\d+\.\d+\.\d+$", target_version):
+                raise ValueError(f"Invalid SemVer '{target_version}'")
+        elif request.get("bump"):
+            if current_version is None:
+                raise ValueError(
+                    f"No consensus version to bump (found: {', '.join(sorted(versions)) or 'none'})"
+                )
+            target_version = bump_version(current_version, request["bump"])
+        else:
+            raise ValueError("bump requires a 'bump' or 'version' field")
+
+        dry_run = bool(request.get("dry_run", False))
+        transaction = FileTransaction()
+        updated_files, _, failed, _ = perform_version_updates(
+            checks, target_version, dry_run, transaction
+        )
+        if failed:
+            raise RuntimeError("Failed to update some files; no file was modified")
+        try:
+            if update_pixi_lock(self.root_dir, dry_run):
+                updated_files.append("pixi.lock")
+        except RuntimeError:
+            transaction.rollback()
+            raise
+
+        return {
+            "previous_version": current_version,
+            "new_version": target_version,
+            "updated_files": updated_files,
+            "dry_run": dry_run,
+        }
+
+
+def serve(root_dir: Path, socket_path: Path, jobs: Optional[int] = None) -> None:
+    """Answer ReleaseService requests on a Unix socket until told to shut down.
+
+    The protocol is newline-delimited JSON: each request line gets exactly one
+    response line, and a connection may carry several requests. Every
+    connection is served by its own thread, so an idle client does not hold
+    up the others.
+    """
+    import socketserver
+
+    service = ReleaseService(root_dir, jobs)
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        # Idle connections must not keep the daemon alive after shutdown.
+        daemon_threads = True
+
+    class RequestHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    response = {"ok": False, "error": f"Invalid JSON: {e}"}
+                    request = {}
+                else:
+                    response = service.handle_request(request)
+                self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+                self.wfile.flush()
+                if response["ok"] and request.get("command") == "shutdown":
+                    # shutdown() blocks until serve_forever() returns: not from here.
+                    threading.Thread(target=self.server.shutdown).start()
+                    return
+
+    if socket_path.exists():
+        if query_server(socket_path, {"command": "ping"}) is not None:
+            raise RuntimeError(f"A server is already listening on {socket_path}")
+        socket_path.unlink()  # stale socket of a dead server
+
+    with Server(str(socket_path), RequestHandler) as server:
+        console.print(
+            f"[{STYLE_INFO}]Serving {root_dir} on {socket_path}[/{STYLE_INFO}]"
+        )
+        try:
+            server.serve_forever()
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+
+def query_server(
+    socket_path: Path, request: dict, timeout: float = 30.0
+) -> Optional[dict]:
+    """Send one request to a --serve daemon. None when no server answers."""
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(socket_path))
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+        return json.loads(line)
+    except (OSError, ValueError):
+        return None
+
+
 class RichHelpAction(argparse.Action):
     def __init__(
         self,
@@ -1634,6 +3263,9 @@ class RichHelpAction(argparse.Action):
         )
 
     def __call__(self, parser, namespace, values, option_string=None):
+        from rich.markdown import Markdown
+        from rich.text import Text
+
         if parser.description:
             console.print(Markdown(parser.description))
 
@@ -1713,6 +3345,19 @@ def main():
         action="store_true",
         help="Create a .tar.gz archive of the project with git",
     )
+    parser.add_argument(
+        "--archive-format",
+        choices=list(ARCHIVE_FORMATS),
+        default="tar.gz",
+        help="Compression of --git-archive (default: tar.gz). Blocks are compressed by --jobs threads.",
+    )
+    parser.add_argument(
+        "--archive-cache-size",
+        type=int,
+        default=ArchiveCache.DEFAULT_MAX_MIB,
+        metavar="MIB",
+        help=f"Size limit of the archive cache in MiB (default: {ArchiveCache.DEFAULT_MAX_MIB}, 0 disables it).",
+    )
     parser.add_argument(
         "--sign-archive",
         action="store_true",
@@ -1724,6 +3369,25 @@ def main():
         help="Create Github release. Requires a configured gh cli.",
     )
 
+    parser.add_argument(
+        "--workspace",
+        type=Path,
+        default=None,
+        metavar="DIR",
+        help="Check every top-level git repository under DIR and report them together. Only meaningful with --check-version.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=positive_int,
+        default=None,
+        metavar="N",
+        help="Number of worker threads used to read version files, or of worker processes with --workspace (default: automatic).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the discovery/version cache kept in the git directory, nor the release archive cache.",
+    )
     parser.add_argument(
         "--short",
         action="store_true",
@@ -1760,6 +3424,21 @@ def main():
         choices=["major", "minor", "patch"],
         help="Bump the project version.",
     )
+    group.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run a daemon answering check/list/bump requests (JSON lines) on a Unix socket.",
+    )
+
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        nargs="?",
+        const=True,
+        default=None,
+        metavar="PATH",
+        help="Unix socket of the --serve daemon (default: derived from --root). With --check-version, ask a running daemon first.",
+    )
 
     parser.add_argument(
         "--check-tag",
@@ -1770,6 +3449,8 @@ def main():
     args = parser.parse_args()
 
     if args.version:
+        import importlib.metadata
+
         print(importlib.metadata.version("jrl_cmakemodules_scripts"))
         sys.exit(0)
 
@@ -1777,14 +3458,59 @@ def main():
 
     # Redirect console output to stderr for clean stdout with json/short
     global console
-    if args.short or args.output_format == "json":
-        console = Console(file=sys.stderr)
+    if args.short or args.output_format == "json" or args.serve:
+        console = LazyConsole(file=sys.stderr)
     else:
-        console = Console()
+        console = LazyConsole()
 
     if args.check_tag and not args.check_version:
         parser.error("--check-tag requires --check-version")
 
+    socket_path = None
+    if args.serve:
+        if not hasattr(socket, "AF_UNIX"):
+            console.print(
+                f"[{STYLE_ERROR}]--serve needs Unix domain sockets, unavailable on this platform.[/{STYLE_ERROR}]"
+            )
+            sys.exit(1)
+        try:
+            if isinstance(args.socket, Path):
+                socket_path = args.socket
+            else:
+                socket_path = default_socket_path(root_dir)
+            serve(root_dir, socket_path, args.jobs)
+        except (RuntimeError, OSError) as e:
+            console.print(f"[{STYLE_ERROR}]Error: {e}[/{STYLE_ERROR}]")
+            sys.exit(1)
+        sys.exit(0)
+
+    if args.socket is not None:
+        try:
+            socket_path = (
+                default_socket_path(root_dir) if args.socket is True else args.socket
+            )
+        except (RuntimeError, OSError):
+            socket_path = None  # no usable daemon socket: check in-process
+
+    if args.check_version and socket_path is not None and args.workspace is None:
+        response = query_server(socket_path, {"command": "check"})
+        # Only trust a daemon serving this very project.
+        if (
+            response is not None
+            and response.get("ok")
+            and response.get("root") == str(root_dir.resolve())
+        ):
+            results = response["result"]["files"]
+            consistent = handle_check_version([], args, results=results)
+            sys.exit(0 if consistent else 1)
+
+    if args.workspace is not None:
+        if not args.check_version:
+            parser.error("--workspace requires --check-version")
+        if args.check_tag or args.short:
+            parser.error("--workspace cannot be combined with --check-tag or --short")
+        sys.exit(0 if handle_check_workspace(args.workspace, args) else 1)
+
     if args.update_version:
         try:
             if not re.match(r"^\d+\.\d+\.\d+$", args.update_version):
@@ -1798,43 +3524,37 @@ def main():
             )
             sys.exit(1)
 
-    checks: List[VersionExtractor] = collect_version_checks(root_dir)
+    cache = None if args.no_cache else ReleaseCache.for_root(root_dir)
+    checks: List[VersionExtractor] = collect_version_checks(root_dir, cache)
+    if cache is not None:
+        cache.save()
 
     if args.list_files:
         if args.output_format == "json":
-            files_list = []
-            for check in checks:
-                files_list.append(
-                    {
-                        "name": check.label,
-                        "path": str(check.file_path),
-                        "exists": check.check_file_exists(),
-                        "type": check.__class__.__name__.replace(
-                            "VersionExtractor", ""
-                        ),
-                    }
-                )
-            print(json.dumps(files_list, indent=2))
+            print(json.dumps(version_files_list(checks), indent=2))
         else:
             list_version_files(checks)
         sys.exit(0)
 
     if args.check_version:
-        sys.exit(0 if handle_check_version(checks, args) else 1)
+        consistent = handle_check_version(checks, args, cache)
+        if cache is not None:
+            cache.save()
+        sys.exit(0 if consistent else 1)
 
     current_version = None
     new_version_str = None
 
     if args.update_version:
         new_version_str = args.update_version
-        versions, _ = collect_versions(checks)
+        versions, _ = collect_versions(checks, cache)
         current_version = next(iter(versions)) if len(versions) == 1 else None
         if not args.dry_run:
             console.print(
                 f"[{STYLE_INFO}]Updating versions to {new_version_str} in {root_dir}...[/{STYLE_INFO}]"
             )
     elif args.bump:
-        current_version = get_current_version(checks)
+        current_version = get_current_version(checks, cache)
         if not current_version:
             sys.exit(1)
 
@@ -1852,7 +3572,7 @@ def main():
         elif args.confirm:
             confirmed = True
         else:
-            confirmed = Confirm.ask(
+            confirmed = confirm(
                 f"\n[bold]Do you want to upgrade from [{STYLE_INFO}]{current_version}[/{STYLE_INFO}] to [{STYLE_NEW_VALUE}]{new_version_str}[/{STYLE_NEW_VALUE}]?[/bold]",
                 default=True,
             )
@@ -1868,34 +3588,20 @@ def main():
         sys.exit(1)
     target_version: str = new_version_str
 
-    backups = {}
-    if not args.dry_run:
-        file_paths_to_backup = [
-            check.file_path for check in checks if check.check_file_exists()
-        ]
-        backups = create_backups(file_paths_to_backup)
-        console.print(
-            f"[{STYLE_MUTED}]Created backups for {len(backups)} files[/{STYLE_MUTED}]"
-        )
-
+    transaction = FileTransaction()
     try:
         if not args.dry_run and args.output_format == "text":
             console.print()
             console.print("  [bold cyan]Files[/bold cyan]")
             console.print(f"  [dim]{'─' * 44}[/dim]")
         updated_files, updated_file_paths, failed, dry_run_rows = (
-            perform_version_updates(checks, target_version, args.dry_run)
+            perform_version_updates(checks, target_version, args.dry_run, transaction)
         )
 
         if failed:
-            if backups:
-                console.print(
-                    f"[{STYLE_WARNING}]Restoring files from backup due to failures...[/{STYLE_WARNING}]"
-                )
-                restore_backups(backups)
-                console.print(
-                    f"[{STYLE_SUCCESS}]Files restored from backup[/{STYLE_SUCCESS}]"
-                )
+            console.print(
+                f"[{STYLE_WARNING}]No files were modified due to failures.[/{STYLE_WARNING}]"
+            )
             sys.exit(1)
 
         try:
@@ -1907,27 +3613,24 @@ def main():
             console.print(
                 f"[{STYLE_ERROR}]Pixi lock update failed: {e}[/{STYLE_ERROR}]"
             )
-            if backups:
+            if transaction.committed:
                 console.print(
-                    f"[{STYLE_WARNING}]Restoring files from backup...[/{STYLE_WARNING}]"
+                    f"[{STYLE_WARNING}]Restoring original file contents...[/{STYLE_WARNING}]"
                 )
-                restore_backups(backups)
+                transaction.rollback()
                 console.print(
-                    f"[{STYLE_SUCCESS}]Files restored from backup[/{STYLE_SUCCESS}]"
+                    f"[{STYLE_SUCCESS}]Original file contents restored[/{STYLE_SUCCESS}]"
                 )
             sys.exit(1)
-
-        if backups:
-            cleanup_backups(backups)
     except Exception as e:
         console.print(f"[{STYLE_ERROR}]Unexpected error: {e}[/{STYLE_ERROR}]")
-        if backups:
+        if transaction.committed:
             console.print(
-                f"[{STYLE_WARNING}]Restoring files from backup...[/{STYLE_WARNING}]"
+                f"[{STYLE_WARNING}]Restoring original file contents...[/{STYLE_WARNING}]"
             )
-            restore_backups(backups)
+            transaction.rollback()
             console.print(
-                f"[{STYLE_SUCCESS}]Files restored from backup[/{STYLE_SUCCESS}]"
+                f"[{STYLE_SUCCESS}]Original file contents restored[/{STYLE_SUCCESS}]"
             )
         raise
 
@@ -1957,7 +3660,9 @@ def main():
             )
             sys.exit(1)
         if args.git_archive:
-            archive_name = f"{project_url.split('/')[-1]}-{target_version}.tar.gz"
+            archive_name = (
+                f"{project_url.split('/')[-1]}-{target_version}.{args.archive_format}"
+            )
 
     if args.dry_run:
         pixi_lock_would_update = (root_dir / "pixi.lock").exists()
@@ -1998,12 +3703,12 @@ def main():
 
         if args.git_archive:
             git_lines.append(
-                f"$ git archive --format tgz --output {archive_name} {tag_name}"
+                f"$ git archive --format tar {tag_name} | {args.archive_format} > {archive_name}"
             )
 
             if args.sign_archive:
                 git_lines.append(
-                    f"$ gpg --detach-sign --armor -o {archive_name}.sig {archive_name}"
+                    f"$ gpg --detach-sign --armor -o {archive_name}.sig (same pass)"
                 )
 
         if args.gh_release:
@@ -2048,7 +3753,7 @@ def main():
             console.print(
                 f"[{STYLE_WARNING_STRONG}]Warning: {archive_name} already exists ![/{STYLE_WARNING_STRONG}]"
             )
-            if Confirm.ask(
+            if confirm(
                 "[bold]Remove this file (and the .sig if it is also there) and continue ?[/bold]",
                 default=True,
             ):
@@ -2059,6 +3764,10 @@ def main():
             else:
                 sys.exit(1)
 
+        # One session for every git operation below: repository facts and
+        # tags are queried once for the whole release.
+        git_session = GitSession(root_dir)
+
         if args.git_commit is not None:
             custom_message = None if args.git_commit is True else args.git_commit
             git_commit_version(
@@ -2067,6 +3776,7 @@ def main():
                 args.confirm,
                 custom_message,
                 updated_file_paths,
+                git_session,
             )
 
         if args.git_tag is not None:
@@ -2078,15 +3788,29 @@ def main():
                 custom_tag_name,
                 args.git_tag_message,
                 args.sign_tag,
+                git_session,
             )
 
             if args.push_tag:
-                success = push_tag(root_dir, tag_name, project_url)
+                success = push_tag(root_dir, tag_name, project_url, git_session)
                 if not success:
                     sys.exit(1)
 
         if args.git_archive and archive_name:
-            success = git_archive(root_dir, archive_name, tag_name, args.sign_archive)
+            archive_cache = None
+            if not args.no_cache and args.archive_cache_size > 0:
+                archive_cache = ArchiveCache(
+                    ArchiveCache.default_dir(), args.archive_cache_size << 20
+                )
+            success = git_archive(
+                root_dir,
+                archive_name,
+                tag_name,
+                args.sign_archive,
+                git_session,
+                args.jobs,
+                archive_cache,
+            )
             if not success:
                 sys.exit(1)
 
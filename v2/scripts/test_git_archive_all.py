@@ -0,0 +1,582 @@
+#!/usr/bin/env uv run --no-project
+# /// script
+# requires-python = ">=3.10"
+# dependencies = [
+#     "pytest>=8.4.2",
+#     "pytest-mock>=3.12.0",
+# ]
+# ///
+
+"""
+Unit tests for git-archive-all.py (at the root of the repository).
+
+Run with:
+    uv run test_git_archive_all.py               # Run all tests
+    uv run test_git_archive_all.py -v            # Verbose output
+    uv run test_git_archive_all.py -k prefetch   # Run specific tests
+"""
+
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+from pathlib import Path
+
+import pytest
+
+# Import the module under test (its file name is not a valid module name)
+SCRIPT = Path(__file__).resolve().parents[2] / "git-archive-all.py"
+_spec = importlib.util.spec_from_file_location("git_archive_all", SCRIPT)
+gaa = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(gaa)
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+
+def _git(root, *args):
+    return subprocess.run(
+        ["git", *args], cwd=root, check=True, capture_output=True, text=True
+    ).stdout
+
+
+def _init_git_repo(root):
+    """Initialize a minimal git repo."""
+    root.mkdir(parents=True, exist_ok=True)
+    _git(root, "init", "-q")
+    _git(root, "config", "user.email", "t@t")
+    _git(root, "config", "user.name", "t")
+
+
+def _commit_all(root, message="commit"):
+    _git(root, "add", "-A")
+    _git(root, "commit", "-qm", message)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """A repository with regular files, an executable, a symlink and a hard link."""
+    root = tmp_path / "repo"
+    _init_git_repo(root)
+    (root / "src").mkdir()
+    (root / "src" / "a.txt").write_text("a\n")
+    (root / "src" / "big.bin").write_bytes(os.urandom(64 * 1024))
+    (root / "run.sh").write_text("#!/bin/sh\n")
+    (root / "run.sh").chmod(0o755)
+    (root / "link").symlink_to("src/a.txt")
+    os.link(root / "src" / "a.txt", root / "src" / "same.txt")
+    _commit_all(root, "init")
+    return root
+
+
+@pytest.fixture
+def superproject(tmp_path):
+    """A repository with two submodules, the second one nesting a third."""
+    libs = {}
+    for name in ("leaf", "lib_a", "lib_b"):
+        libs[name] = tmp_path / name
+        _init_git_repo(libs[name])
+        (libs[name] / "{0}.txt".format(name)).write_text(name + "\n")
+        if name == "lib_b":
+            _git(
+                libs[name],
+                "-c",
+                "protocol.file.allow=always",
+                "submodule",
+                "add",
+                "-q",
+                str(libs["leaf"]),
+                "leaf",
+            )
+        _commit_all(libs[name])
+
+    root = tmp_path / "super"
+    _init_git_repo(root)
+    (root / "main.txt").write_text("main\n")
+    for name in ("lib_a", "lib_b"):
+        _git(
+            root,
+            "-c",
+            "protocol.file.allow=always",
+            "submodule",
+            "add",
+            "-q",
+            str(libs[name]),
+            name,
+        )
+    _git(
+        root,
+        "-c",
+        "protocol.file.allow=always",
+        "submodule",
+        "update",
+        "--init",
+        "--recursive",
+        "-q",
+    )
+    _commit_all(root)
+    return root
+
+
+def _archive(root, output, **kwargs):
+    """Archive root into output (format from its extension) with prefix "p/"."""
+    archiver = gaa.GitArchiver(prefix="p/", main_repo_abspath=str(root), **kwargs)
+    archiver.create(str(output))
+    return output
+
+
+def _tar_members(archive_path):
+    """{name: (type, mode, linkname, content)} of a tar archive."""
+    members = {}
+    with tarfile.open(archive_path) as tar:
+        for member in tar.getmembers():
+            content = None
+            if member.isreg():
+                content = tar.extractfile(member).read()
+            members[member.name] = (member.type, member.mode, member.linkname, content)
+    return members
+
+
+# ============================================================================
+# TEST prefetch pipeline
+# ============================================================================
+
+
+@pytest.mark.parametrize("max_size", [1024 * 1024, 16])
+def test_prefetch_matches_serial_archive(repo, tmp_path, mocker, max_size):
+    """Prefetched entries (in memory or streamed) match the serial archive."""
+    mocker.patch.object(gaa.GitArchiver, "PREFETCH_MAX_SIZE", max_size)
+
+    serial = _tar_members(_archive(repo, tmp_path / "serial.tar"))
+    prefetched = _tar_members(_archive(repo, tmp_path / "fetch.tar", prefetch=4))
+
+    assert prefetched == serial
+    assert serial["p/link"][0] == tarfile.SYMTYPE
+    assert serial["p/run.sh"][1] == 0o755
+
+
+def test_prefetch_archives_hard_links_as_links(repo, tmp_path):
+    """As with gettarinfo, the second name of an inode is a hard link entry."""
+    members = _tar_members(_archive(repo, tmp_path / "fetch.tar", prefetch=2))
+
+    assert members["p/src/a.txt"][0] == tarfile.REGTYPE
+    assert members["p/src/same.txt"][:3] == (
+        tarfile.LNKTYPE,
+        members["p/src/a.txt"][1],
+        "p/src/a.txt",
+    )
+
+
+def test_prefetch_skips_uninitialized_submodules(repo, tmp_path):
+    """Directories read by the pipeline (e.g. empty submodules) are not archived."""
+    archiver = gaa.GitArchiver(main_repo_abspath=str(repo), prefetch=2)
+    files = [(str(repo / "src"), "src"), (str(repo / "run.sh"), "run.sh")]
+
+    entries = list(archiver.prefetch_files(files))
+
+    assert [arcname for _, arcname, _ in entries] == ["src", "run.sh"]
+    assert entries[0][2] is None
+    assert entries[1][2].data == b"#!/bin/sh\n"
+
+
+# ============================================================================
+# TEST export-ignore trie
+# ============================================================================
+
+EXCLUDE_PATTERNS = {
+    (): ["*.orig"],
+    (os.curdir,): ["build", "docs/*.md", "*.tmp"],
+    (os.curdir, "src"): ["gen*"],
+    (os.curdir, "src", "deep"): ["keep.c"],
+}
+
+EXCLUDE_CANDIDATES = [
+    "a.c",
+    "a.orig",
+    "build",
+    "docs/index.md",
+    "docs/img.png",
+    "src/x.tmp",
+    "src/generated.c",
+    "src/main.c",
+    "src/deep/keep.c",
+    "src/deep/gen.h",
+    "other/keep.c",
+    "other/gen.c",
+]
+
+
+def test_exclude_matcher_agrees_with_raw_patterns(tmp_path):
+    """The trie gives the same answers as is_file_excluded over the raw patterns."""
+    archiver = gaa.GitArchiver.__new__(gaa.GitArchiver)
+    matcher = gaa.ExcludeMatcher(EXCLUDE_PATTERNS)
+    repo_abspath = str(tmp_path)
+
+    raw = [
+        archiver.is_file_excluded(repo_abspath, f, EXCLUDE_PATTERNS)
+        for f in EXCLUDE_CANDIDATES
+    ]
+    assert [matcher.is_excluded(f) for f in EXCLUDE_CANDIDATES] == raw
+    assert dict(zip(EXCLUDE_CANDIDATES, raw)) == {
+        "a.c": False,
+        "a.orig": True,
+        "build": True,
+        "docs/index.md": True,
+        "docs/img.png": False,
+        "src/x.tmp": True,
+        "src/generated.c": True,
+        "src/main.c": False,
+        "src/deep/keep.c": True,
+        "src/deep/gen.h": True,
+        "other/keep.c": False,
+        "other/gen.c": False,
+    }
+
+
+def test_exclude_matcher_reuses_nodes():
+    """Each directory node is built once and inherits its ancestors' regexes."""
+    matcher = gaa.ExcludeMatcher(EXCLUDE_PATTERNS)
+
+    deep = matcher.node("src/deep")
+    assert matcher.node("src/deep") is deep
+    assert matcher.node("src").children["deep"] is deep
+    assert len(deep.regexes) == 4
+    assert len(matcher.node("other").regexes) == 2
+
+
+def test_archive_honors_nested_export_ignore(repo, tmp_path):
+    """.gitattributes of subdirectories only apply below them."""
+    (repo / ".gitattributes").write_text("*.sh export-ignore\n")
+    (repo / "src" / ".gitattributes").write_text("big.bin export-ignore\n")
+    (repo / "big.bin").write_text("kept\n")
+    _commit_all(repo)
+
+    members = _tar_members(_archive(repo, tmp_path / "out.tar"))
+
+    assert "p/run.sh" not in members
+    assert "p/src/big.bin" not in members
+    assert "p/big.bin" in members
+    assert "p/src/a.txt" in members
+
+
+# ============================================================================
+# TEST git check-attr
+# ============================================================================
+
+
+def test_check_attr_applies_git_semantics(repo):
+    """Macros and negation are evaluated by git."""
+    (repo / ".gitattributes").write_text(
+        "[attr]dist-only export-ignore\n"
+        "src/** export-ignore\n"
+        "src/a.txt -export-ignore\n"
+        "*.sh dist-only\n"
+    )
+    _commit_all(repo)
+    files = _git(repo, "ls-files").split()
+
+    excludes = gaa.GitAttributeExcludes(str(repo), files)
+
+    assert excludes.is_excluded("run.sh")
+    assert excludes.is_excluded("src/big.bin")
+    assert not excludes.is_excluded("src/a.txt")
+    assert not excludes.is_excluded("link")
+    assert gaa.GitAttributeExcludes.check_attr(
+        str(repo), ["src/a.txt", "run.sh"], "export-ignore", "unset"
+    ) == ["src/a.txt"]
+
+
+def test_archive_with_check_attr(repo, tmp_path):
+    """--check-attr archives honor negated export-ignore, unlike the parser."""
+    (repo / ".gitattributes").write_text(
+        "src/* export-ignore\nsrc/a.txt -export-ignore\n"
+    )
+    _commit_all(repo)
+
+    members = _tar_members(_archive(repo, tmp_path / "out.tar", check_attr=True))
+
+    assert "p/src/a.txt" in members
+    assert "p/src/big.bin" not in members
+    assert "p/run.sh" in members
+
+
+def test_check_attr_rejects_revisions(repo):
+    """check-attr reads the working tree, so it cannot archive a revision."""
+    with pytest.raises(ValueError, match="check_attr"):
+        gaa.GitArchiver(main_repo_abspath=str(repo), check_attr=True, revision="HEAD")
+
+
+# ============================================================================
+# TEST concurrent submodule listing
+# ============================================================================
+
+
+def test_walk_git_files_concurrently_keeps_serial_order(superproject):
+    """Submodules listed by several threads yield files in the serial order."""
+    serial = list(gaa.GitArchiver(main_repo_abspath=str(superproject)).walk_git_files())
+    concurrent = list(
+        gaa.GitArchiver(main_repo_abspath=str(superproject), jobs=4).walk_git_files()
+    )
+
+    assert concurrent == serial
+    assert "lib_a/lib_a.txt" in serial
+    assert "lib_b/leaf/leaf.txt" in serial
+    assert serial.index("main.txt") < serial.index("lib_a/lib_a.txt")
+    assert serial.index("lib_a/lib_a.txt") < serial.index("lib_b/lib_b.txt")
+
+
+def test_concurrent_walk_applies_parent_export_ignore(superproject):
+    """export-ignore of a repository still filters the files of its submodules."""
+    (superproject / ".gitattributes").write_text("lib_b/leaf/* export-ignore\n")
+    _commit_all(superproject)
+
+    files = list(
+        gaa.GitArchiver(main_repo_abspath=str(superproject), jobs=3).walk_git_files()
+    )
+
+    assert "lib_b/lib_b.txt" in files
+    assert not [f for f in files if f.startswith("lib_b/leaf/")]
+
+
+# ============================================================================
+# TEST archiving revisions from the object database
+# ============================================================================
+
+
+def test_object_store_reads_blobs_in_sequence(repo):
+    """One cat-file process serves successive blobs."""
+    store = gaa.GitObjectStore(str(repo / ".git"))
+    try:
+        entries = {p: sha for _, _, sha, p in store.list_tree("HEAD")}
+        size, f = store.open_blob(entries["src/big.bin"])
+        assert size == 64 * 1024
+        assert f.read(size) == (repo / "src" / "big.bin").read_bytes()
+        assert store.read_blob(entries["src/a.txt"]) == b"a\n"
+        assert store.read_blob(entries["run.sh"]) == b"#!/bin/sh\n"
+        assert store.has_commit(_git(repo, "rev-parse", "HEAD").strip())
+        assert not store.has_commit(entries["run.sh"])
+    finally:
+        store.close()
+
+
+def test_revision_archive_matches_git_archive(repo, tmp_path):
+    """Entries of a revision match `git archive`, symlinks with mode 0777."""
+    (repo / "src" / "a.txt").write_text("uncommitted\n")
+    ours = _tar_members(_archive(repo, tmp_path / "ours.tar", revision="HEAD"))
+    _git(repo, "archive", "--prefix=p/", "-o", str(tmp_path / "git.tar"), "HEAD")
+    theirs = _tar_members(tmp_path / "git.tar")
+
+    # git archive applies tar.umask (0002) to files, not to symlinks.
+    assert {name: (m[0], m[2], m[3]) for name, m in ours.items()} == {
+        name: (m[0], m[2], m[3])
+        for name, m in theirs.items()
+        if m[0] != tarfile.DIRTYPE
+    }
+    assert ours["p/link"][:3] == theirs["p/link"][:3]
+    assert ours["p/link"][:3] == (tarfile.SYMTYPE, 0o777, "src/a.txt")
+    assert ours["p/run.sh"][1] == 0o755
+    assert ours["p/src/a.txt"][3] == b"a\n"
+
+
+def test_revision_archive_from_bare_clone(superproject, tmp_path):
+    """A bare clone is archived without a working tree, submodules included."""
+    bare = tmp_path / "bare.git"
+    _git(tmp_path, "clone", "-q", "--bare", str(superproject), str(bare))
+    # The submodule repositories are absorbed in the git directory.
+    shutil.copytree(superproject / ".git" / "modules", bare / "modules")
+
+    members = _tar_members(_archive(bare, tmp_path / "out.tar", revision="HEAD"))
+
+    assert members["p/main.txt"][3] == b"main\n"
+    assert members["p/lib_a/lib_a.txt"][3] == b"lib_a\n"
+    assert members["p/lib_b/leaf/leaf.txt"][3] == b"leaf\n"
+
+
+# ============================================================================
+# TEST git without a shell
+# ============================================================================
+
+
+def test_run_git_passes_arguments_verbatim(repo):
+    """Arguments reach git unchanged: no shell splits or expands them."""
+    name = "it's a $HOME; file *.txt"
+    (repo / name).write_text("x\n")
+    _git(repo, "add", "--", name)
+
+    assert gaa.GitArchiver.run_git(["ls-files", "--", name], str(repo)) == name + "\n"
+    assert (
+        gaa.GitArchiver.run_git_shell("git rev-parse --is-inside-work-tree", str(repo))
+        == "true\n"
+    )
+    with pytest.raises(subprocess.CalledProcessError):
+        gaa.GitArchiver.run_git(
+            ["rev-parse", "--verify", "nope"], str(repo), quiet=True
+        )
+
+
+def test_stream_git_yields_records_across_chunks(repo):
+    """Records split over several reads of the pipe are reassembled."""
+    (repo / "long").mkdir()
+    names = sorted("long/{0}-{1}".format(i, "x" * 200) for i in range(500))
+    for name in names:
+        (repo / name).write_text("")
+    _git(repo, "add", "long")
+
+    records = list(gaa.GitArchiver.stream_git(["ls-files", "-z", "long"], str(repo)))
+
+    assert records == names
+
+
+def test_stream_git_raises_after_reading(repo):
+    """A failing git command raises once its output has been consumed."""
+    stream = gaa.GitArchiver.stream_git(
+        ["ls-files", "-z", "--error-unmatch", "nope"], str(repo)
+    )
+    with pytest.raises(subprocess.CalledProcessError):
+        list(stream)
+
+
+# ============================================================================
+# TEST delta archives
+# ============================================================================
+
+
+def _tree_of(directory):
+    """{relative path: content or symlink target} of the files under directory."""
+    tree = {}
+    for dirpath, _, filenames in os.walk(directory):
+        for name in filenames:
+            file_path = Path(dirpath) / name
+            rel = file_path.relative_to(directory).as_posix()
+            if file_path.is_symlink():
+                tree[rel] = os.readlink(file_path)
+            else:
+                tree[rel] = file_path.read_bytes()
+    return tree
+
+
+@pytest.mark.parametrize("ext", ["tar.gz", "zip"])
+def test_delta_archives_rebuild_the_revision(repo, tmp_path, ext):
+    """A full archive plus a delta rebuild the tree of the new revision."""
+    base = _git(repo, "rev-parse", "HEAD").strip()
+    full = _archive(repo, tmp_path / "full.{0}".format(ext), revision=base)
+    (repo / "src" / "a.txt").write_text("changed\n")
+    (repo / "src" / "same.txt").unlink()
+    (repo / "src" / "big.bin").unlink()
+    (repo / "new").mkdir()
+    (repo / "new" / "file.txt").write_text("new\n")
+    _commit_all(repo)
+
+    delta = _archive(repo, tmp_path / "delta.{0}".format(ext), base_revision=base)
+    _archive(repo, tmp_path / "head.{0}".format(ext), revision="HEAD")
+    gaa.apply_delta_archives([str(full), str(delta)], str(tmp_path / "applied"))
+    gaa.apply_delta_archives(
+        [str(tmp_path / "head.{0}".format(ext))], str(tmp_path / "head")
+    )
+
+    assert _tree_of(tmp_path / "applied") == _tree_of(tmp_path / "head")
+    assert not (tmp_path / "applied" / "p" / "src" / "big.bin").exists()
+
+
+def test_delta_archive_lists_changes_only(repo, tmp_path):
+    """A delta holds the changed files and the manifest of the deleted ones."""
+    base = _git(repo, "rev-parse", "HEAD").strip()
+    (repo / "src" / "a.txt").write_text("changed\n")
+    (repo / "run.sh").unlink()
+    _commit_all(repo)
+
+    members = _tar_members(_archive(repo, tmp_path / "delta.tar", base_revision=base))
+
+    manifest = members.pop(gaa.GitArchiver.DELTA_MANIFEST)
+    assert sorted(members) == ["p/src/a.txt", "p/src/same.txt"]
+    assert json.loads(manifest[3]) == {
+        "base": base,
+        "revision": _git(repo, "rev-parse", "HEAD").strip(),
+        "deleted": ["p/run.sh"],
+    }
+
+
+def test_apply_delta_rejects_paths_outside_the_directory(tmp_path):
+    """A manifest deleting files outside of the target directory is refused."""
+    delta = tmp_path / "evil.tar"
+    data = json.dumps({"deleted": ["../outside.txt"]}).encode("utf-8")
+    with tarfile.open(delta, "w") as tar:
+        info = tarfile.TarInfo(gaa.GitArchiver.DELTA_MANIFEST)
+        info.size = len(data)
+        tar.addfile(info, io.BytesIO(data))
+    (tmp_path / "outside.txt").write_text("keep\n")
+
+    with pytest.raises(ValueError, match="outside"):
+        gaa.apply_delta_archives([str(delta)], str(tmp_path / "out"))
+    assert (tmp_path / "outside.txt").exists()
+
+
+# ============================================================================
+# TEST checksum manifest
+# ============================================================================
+
+
+@pytest.mark.parametrize(
+    "ext, options",
+    [
+        ("tar", {}),
+        ("tar.gz", {"prefetch": 2}),
+        ("tar.xz", {"revision": "HEAD"}),
+        ("zip", {}),
+        ("zip", {"revision": "HEAD"}),
+    ],
+)
+def test_manifest_matches_archived_files(repo, tmp_path, ext, options):
+    """The json manifest lists every archived file with its size and SHA-256."""
+    output = _archive(
+        repo, tmp_path / "out.{0}".format(ext), manifest="json", **options
+    )
+    gaa.apply_delta_archives([str(output)], str(tmp_path / "x"))
+
+    with open(str(output) + ".manifest.json", encoding="utf-8") as f:
+        files = {entry["path"]: entry for entry in json.load(f)["files"]}
+
+    extracted = _tree_of(tmp_path / "x")
+    assert sorted(files) == sorted(extracted)
+    assert files["p/link"]["linkname"] == "src/a.txt"
+    for name, entry in files.items():
+        if "linkname" not in entry:
+            data = extracted[name]
+            assert entry["size"] == len(data)
+            assert entry["sha256"] == hashlib.sha256(data).hexdigest()
+    assert files["p/run.sh"]["mode"] == "0755"
+
+
+def test_sha256sums_manifest_checks_with_sha256sum(repo, tmp_path):
+    """The sha256sums manifest verifies the extracted archive."""
+    output = _archive(repo, tmp_path / "out.tar.gz", manifest="sha256sums")
+    gaa.apply_delta_archives([str(output)], str(tmp_path / "x"))
+
+    lines = Path(str(output) + ".sha256sums").read_text(encoding="utf-8").splitlines()
+    sums = dict(reversed(line.split("  ", 1)) for line in lines)
+
+    assert "p/link" not in sums
+    assert sums["p/src/same.txt"] == sums["p/src/a.txt"]
+    for name, digest in sums.items():
+        data = (tmp_path / "x" / name).read_bytes()
+        assert hashlib.sha256(data).hexdigest() == digest
+
+
+def test_manifest_rejects_unknown_format(repo):
+    with pytest.raises(ValueError, match="manifest"):
+        gaa.GitArchiver(main_repo_abspath=str(repo), manifest="md5")
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"] + sys.argv[1:]))
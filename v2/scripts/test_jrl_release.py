@@ -23,8 +23,11 @@ Run with:
     uv run test_jrl_release.py -k test_xml   # Run specific tests
 """
 
+import builtins
+import os
 import sys
 import re
+import time
 import json
 import subprocess
 import argparse
@@ -34,6 +37,7 @@ from datetime import date
 from unittest.mock import Mock
 
 import pytest
+import tomlkit
 from rich.console import Console
 
 # Import the module under test
@@ -420,6 +424,45 @@ key = "value"
     assert 'version = "2.0.0"' in updated
 
 
+def test_toml_extractor_parses_once(sample_pyproject_toml, mocker):
+    """get_version, render_version and get_url share one parsed document."""
+    load_spy = mocker.spy(tomlkit, "load")
+    extractor = release.TomlVersionExtractor(
+        sample_pyproject_toml, ["project", "version"]
+    )
+
+    assert extractor.get_version() == "1.0.0"
+    extractor.update_version("1.1.0")
+    assert extractor.get_version() == "1.1.0"
+    extractor.get_url()
+
+    assert load_spy.call_count == 1
+
+
+def test_extractor_document_reloaded_after_external_change(sample_pyproject_toml):
+    """The cached document is dropped once the file changes on disk."""
+    extractor = release.TomlVersionExtractor(
+        sample_pyproject_toml, ["project", "version"]
+    )
+    assert extractor.get_version() == "1.0.0"
+
+    sample_pyproject_toml.write_text(
+        '[project]\nname = "test-project"\nversion = "10.0.0"\n', encoding="utf-8"
+    )
+
+    assert extractor.get_version() == "10.0.0"
+
+
+def test_extractor_unwritten_render_does_not_leak(sample_pyproject_toml):
+    """A rendered but never written document does not change get_version."""
+    extractor = release.TomlVersionExtractor(
+        sample_pyproject_toml, ["project", "version"]
+    )
+    extractor.render_version("9.9.9")
+
+    assert extractor.get_version() == "1.0.0"
+
+
 # ============================================================================
 # TEST YamlVersionExtractor
 # ============================================================================
@@ -613,6 +656,44 @@ project(
     assert '"2.5.0"' not in content
 
 
+def test_cmake_extractor_fallback_set_after_project(tmp_path):
+    """A fallback set() after project(VERSION ${...}) is still found."""
+    content = """cmake_minimum_required(VERSION 3.22)
+project(TestProject VERSION ${PROJECT_VERSION} LANGUAGES NONE)
+set(PROJECT_VERSION 1.2.3)
+"""
+    file_path = tmp_path / "CMakeLists.txt"
+    file_path.write_text(content, encoding="utf-8")
+
+    extractor = release.CMakeListsVersionExtractor(file_path)
+    assert extractor.get_version() == "1.2.3"
+
+    extractor.update_version("1.2.4")
+    assert "set(PROJECT_VERSION 1.2.4)" in file_path.read_text(encoding="utf-8")
+    assert release.CMakeListsVersionExtractor(file_path).get_version() == "1.2.4"
+
+
+def test_cmake_extractor_first_fallback_set_wins(tmp_path):
+    """With several set(PROJECT_VERSION), get and render agree on the first one."""
+    content = """cmake_minimum_required(VERSION 3.22)
+set(PROJECT_VERSION 1.0.0)
+set(PROJECT_VERSION 2.0.0)
+project(TestProject VERSION ${PROJECT_VERSION} LANGUAGES NONE)
+"""
+    file_path = tmp_path / "CMakeLists.txt"
+    file_path.write_text(content, encoding="utf-8")
+
+    extractor = release.CMakeListsVersionExtractor(file_path)
+    assert extractor.get_version() == "1.0.0"
+    assert extractor._get_version_parsed() == "1.0.0"
+
+    extractor.update_version("1.0.1")
+    content = file_path.read_text(encoding="utf-8")
+    assert "set(PROJECT_VERSION 1.0.1)" in content
+    assert "set(PROJECT_VERSION 2.0.0)" in content
+    assert release.CMakeListsVersionExtractor(file_path).get_version() == "1.0.1"
+
+
 def test_cmake_extractor_no_version_found(tmp_path):
     """Test CMakeListsVersionExtractor raises error when no version found."""
     content = """cmake_minimum_required(VERSION 3.10)
@@ -661,6 +742,58 @@ add_library(mylib src/lib.cpp)
     assert "VERSION 1.5.3" in content
 
 
+def test_cmake_extractor_stops_at_first_project(tmp_path, mocker):
+    """Reading stops at project(): the rest of the listfile is never consumed."""
+    header = """cmake_minimum_required(VERSION 3.22)
+#[[ a bracket comment
+    with project(Fake VERSION 0.0.1) inside ]]
+set(PROJECT_VERSION 7.0.0)
+project(
+  TestProject # trailing comment
+  DESCRIPTION "Parens ( and \\"quotes\\" in a string"
+  VERSION ${PROJECT_VERSION}
+)
+"""
+    # An unterminated call after project() would break a full parse.
+    file_path = tmp_path / "CMakeLists.txt"
+    file_path.write_text(header + "add_library(broken\n", encoding="utf-8")
+    parse_spy = mocker.spy(release.CMakeListsVersionExtractor, "_get_version_parsed")
+
+    extractor = release.CMakeListsVersionExtractor(file_path)
+
+    assert extractor.get_version() == "7.0.0"
+    assert parse_spy.call_count == 0
+
+
+def test_iter_cmake_commands_is_lazy():
+    """Commands are yielded as soon as their closing parenthesis is read."""
+    consumed = []
+
+    def lines():
+        for line in [
+            "project(A\n",
+            '  VERSION "1.2.3")\n',
+            "message([=[unused]=])\n",
+        ]:
+            consumed.append(line)
+            yield line
+
+    commands = release.iter_cmake_commands(lines())
+
+    assert next(commands) == ("project", ["A", "VERSION", "1.2.3"])
+    assert len(consumed) == 2
+    assert next(commands) == ("message", ["unused"])
+
+
+@pytest.mark.parametrize(
+    "content", ['project(A VERSION "1.0.0\n', "project(A VERSION 1.0.0\n", ")\n"]
+)
+def test_iter_cmake_commands_rejects_malformed(content):
+    """Unterminated strings/invocations and stray parentheses raise ValueError."""
+    with pytest.raises(ValueError):
+        list(release.iter_cmake_commands([content]))
+
+
 # ============================================================================
 # TEST DebianChangelogVersionExtractor
 # ============================================================================
@@ -669,10 +802,8 @@ add_library(mylib src/lib.cpp)
 # A simple mock function that matches the signature of jrl_release's real run_git_command
 # This is used to monkeypatch the jrl_release module to ensure environment repeatability
 def mock_run_git_command(args, cwd):
-    if "user.name" in args:
-        return True, "Jane Doe"
-    if "user.email" in args:
-        return True, "jane.doe@example.com"
+    if args[:2] == ["config", "--list"]:
+        return True, "user.name\nJane Doe\0user.email\njane.doe@example.com\0"
     return False, ""
 
 
@@ -1149,7 +1280,7 @@ def test_git_tag_version_success(mocker, tmp_path, capsys):
     mock_run = mocker.patch("jrl_release.run_git_command")
     mock_run.side_effect = [
         (True, ""),  # rev-parse --git-dir
-        (False, ""),  # rev-parse v1.2.3 (tag doesn't exist)
+        (True, "v1.2.2"),  # for-each-ref refs/tags (tag doesn't exist)
         (True, "tag created"),  # tag -a
     ]
 
@@ -1168,7 +1299,7 @@ def test_git_tag_version_signed(mocker, tmp_path, capsys):
     mock_run = mocker.patch("jrl_release.run_git_command")
     mock_run.side_effect = [
         (True, ""),  # rev-parse --git-dir
-        (False, ""),  # rev-parse v1.2.3 (tag doesn't exist)
+        (True, "v1.2.2"),  # for-each-ref refs/tags (tag doesn't exist)
         (True, "tag created"),  # tag -s
     ]
 
@@ -1186,7 +1317,7 @@ def test_git_tag_version_unsigned_uses_annotated(mocker, tmp_path):
     mock_run = mocker.patch("jrl_release.run_git_command")
     mock_run.side_effect = [
         (True, ""),  # rev-parse --git-dir
-        (False, ""),  # rev-parse v1.2.3 (tag doesn't exist)
+        (True, "v1.2.2"),  # for-each-ref refs/tags (tag doesn't exist)
         (True, "tag created"),  # tag -a
     ]
 
@@ -1203,7 +1334,7 @@ def test_git_tag_version_already_exists(mocker, tmp_path, capsys):
     mock_run = mocker.patch("jrl_release.run_git_command")
     mock_run.side_effect = [
         (True, ""),  # rev-parse --git-dir
-        (True, "abc123"),  # rev-parse v1.2.3 (tag exists)
+        (True, "v1.2.2\nv1.2.3"),  # for-each-ref refs/tags (tag exists)
     ]
 
     result, _ = release.git_tag_version(tmp_path, "1.2.3", auto_confirm=True)
@@ -1218,7 +1349,7 @@ def test_git_tag_version_user_cancels(mocker, tmp_path):
     mock_run = mocker.patch("jrl_release.run_git_command")
     mock_run.side_effect = [
         (True, ""),  # rev-parse --git-dir
-        (False, ""),  # rev-parse v1.2.3 (tag doesn't exist)
+        (True, "v1.2.2"),  # for-each-ref refs/tags (tag doesn't exist)
     ]
     mock_confirm = mocker.patch("rich.prompt.Confirm.ask")
     mock_confirm.return_value = False
@@ -1228,6 +1359,233 @@ def test_git_tag_version_user_cancels(mocker, tmp_path):
     assert result is False
 
 
+def test_git_session_caches_repository_facts(tmp_path, mocker):
+    """Repository facts and tags cost one git process each for the whole run."""
+    _init_git_repo(tmp_path)
+    (tmp_path / "file.txt").write_text("content", encoding="utf-8")
+    subprocess.run(["git", "add", "."], cwd=tmp_path, check=True)
+    subprocess.run(["git", "commit", "-qm", "init"], cwd=tmp_path, check=True)
+    subprocess.run(["git", "tag", "v1.0.0"], cwd=tmp_path, check=True)
+
+    spy = mocker.spy(release, "run_git_command")
+    session = release.GitSession(tmp_path)
+
+    for _ in range(2):
+        assert session.is_repo
+        assert session.has_tag("v1.0.0")
+        assert not session.has_tag("v1.0.1")
+        assert session.config("user.name") == "t"
+    assert spy.call_count == 3  # rev-parse, for-each-ref, config --list
+
+    assert session.create_tag(["-a", "v1.0.1", "-m", "msg"], "v1.0.1")[0]
+    assert session.has_tag("v1.0.1")
+    assert spy.call_count == 4
+
+    resolved = session.resolve(["v1.0.0", "HEAD", "v9.9.9"])
+    assert resolved["v1.0.0"] == resolved["HEAD"]
+    assert resolved["v9.9.9"] is None
+
+
+def test_git_session_outside_repository(tmp_path):
+    """Outside a repository the session reports no facts."""
+    session = release.GitSession(tmp_path)
+
+    assert not session.is_repo
+    assert session.tags == set()
+
+
+@pytest.fixture
+def tagged_repo(tmp_path):
+    """A git repository with a few files committed and tagged v1.0.0."""
+    _init_git_repo(tmp_path)
+    (tmp_path / "src").mkdir()
+    for i in range(20):
+        (tmp_path / "src" / f"file{i}.txt").write_text(f"line {i}\n" * 2000)
+    subprocess.run(["git", "add", "."], cwd=tmp_path, check=True)
+    subprocess.run(["git", "commit", "-qm", "init"], cwd=tmp_path, check=True)
+    subprocess.run(["git", "tag", "v1.0.0"], cwd=tmp_path, check=True)
+    return tmp_path
+
+
+@pytest.mark.parametrize("fmt", ["tar.gz", "tar.xz"])
+def test_stream_archive_parallel_blocks(tagged_repo, tmp_path_factory, mocker, fmt):
+    """Multi-block archives are valid, identical for any --jobs, and hashed in-pass."""
+    import hashlib
+    import tarfile
+
+    mocker.patch.dict(release.ARCHIVE_FORMATS[fmt], {"block_size": 16 * 1024})
+    out_dir = tmp_path_factory.mktemp("out")
+
+    digests = []
+    for jobs in (1, 4):
+        output = out_dir / f"project-{jobs}.{fmt}"
+        digest = release.stream_archive(tagged_repo, "v1.0.0", output, fmt, jobs=jobs)
+        assert digest == hashlib.sha256(output.read_bytes()).hexdigest()
+        digests.append(digest)
+    assert digests[0] == digests[1]
+
+    with tarfile.open(out_dir / f"project-1.{fmt}") as tar:
+        content = tar.extractfile("src/file3.txt").read().decode()
+    assert content == "line 3\n" * 2000
+
+
+def test_stream_archive_failure_leaves_nothing(tagged_repo, tmp_path):
+    """An unknown revision raises and leaves no partial archive behind."""
+    output = tmp_path / "out.tar.gz"
+
+    with pytest.raises(RuntimeError, match="git archive failed"):
+        release.stream_archive(tagged_repo, "v9.9.9", output)
+
+    assert not output.exists()
+    assert not list(tmp_path.glob(".out.tar.gz*"))
+
+
+def test_stream_archive_reproducible_across_commits(tagged_repo, tmp_path):
+    """Commits of the same tree and commit time give byte-identical archives."""
+    import tarfile
+
+    date = subprocess.run(
+        ["git", "log", "-1", "--format=%cI", "v1.0.0"],
+        cwd=tagged_repo,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+    subprocess.run(
+        ["git", "commit", "-q", "--amend", "-m", "other message"],
+        cwd=tagged_repo,
+        env={**os.environ, "GIT_COMMITTER_DATE": date},
+        check=True,
+    )
+    subprocess.run(["git", "config", "tar.umask", "0077"], cwd=tagged_repo, check=True)
+
+    outputs = [tmp_path / "tag.tar.gz", tmp_path / "head.tar.gz"]
+    digests = [
+        release.stream_archive(tagged_repo, rev, output, reproducible=True)
+        for rev, output in zip(["v1.0.0", "HEAD"], outputs, strict=True)
+    ]
+    assert digests[0] == digests[1]
+
+    with tarfile.open(outputs[0]) as tar:
+        assert tar.pax_headers == {}
+        member = tar.getmember("src/file3.txt")
+    assert member.mode == 0o664
+    assert (member.uid, member.uname) == (0, "root")
+    assert member.mtime == int(
+        subprocess.run(
+            ["git", "log", "-1", "--format=%ct", "v1.0.0"],
+            cwd=tagged_repo,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    )
+
+    # Without it, git records the commit id of each revision.
+    plain = tmp_path / "plain.tar.gz"
+    release.stream_archive(tagged_repo, "HEAD", plain)
+    with tarfile.open(plain) as tar:
+        assert "comment" in tar.pax_headers
+
+
+def test_stream_archive_verbose_stderr(tagged_repo, tmp_path, monkeypatch):
+    """A git writing more than a pipe buffer to stderr does not stall the archive."""
+    import shutil
+    import tarfile
+
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    wrapper = bin_dir / "git"
+    wrapper.write_text(
+        "#!/bin/sh\n"
+        "head -c 1048576 /dev/zero | tr '\\0' w >&2\n"
+        f'exec {shutil.which("git")} "$@"\n'
+    )
+    wrapper.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    output = tmp_path / "out.tar.gz"
+
+    release.stream_archive(tagged_repo, "v1.0.0", output)
+
+    with tarfile.open(output) as tar:
+        assert tar.extractfile("src/file3.txt").read() == b"line 3\n" * 2000
+
+
+def test_git_archive_reuses_cached_archive(tagged_repo, tmp_path_factory, mocker):
+    """A second archive of the same tree is served from the cache, byte-identical."""
+    mocker.patch.object(release, "console", Console(file=StringIO()))
+    cache = release.ArchiveCache(tmp_path_factory.mktemp("cache"))
+    build = mocker.spy(release, "stream_archive")
+
+    assert release.git_archive(tagged_repo, "p-1.0.0.tar.gz", "v1.0.0", cache=cache)
+    first = (tagged_repo / "p-1.0.0.tar.gz").read_bytes()
+    (tagged_repo / "p-1.0.0.tar.gz").unlink()
+
+    # Same tree and commit time under another tag: still a hit.
+    subprocess.run(["git", "tag", "v1.0.1"], cwd=tagged_repo, check=True)
+    assert release.git_archive(tagged_repo, "p-1.0.1.tar.gz", "v1.0.1", cache=cache)
+    assert (tagged_repo / "p-1.0.1.tar.gz").read_bytes() == first
+    assert build.call_count == 1
+
+    # Signatures are not cached: a signed request signs the reused archive.
+    sign = mocker.patch.object(release, "sign_file")
+    assert release.git_archive(
+        tagged_repo, "p-1.0.1.tar.gz", "v1.0.1", sign=True, cache=cache
+    )
+    assert build.call_count == 1
+    sign.assert_called_once_with(tagged_repo / "p-1.0.1.tar.gz")
+    assert not list(cache.directory.glob("*.sig"))
+
+
+def test_archive_key_context(tagged_repo):
+    """Outside attribute files, and the commit under export-subst, change the key."""
+    session = release.GitSession(tagged_repo)
+    commit_a, commit_b = "a" * 40, "b" * 40
+
+    plain = release.archive_key_context(tagged_repo, "v1.0.0", commit_a, session)
+    assert plain == release.archive_key_context(
+        tagged_repo, "v1.0.0", commit_b, session
+    )
+
+    info = tagged_repo / ".git" / "info"
+    info.mkdir(exist_ok=True)
+    (info / "attributes").write_text("src/file1.txt export-ignore\n")
+    ignoring = release.archive_key_context(tagged_repo, "v1.0.0", commit_a, session)
+    assert ignoring != plain
+
+    (tagged_repo / ".gitattributes").write_text("src/file0.txt export-subst\n")
+    subprocess.run(["git", "add", "."], cwd=tagged_repo, check=True)
+    subprocess.run(["git", "commit", "-qm", "subst"], cwd=tagged_repo, check=True)
+    subprocess.run(["git", "tag", "v1.0.1"], cwd=tagged_repo, check=True)
+    assert release.archive_key_context(
+        tagged_repo, "v1.0.1", commit_a, session
+    ) != release.archive_key_context(tagged_repo, "v1.0.1", commit_b, session)
+
+
+def test_archive_cache_evicts_least_recently_used(tmp_path):
+    """Entries are evicted oldest-access first until the cache fits."""
+    cache = release.ArchiveCache(tmp_path / "cache", max_bytes=2500)
+    source = tmp_path / "archive"
+    source.write_bytes(b"x" * 1000)
+
+    for i, key in enumerate(["a.tar.gz", "b.tar.gz"]):
+        cache.store(key, source, "0" * 64)
+        for path in cache.directory.glob(f"{key}*"):
+            os.utime(path, (1000 + i, 1000 + i))
+    assert cache.lookup("a.tar.gz")  # refreshes "a"
+
+    cache.store("c.tar.gz", source, "0" * 64)
+
+    remaining = sorted(p.name for p in cache.directory.iterdir())
+    assert remaining == ["a.tar.gz", "a.tar.gz.sha256", "c.tar.gz", "c.tar.gz.sha256"]
+
+
+def test_archive_format_of():
+    assert release.archive_format_of("proj-1.0.0.tar.xz") == "tar.xz"
+    with pytest.raises(ValueError):
+        release.archive_format_of("proj-1.0.0.zip")
+
+
 # ============================================================================
 # TEST CLI Integration
 # ============================================================================
@@ -1320,6 +1678,47 @@ def test_cli_check_version_json_output(project_dir, mocker, capsys):
     data = json.loads(captured.out)
     assert data["consensus_version"] == "1.0.0"
     assert data["consistent"] is True
+    assert data["errors"] is False
+
+
+def test_cli_check_version_json_timings(project_dir, mocker, capsys):
+    """--check-version JSON output reports a per-file timing, in check order."""
+    mocker.patch(
+        "sys.argv",
+        [
+            "jrl_release.py",
+            "--root",
+            str(project_dir),
+            "--check-version",
+            "--output-format",
+            "json",
+            "--jobs",
+            "4",
+        ],
+    )
+
+    with pytest.raises(SystemExit):
+        release.main()
+
+    data = json.loads(capsys.readouterr().out)
+    labels = [check.label for check in release.collect_version_checks(project_dir)]
+    assert [res["file"] for res in data["files"]] == labels
+    assert all(res["elapsed_ms"] >= 0 for res in data["files"])
+
+
+@pytest.mark.parametrize("jobs", [None, 1, 8])
+def test_scan_versions_preserves_order(meta_package_dir, jobs):
+    """Concurrent scans return the same rows, in the same order, as a serial one."""
+    checks = release.collect_version_checks(meta_package_dir)
+
+    results = release.scan_versions(checks, jobs)
+
+    assert [res["file"] for res in results] == [check.label for check in checks]
+    for res, check in zip(results, checks):
+        expected = release.scan_version(check)
+        res.pop("elapsed_ms")
+        expected.pop("elapsed_ms")
+        assert res == expected
 
 
 def test_cli_check_version_short_output(project_dir, mocker, capsys):
@@ -1559,12 +1958,11 @@ def test_cli_git_commit_and_tag(project_dir, mocker, capsys):
     """Test CLI with --git-commit and --git-tag flags."""
     mock_run = mocker.patch("jrl_release.run_git_command")
     mock_run.side_effect = [
-        (True, ""),  # rev-parse --git-dir (commit check)
+        (True, ""),  # rev-parse --git-dir
         (True, "M file.txt"),  # status --porcelain
         (True, ""),  # add <files_to_stage>
         (True, "committed"),  # commit
-        (True, ""),  # rev-parse --git-dir (tag check)
-        (False, ""),  # rev-parse v1.0.1 (tag doesn't exist)
+        (True, "v1.0.0"),  # for-each-ref refs/tags (the repo check is reused)
         (True, "tagged"),  # tag -a
     ]
 
@@ -1587,6 +1985,7 @@ def test_cli_git_commit_and_tag(project_dir, mocker, capsys):
     captured = capsys.readouterr()
     assert "Committed changes" in captured.out
     assert "Created tag" in captured.out
+    assert mock_run.call_count == 6
 
 
 def test_cli_short_output(project_dir, mocker, capsys):
@@ -1779,6 +2178,50 @@ def test_discover_package_roots_skips_submodules(tmp_path):
     assert release.discover_package_roots(tmp_path) == [real_pkg]
 
 
+def test_discover_package_roots_one_git_batch_per_repo(tmp_path, mocker):
+    """Nested repos get one check-ignore batch each, with no per-package rev-parse."""
+    expected = []
+    for repo_name in ("repo_a", "repo_b"):
+        repo = tmp_path / repo_name
+        repo.mkdir()
+        _init_git_repo(repo)
+        (repo / ".gitignore").write_text("output/\n", encoding="utf-8")
+        ignored_pkg = repo / "output" / "pkg"
+        ignored_pkg.mkdir(parents=True)
+        (ignored_pkg / "package.xml").write_text(
+            "<package><version>9.9.9</version></package>", encoding="utf-8"
+        )
+        for index in range(3):
+            pkg = repo / f"pkg_{index}"
+            pkg.mkdir()
+            (pkg / "package.xml").write_text(
+                "<package><version>1.0.0</version></package>", encoding="utf-8"
+            )
+            expected.append(pkg)
+
+    run_spy = mocker.spy(release.subprocess, "run")
+
+    assert release.discover_package_roots(tmp_path) == sorted(expected)
+
+    git_calls = [call.args[0][1] for call in run_spy.call_args_list]
+    assert git_calls.count("check-ignore") == 2
+    assert "rev-parse" not in git_calls
+
+
+def test_enclosing_repo_dir(tmp_path):
+    """The closest ancestor holding a .git entry (dir or file) is the repo."""
+    assert release.enclosing_repo_dir(tmp_path) is None
+
+    _init_git_repo(tmp_path)
+    nested = tmp_path / "a" / "b"
+    nested.mkdir(parents=True)
+    assert release.enclosing_repo_dir(nested) == tmp_path.resolve()
+
+    worktree = tmp_path / "a"
+    (worktree / ".git").write_text("gitdir: elsewhere\n", encoding="utf-8")
+    assert release.enclosing_repo_dir(nested) == worktree.resolve()
+
+
 def test_git_submodule_dirs_empty_without_gitmodules(tmp_path):
     """No .gitmodules (or no repo) yields no submodule dirs."""
     assert release.git_submodule_dirs(tmp_path) == set()
@@ -1841,8 +2284,116 @@ def test_collect_version_checks_labels_are_root_relative(meta_package_dir):
     assert str(Path("pkg_a") / "CMakeLists.txt") in labels
 
 
-def test_create_backups_nested_no_collision(tmp_path):
-    """Nested files sharing a basename get distinct backups (no clobbering)."""
+def _backdate(root):
+    """Push mtimes of everything under root into the past (outside the racy window)."""
+    past = time.time_ns() - 60 * 1_000_000_000
+    for dirpath, dirnames, filenames in os.walk(root):
+        for name in dirnames + filenames:
+            os.utime(Path(dirpath) / name, ns=(past, past))
+    os.utime(root, ns=(past, past))
+
+
+def test_release_cache_outside_git_repo(tmp_path):
+    """No git repository means no cache."""
+    assert release.ReleaseCache.for_root(tmp_path) is None
+
+
+def test_release_cache_reuses_versions_until_file_changes(tmp_path, mocker):
+    """Cached versions survive a reload and are re-parsed only once the file changes."""
+    _init_git_repo(tmp_path)
+    xml = tmp_path / "package.xml"
+    xml.write_text("<package><version>1.0.0</version></package>", encoding="utf-8")
+    _backdate(tmp_path)
+
+    cache = release.ReleaseCache.for_root(tmp_path)
+    assert release.read_version(release.XmlVersionExtractor(xml), cache) == "1.0.0"
+    cache.save()
+    assert (tmp_path / ".git" / release.ReleaseCache.FILE_NAME).is_file()
+
+    cache = release.ReleaseCache.for_root(tmp_path)
+    spy = mocker.spy(release.XmlVersionExtractor, "get_version")
+    assert release.read_version(release.XmlVersionExtractor(xml), cache) == "1.0.0"
+    assert spy.call_count == 0
+
+    xml.write_text("<package><version>1.0.10</version></package>", encoding="utf-8")
+    assert release.read_version(release.XmlVersionExtractor(xml), cache) == "1.0.10"
+    assert spy.call_count == 1
+
+
+def test_release_cache_skips_racy_files(tmp_path):
+    """A file modified just now is not cached (same-tick edits would be missed)."""
+    _init_git_repo(tmp_path)
+    xml = tmp_path / "package.xml"
+    xml.write_text("<package><version>1.0.0</version></package>", encoding="utf-8")
+
+    cache = release.ReleaseCache.for_root(tmp_path)
+    release.read_version(release.XmlVersionExtractor(xml), cache)
+
+    assert cache.data["versions"] == {}
+    assert not cache.dirty
+
+
+def test_release_cache_discovery_invalidated_by_new_package(tmp_path, mocker):
+    """Discovery is served from the cache until a walked directory changes."""
+    _init_git_repo(tmp_path)
+    pkg_a = tmp_path / "pkg_a"
+    pkg_a.mkdir()
+    (pkg_a / "package.xml").write_text(
+        "<package><version>1.0.0</version></package>", encoding="utf-8"
+    )
+    _backdate(tmp_path)
+
+    cache = release.ReleaseCache.for_root(tmp_path)
+    assert release.discover_package_roots(tmp_path, cache) == [pkg_a]
+
+    walk_spy = mocker.spy(release.os, "walk")
+    assert release.discover_package_roots(tmp_path, cache) == [pkg_a]
+    assert walk_spy.call_count == 0
+
+    pkg_b = tmp_path / "pkg_b"
+    pkg_b.mkdir()
+    (pkg_b / "package.xml").write_text(
+        "<package><version>1.0.0</version></package>", encoding="utf-8"
+    )
+    assert release.discover_package_roots(tmp_path, cache) == [pkg_a, pkg_b]
+    assert walk_spy.call_count == 1
+
+
+def test_release_cache_discovery_invalidated_by_outside_ignore_rules(
+    tmp_path, monkeypatch
+):
+    """Ignore rules outside the walked tree (parent .gitignore, global) invalidate."""
+    home = tmp_path / "home"
+    (home / ".config" / "git").mkdir(parents=True)
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.delenv("XDG_CONFIG_HOME", raising=False)
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _init_git_repo(repo)
+    pkg_a = repo / "src" / "pkg_a"
+    pkg_b = repo / "src" / "pkg_b"
+    for pkg in (pkg_a, pkg_b):
+        pkg.mkdir(parents=True)
+        (pkg / "package.xml").write_text(
+            "<package><version>1.0.0</version></package>", encoding="utf-8"
+        )
+    _backdate(tmp_path)
+
+    cache = release.ReleaseCache.for_root(repo / "src")
+    assert release.discover_package_roots(repo / "src", cache) == [pkg_a, pkg_b]
+    assert cache.package_roots(repo / "src") == [pkg_a, pkg_b]
+
+    (repo / ".gitignore").write_text("src/pkg_a/\n", encoding="utf-8")
+    assert cache.package_roots(repo / "src") is None
+    assert release.discover_package_roots(repo / "src", cache) == [pkg_b]
+
+    (home / ".config" / "git" / "ignore").write_text("pkg_b/\n", encoding="utf-8")
+    assert cache.package_roots(repo / "src") is None
+    assert release.discover_package_roots(repo / "src", cache) == []
+
+
+def test_file_transaction_commit_and_rollback(tmp_path):
+    """Nested files sharing a basename are committed and rolled back independently."""
     (tmp_path / "pkg_a").mkdir()
     (tmp_path / "pkg_b").mkdir()
     a = tmp_path / "pkg_a" / "package.xml"
@@ -1850,20 +2401,437 @@ def test_create_backups_nested_no_collision(tmp_path):
     a.write_text("<version>1.0.0</version>", encoding="utf-8")
     b.write_text("<version>2.0.0</version>", encoding="utf-8")
 
-    backups = release.create_backups([a, b])
-
-    # Both originals are backed up to distinct files.
-    assert len(backups) == 2
-    assert len(set(backups.values())) == 2
+    transaction = release.FileTransaction()
+    transaction.stage(a, "<version>1.0.1</version>")
+    transaction.stage(b, "<version>2.0.1</version>")
+    assert a.read_text() == "<version>1.0.0</version>"
 
-    # Corrupt the originals, then restore and confirm each got its own content.
-    a.write_text("CORRUPT", encoding="utf-8")
-    b.write_text("CORRUPT", encoding="utf-8")
-    release.restore_backups(backups)
+    transaction.commit()
+    assert a.read_text() == "<version>1.0.1</version>"
+    assert b.read_text() == "<version>2.0.1</version>"
 
+    transaction.rollback()
     assert a.read_text() == "<version>1.0.0</version>"
     assert b.read_text() == "<version>2.0.0</version>"
 
+    # No temporary files are left next to the originals.
+    assert sorted(p.name for p in tmp_path.rglob("*") if p.is_file()) == [
+        "package.xml",
+        "package.xml",
+    ]
+
+
+def test_file_transaction_failed_write_leaves_tree_untouched(tmp_path, mocker):
+    """A failure while staging temp files replaces nothing and cleans up."""
+    a = tmp_path / "a.txt"
+    b = tmp_path / "b.txt"
+    a.write_text("old a", encoding="utf-8")
+    b.write_text("old b", encoding="utf-8")
+
+    transaction = release.FileTransaction()
+    transaction.stage(a, "new a")
+    transaction.stage(b, "new b")
+
+    real_fsync = release.os.fsync
+    calls = []
+
+    def failing_fsync(fd):
+        calls.append(fd)
+        if len(calls) == 2:
+            raise OSError("disk full")
+        real_fsync(fd)
+
+    mocker.patch("jrl_release.os.fsync", side_effect=failing_fsync)
+
+    with pytest.raises(OSError):
+        transaction.commit()
+
+    assert a.read_text() == "old a"
+    assert b.read_text() == "old b"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.txt", "b.txt"]
+    assert not transaction.committed
+
+
+def test_file_transaction_failed_replace_restores_replaced_files(tmp_path, mocker):
+    """A failure partway through the replacements restores what was replaced."""
+    a = tmp_path / "a.txt"
+    b = tmp_path / "b.txt"
+    c = tmp_path / "c.txt"
+    for path in (a, b, c):
+        path.write_text(f"old {path.stem}", encoding="utf-8")
+
+    transaction = release.FileTransaction()
+    for path in (a, b, c):
+        transaction.stage(path, f"new {path.stem}")
+
+    real_replace = release.os.replace
+    calls = []
+
+    def failing_replace(src, dst):
+        calls.append(dst)
+        if len(calls) == 2:
+            raise OSError("device busy")
+        real_replace(src, dst)
+
+    mocker.patch("jrl_release.os.replace", side_effect=failing_replace)
+
+    with pytest.raises(OSError, match="device busy"):
+        transaction.commit()
+
+    assert a.read_text() == "old a"
+    assert b.read_text() == "old b"
+    assert c.read_text() == "old c"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.txt", "b.txt", "c.txt"]
+    assert not transaction.committed
+
+
+def test_perform_version_updates_reports_failed_replace(project_dir, mocker):
+    """A failed replacement during a bump leaves every version file as it was."""
+    checks = release.build_root_checks(project_dir)
+    mocker.patch.object(release, "console", Console(file=StringIO()))
+    before = {
+        check.file_path: check.file_path.read_bytes()
+        for check in checks
+        if check.check_file_exists()
+    }
+    assert len(before) > 1
+
+    real_replace = release.os.replace
+    calls = []
+
+    def failing_replace(src, dst):
+        calls.append(dst)
+        if len(calls) == 2:
+            raise OSError("device busy")
+        real_replace(src, dst)
+
+    mocker.patch("jrl_release.os.replace", side_effect=failing_replace)
+
+    _, _, failed, _ = release.perform_version_updates(checks, "9.9.9", False)
+
+    assert failed
+    assert {path: path.read_bytes() for path in before} == before
+    assert not [p for p in project_dir.rglob("*.tmp")]
+
+
+def test_perform_version_updates_parses_each_file_once(project_dir, mocker):
+    """A bump reads and renders every file from a single parse."""
+    checks = release.build_root_checks(project_dir)
+    mocker.patch.object(release, "console", Console(file=StringIO()))
+    load_spy = mocker.spy(release.VersionExtractor, "load_document")
+    toml_spy = mocker.spy(tomlkit, "load")
+
+    release.collect_versions(checks)
+    _, _, failed, _ = release.perform_version_updates(checks, "1.2.3")
+    for check in checks:
+        if check.check_file_exists():
+            check.get_url()
+
+    assert not failed
+    # pyproject.toml + pixi.toml, and one raw read each for package.xml,
+    # CHANGELOG.md and CMakeLists.txt.
+    assert toml_spy.call_count == 2
+    assert load_spy.call_count == 3
+    assert release.collect_versions(checks) == ({"1.2.3"}, [])
+
+
+def test_perform_version_updates_reads_cmakelists_once(project_dir, mocker):
+    """get_version() and render_version() share one read of CMakeLists.txt."""
+    checks = release.build_root_checks(project_dir)
+    mocker.patch.object(release, "console", Console(file=StringIO()))
+    open_spy = mocker.spy(builtins, "open")
+
+    _, _, failed, _ = release.perform_version_updates(checks, "1.2.3")
+
+    assert not failed
+    cmake_reads = [
+        call
+        for call in open_spy.call_args_list
+        if isinstance(call.args[0], (str, Path))
+        and Path(call.args[0]).name == "CMakeLists.txt"
+        and call.args[1:2] in ((), ("r",))
+    ]
+    assert len(cmake_reads) == 1
+
+
+def test_perform_version_updates_all_or_nothing(project_dir, mocker):
+    """If one file fails to render, no file is written."""
+    checks = release.build_root_checks(project_dir)
+    before = {
+        c.file_path: c.file_path.read_text() for c in checks if c.check_file_exists()
+    }
+    mocker.patch.object(release, "console", Console(file=StringIO()))
+    mocker.patch.object(
+        release.CMakeListsVersionExtractor,
+        "render_version",
+        side_effect=RuntimeError("boom"),
+    )
+
+    _, _, failed, _ = release.perform_version_updates(checks, "1.2.3")
+
+    assert failed
+    for path, content in before.items():
+        assert path.read_text() == content
+
+
+# ============================================================================
+# TEST Workspace mode
+# ============================================================================
+
+
+@pytest.fixture
+def workspace_dir(tmp_path):
+    """Three side-by-side repositories: consistent, mismatched, and consistent."""
+    versions = {"repo_a": ("1.0.0", "1.0.0"), "repo_b": ("1.0.0", "2.0.0")}
+    versions["repo_c"] = ("3.0.0", "3.0.0")
+    for name, (xml_version, toml_version) in versions.items():
+        repo = tmp_path / name
+        repo.mkdir()
+        _init_git_repo(repo)
+        (repo / "package.xml").write_text(
+            f"<package><version>{xml_version}</version></package>", encoding="utf-8"
+        )
+        (repo / "pyproject.toml").write_text(
+            f'[project]\nversion = "{toml_version}"\n', encoding="utf-8"
+        )
+    # A repository nested inside repo_a belongs to repo_a.
+    nested = tmp_path / "repo_a" / "vendor" / "dep"
+    nested.mkdir(parents=True)
+    _init_git_repo(nested)
+    return tmp_path
+
+
+def test_discover_workspace_repos(workspace_dir):
+    """Only top-level repositories are returned, sorted."""
+    assert release.discover_workspace_repos(workspace_dir) == [
+        workspace_dir / "repo_a",
+        workspace_dir / "repo_b",
+        workspace_dir / "repo_c",
+    ]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_check_workspace_reports_each_repo(workspace_dir, jobs):
+    """Each repository gets its own report, in order, in-process or in workers."""
+    workspace = release.check_workspace(workspace_dir, jobs)
+
+    reports = {Path(r["root"]).name: r for r in workspace["repositories"]}
+    assert list(reports) == ["repo_a", "repo_b", "repo_c"]
+    assert reports["repo_a"]["consensus_version"] == "1.0.0"
+    assert reports["repo_b"]["consensus_version"] == "MISMATCH"
+    assert reports["repo_b"]["errors"] is True
+    assert reports["repo_c"]["consistent"] is True
+    assert workspace["consistent"] is False
+
+
+def test_check_workspace_isolates_failures(workspace_dir, mocker):
+    """An exception in one repository is reported without stopping the others."""
+    real_collect = release.collect_version_checks
+
+    def collect(root_dir, cache=None):
+        if root_dir.name == "repo_a":
+            raise RuntimeError("corrupted checkout")
+        return real_collect(root_dir, cache)
+
+    mocker.patch("jrl_release.collect_version_checks", side_effect=collect)
+
+    workspace = release.check_workspace(workspace_dir, jobs=1)
+
+    reports = {Path(r["root"]).name: r for r in workspace["repositories"]}
+    assert reports["repo_a"]["error"] == "RuntimeError: corrupted checkout"
+    assert reports["repo_a"]["errors"] is True
+    assert set(reports["repo_a"]) == set(reports["repo_c"])
+    assert reports["repo_c"]["consistent"] is True
+
+
+def test_cli_check_version_workspace_json(workspace_dir, mocker, capsys):
+    """--workspace prints one aggregated JSON report and fails on any bad repo."""
+    mocker.patch(
+        "sys.argv",
+        [
+            "jrl_release.py",
+            "--check-version",
+            "--workspace",
+            str(workspace_dir),
+            "--output-format",
+            "json",
+        ],
+    )
+
+    with pytest.raises(SystemExit) as exc_info:
+        release.main()
+
+    assert exc_info.value.code == 1
+    data = json.loads(capsys.readouterr().out)
+    assert data["workspace"] == str(workspace_dir)
+    assert len(data["repositories"]) == 3
+
+
+def test_release_service_check_list_and_bump(project_dir, mocker):
+    """The service answers requests and sees edits made between them."""
+    mocker.patch.object(release, "console", Console(file=StringIO()))
+    service = release.ReleaseService(project_dir)
+
+    response = service.handle_request({"command": "check"})
+    assert response["ok"] is True
+    assert response["result"]["consensus_version"] == "1.0.0"
+
+    listed = service.handle_request({"command": "list"})["result"]
+    assert {entry["name"] for entry in listed} >= {"package.xml", "pyproject.toml"}
+
+    xml = project_dir / "package.xml"
+    xml.write_text(xml.read_text().replace("1.0.0", "1.0.1"), encoding="utf-8")
+    response = service.handle_request({"command": "check"})
+    assert response["result"]["consistent"] is False
+
+    response = service.handle_request({"command": "bump", "version": "2.0.0"})
+    assert response["ok"] is True, response
+    assert response["result"]["new_version"] == "2.0.0"
+    response = service.handle_request({"command": "check"})
+    assert response["result"]["consensus_version"] == "2.0.0"
+
+
+def test_release_service_reports_errors(project_dir):
+    """Bad requests get an error response instead of stopping the service."""
+    service = release.ReleaseService(project_dir)
+
+    assert service.handle_request({"command": "nope"})["ok"] is False
+    response = service.handle_request({"command": "bump", "version": "1.x"})
+    assert response == {"ok": False, "error": "ValueError: Invalid SemVer '1.x'"}
+
+
+@pytest.mark.skipif(not hasattr(release.socket, "AF_UNIX"), reason="needs AF_UNIX")
+def test_serve_round_trip(project_dir, tmp_path, mocker, capsys):
+    """A --serve daemon answers --check-version --socket for its own root only."""
+    import threading
+
+    mocker.patch.object(release, "console", Console(file=StringIO()))
+    socket_path = Path(release.tempfile.mkdtemp()) / "release.sock"
+    server = threading.Thread(target=release.serve, args=(project_dir, socket_path))
+    server.start()
+    try:
+        for _ in range(200):
+            if release.query_server(socket_path, {"command": "ping"}):
+                break
+            time.sleep(0.01)
+
+        # An idle client holding a connection open does not block the others.
+        with release.socket.socket(release.socket.AF_UNIX) as idle:
+            idle.connect(str(socket_path))
+            response = release.query_server(socket_path, {"command": "ping"}, 5.0)
+            assert response["root"] == str(project_dir.resolve())
+
+        query_spy = mocker.spy(release, "query_server")
+        for root, expected_code in ((project_dir, 0), (tmp_path / "other", 1)):
+            mocker.patch(
+                "sys.argv",
+                [
+                    "jrl_release.py",
+                    "--root",
+                    str(root),
+                    "--check-version",
+                    "--socket",
+                    str(socket_path),
+                    "--output-format",
+                    "json",
+                ],
+            )
+            with pytest.raises(SystemExit) as exc_info:
+                release.main()
+            # The daemon answers for project_dir; the other (empty) root is
+            # checked in-process and has no version.
+            assert exc_info.value.code == expected_code
+            assert query_spy.spy_return["ok"]
+        assert query_spy.call_count == 2
+    finally:
+        assert release.query_server(socket_path, {"command": "shutdown"})["ok"]
+        server.join(timeout=10)
+
+    assert not server.is_alive()
+    assert not socket_path.exists()
+
+
+@pytest.mark.skipif(not hasattr(release.os, "getuid"), reason="needs POSIX owners")
+def test_default_socket_path_is_private(tmp_path, monkeypatch):
+    """The default socket lives in a directory only the user can access."""
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path / "run"))
+
+    socket_path = release.default_socket_path(tmp_path)
+
+    assert socket_path.parent == tmp_path / "run" / "jrl_release"
+    assert socket_path.parent.stat().st_mode & 0o777 == 0o700
+    assert release.default_socket_path(tmp_path) == socket_path
+
+    socket_path.parent.chmod(0o777)
+    with pytest.raises(RuntimeError, match="only accessible"):
+        release.default_socket_path(tmp_path)
+
+
+# ============================================================================
+# TEST Startup cost
+# ============================================================================
+
+HEAVY_MODULES = ("rich", "tomlkit", "ruamel", "cmake_parser", "packaging")
+
+# Standard library modules only some commands need, imported on first use.
+LAZY_STDLIB_MODULES = (
+    "socketserver",
+    "tarfile",
+    "multiprocessing",
+    "concurrent.futures.process",
+)
+
+
+def _run_python(code, *args):
+    return subprocess.run(
+        [sys.executable, *args, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).parent,
+    )
+
+
+def _loaded_heavy_modules(statement):
+    code = (
+        "import json, sys\n"
+        "import jrl_release\n"
+        "try:\n"
+        f"    {statement}\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"heavy = {HEAVY_MODULES!r}\n"
+        "loaded = {m.split('.')[0] for m in sys.modules} & set(heavy)\n"
+        "print(json.dumps(sorted(loaded)), file=sys.stderr)\n"
+    )
+    result = _run_python(code)
+    return result.stdout, json.loads(result.stderr.strip().splitlines()[-1])
+
+
+def test_import_loads_no_heavy_dependency():
+    """Importing the module pulls in none of the third-party dependencies."""
+    _, loaded = _loaded_heavy_modules("pass")
+    assert loaded == []
+
+
+def test_short_check_version_skips_rich(project_dir):
+    """--check-version --short prints plain text without importing rich."""
+    argv = ["jrl_release.py", "--root", str(project_dir), "--check-version", "--short"]
+    stdout, loaded = _loaded_heavy_modules(f"sys.argv = {argv!r}; jrl_release.main()")
+
+    assert stdout.strip() == "1.0.0"
+    assert "rich" not in loaded
+
+
+def test_import_defers_command_specific_stdlib_modules():
+    """Startup: standard library modules of single commands load on demand."""
+    code = (
+        "import json, sys\n"
+        "import jrl_release\n"
+        f"print(json.dumps(sorted(set({LAZY_STDLIB_MODULES!r}) & set(sys.modules))))\n"
+    )
+    assert json.loads(_run_python(code).stdout) == []
+
 
 # ============================================================================
 # MAIN
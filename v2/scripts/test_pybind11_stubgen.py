@@ -0,0 +1,484 @@
+#!/usr/bin/env uv run --no-project
+# /// script
+# requires-python = ">=3.10"
+# dependencies = [
+#     "pytest>=8.4.2",
+# ]
+# ///
+
+"""
+Unit tests for the vendored pybind11_stubgen.py (in v2/external-modules).
+
+Run with:
+    uv run test_pybind11_stubgen.py              # Run all tests
+    uv run test_pybind11_stubgen.py -v           # Verbose output
+    uv run test_pybind11_stubgen.py -k sort      # Run specific tests
+"""
+
+import ast
+import importlib
+import itertools
+import os
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+# Import the module under test by name, so that forked workers can find its
+# functions when pickled
+STUBGEN_DIR = (
+    Path(__file__).resolve().parents[1]
+    / "external-modules"
+    / "pybind11-stubgen-e48d1f1"
+)
+sys.path.insert(0, str(STUBGEN_DIR))
+import pybind11_stubgen as stubgen  # noqa: E402
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+
+@pytest.fixture(autouse=True)
+def stubgen_state(monkeypatch):
+    """Fresh global state of pybind11_stubgen for every test."""
+    monkeypatch.setattr(stubgen, "_visited_objects", stubgen.VisitedObjects())
+    monkeypatch.setattr(stubgen, "USE_BOOST_PYTHON", False)
+    monkeypatch.setattr(stubgen, "BARE_NUPMY_NDARRAY", False)
+    for name, value in (
+        ("n_invalid_signatures", 0),
+        ("n_invalid_default_values", 0),
+        ("ignore_invalid_signature", False),
+        ("ignore_invalid_defaultarg", False),
+        ("signature_downgrade", True),
+        ("use_tokenizer", True),
+    ):
+        monkeypatch.setattr(stubgen.FunctionSignature, name, value)
+
+
+# Classes of pybind11 extensions: plain Python classes (of metaclass `type`)
+# are skipped by ModuleStubsGenerator.
+pybind11_type = type("pybind11_type", (type,), {"__module__": "pybind11_builtins"})
+pybind11_object = pybind11_type(
+    "pybind11_object", (object,), {"__module__": "pybind11_builtins"}
+)
+
+
+def _class(module_name, name, *bases, **attributes):
+    """A pybind11-like class of module_name."""
+    return pybind11_type(
+        name, bases or (pybind11_object,), {"__module__": module_name, **attributes}
+    )
+
+
+def _documented(doc):
+    """A function with docstring doc, as pybind11 renders signatures."""
+
+    def function(*args, **kwargs):
+        pass
+
+    function.__doc__ = doc
+    return function
+
+
+def _tree(root):
+    """{relative path: content} of the files under root."""
+    return {
+        path.relative_to(root).as_posix(): path.read_bytes()
+        for path in sorted(root.rglob("*"))
+        if path.is_file()
+    }
+
+
+def _module(monkeypatch, name, *classes, **members):
+    """A module registered in sys.modules, holding classes and members."""
+    module = types.ModuleType(name)
+    for klass in classes:
+        setattr(module, klass.__name__, klass)
+    for member_name, member in members.items():
+        setattr(module, member_name, member)
+    monkeypatch.setitem(sys.modules, name, module)
+    return module
+
+
+# ============================================================================
+# TEST class ordering
+# ============================================================================
+
+
+def _hierarchy(module_name):
+    """Classes in several levels, named so that derived ones sort first,
+    with a diamond, plus unrelated classes."""
+    zbase = _class(module_name, "Zbase")
+    ymid = _class(module_name, "Ymid", zbase)
+    xmid = _class(module_name, "Xmid", zbase)
+    leaf = _class(module_name, "Leaf", ymid, xmid)
+    deep = _class(module_name, "Deep", leaf)
+    alpha = _class(module_name, "Alpha")
+    omega = _class(module_name, "Omega", alpha)
+    return [deep, leaf, xmid, ymid, zbase, omega, alpha]
+
+
+def test_sort_classes_puts_bases_first():
+    """Every base comes before the classes deriving from it, ties by name."""
+    classes = [stubgen.ClassStubsGenerator(c) for c in _hierarchy("_sorted")]
+
+    result = stubgen.ModuleStubsGenerator.sort_classes(classes)
+
+    names = [c.klass.__name__ for c in result]
+    assert names == ["Alpha", "Omega", "Zbase", "Xmid", "Ymid", "Leaf", "Deep"]
+    for i, c in enumerate(result):
+        for base in c.klass.__mro__[1:]:
+            if base in (d.klass for d in result):
+                assert names.index(base.__name__) < i
+
+
+def test_sort_classes_is_deterministic():
+    """The order does not depend on the order classes were found in."""
+    hierarchy = _hierarchy("_shuffled")
+
+    orders = {
+        tuple(
+            c.klass.__name__
+            for c in stubgen.ModuleStubsGenerator.sort_classes(
+                [stubgen.ClassStubsGenerator(c) for c in permutation]
+            )
+        )
+        for permutation in itertools.islice(
+            itertools.permutations(hierarchy), 0, None, 97
+        )
+    }
+    assert len(orders) == 1
+
+
+def test_parsed_module_orders_classes(monkeypatch):
+    """parse() orders the classes of a module, and the stubs follow that order."""
+    module = _module(monkeypatch, "_ordered", *_hierarchy("_ordered"))
+    generator = stubgen.ModuleStubsGenerator(module)
+    generator.parse()
+
+    lines = generator.to_lines()
+
+    defined = [
+        line.split("(")[0][len("class ") :]
+        for line in lines
+        if line.startswith("class ")
+    ]
+    assert defined == ["Alpha", "Omega", "Zbase", "Xmid", "Ymid", "Leaf", "Deep"]
+
+
+# ============================================================================
+# TEST concurrent writing
+# ============================================================================
+
+
+def _package(monkeypatch, name, submodule_count=4):
+    """A module with submodules, each holding a few classes and functions."""
+    submodules = {}
+    for i in range(submodule_count):
+        sub_name = f"{name}.sub{i}"
+        base = _class(
+            sub_name,
+            "Base",
+            compute=_documented(
+                f"compute(self: {sub_name}.Base, x: int = 1) -> float\n"
+            ),
+        )
+        derived = _class(sub_name, "Derived", base)
+        submodules[f"sub{i}"] = _module(
+            monkeypatch,
+            sub_name,
+            base,
+            derived,
+            make=_documented(f"make(n: int) -> {sub_name}.Derived\n"),
+        )
+    return _module(
+        monkeypatch,
+        name,
+        version=_documented("version() -> str\n"),
+        **submodules,
+    )
+
+
+def test_main_jobs_write_the_same_tree(monkeypatch, tmp_path):
+    """--jobs 3 writes exactly what --jobs 1 does."""
+    _package(monkeypatch, "_jobs_pkg")
+
+    trees = []
+    for jobs in (1, 3):
+        monkeypatch.setattr(stubgen, "_visited_objects", stubgen.VisitedObjects())
+        output = tmp_path / f"jobs{jobs}"
+        stubgen.main(["-o", str(output), "--jobs", str(jobs), "_jobs_pkg"])
+        trees.append(_tree(output))
+
+    assert trees[0] == trees[1]
+    assert "_jobs_pkg-stubs/sub3/__init__.pyi" in trees[0]
+    assert b"class Derived(Base):" in trees[0]["_jobs_pkg-stubs/sub3/__init__.pyi"]
+
+
+def test_write_stubs_adds_worker_counts(monkeypatch, tmp_path):
+    """Invalid signatures met while rendering in workers reach the parent."""
+    real_to_lines = stubgen.FreeFunctionStubsGenerator.to_lines
+
+    def to_lines(self):
+        # Stands for a signature found invalid while rendering
+        stubgen.FunctionSignature.n_invalid_signatures += 1
+        stubgen.FunctionSignature.n_invalid_default_values += 2
+        return real_to_lines(self)
+
+    monkeypatch.setattr(stubgen.FreeFunctionStubsGenerator, "to_lines", to_lines)
+    generator = stubgen.ModuleStubsGenerator(_package(monkeypatch, "_counted_pkg"))
+    generator.parse()
+    assert stubgen.FunctionSignature.n_fatal_errors() == 0
+
+    generator.write(str(tmp_path), jobs=3)
+
+    # One free function in the package and in each of its 4 submodules
+    assert stubgen.FunctionSignature.n_invalid_signatures == 5
+    assert stubgen.FunctionSignature.n_invalid_default_values == 10
+    assert stubgen.FunctionSignature.n_fatal_errors() == 15
+
+
+# ============================================================================
+# TEST API fingerprint
+# ============================================================================
+
+
+@pytest.fixture
+def api_package(monkeypatch, tmp_path):
+    """Write the pure-Python package `_api_pkg` from source, importable afresh."""
+    source_dir = tmp_path / "src"
+    (source_dir / "_api_pkg").mkdir(parents=True)
+    monkeypatch.syspath_prepend(str(source_dir))
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+
+    def write(source):
+        (source_dir / "_api_pkg" / "__init__.py").write_text(source)
+        sys.modules.pop("_api_pkg", None)
+        importlib.invalidate_caches()
+
+    yield write
+    sys.modules.pop("_api_pkg", None)
+
+
+API_SOURCE = """
+def scale(*args, **kwargs):
+    '''scale(x: float, factor: float = 2.0) -> float'''
+
+
+VERSION = "1.0"
+"""
+
+
+def _run_main(monkeypatch, output, fingerprint):
+    monkeypatch.setattr(stubgen, "_visited_objects", stubgen.VisitedObjects())
+    stubgen.main(
+        ["-o", str(output), "--fingerprint-file", str(fingerprint), "_api_pkg"]
+    )
+
+
+def test_main_skips_unchanged_api(monkeypatch, tmp_path, api_package):
+    """Stubs are only regenerated when the public API changes."""
+    output, fingerprint = tmp_path / "stubs", tmp_path / "api.sha256"
+    stub = output / "_api_pkg-stubs" / "__init__.pyi"
+    api_package(API_SOURCE)
+
+    _run_main(monkeypatch, output, fingerprint)
+    assert "def scale(x: float, factor: float = 2.0) -> float:" in stub.read_text()
+    recorded = fingerprint.read_text()
+    os.utime(stub, (1_000_000, 1_000_000))
+
+    # Unchanged: nothing is parsed nor written, the fingerprint is touched
+    real_parse = stubgen.ModuleStubsGenerator.parse
+    monkeypatch.setattr(
+        stubgen.ModuleStubsGenerator,
+        "parse",
+        lambda self: pytest.fail("unchanged API parsed again"),
+    )
+    api_package(API_SOURCE)
+    _run_main(monkeypatch, output, fingerprint)
+    assert stub.stat().st_mtime == 1_000_000
+    assert fingerprint.read_text() == recorded
+
+    # A new attribute regenerates the stubs
+    monkeypatch.setattr(stubgen.ModuleStubsGenerator, "parse", real_parse)
+    api_package(API_SOURCE + "\nTOLERANCE = 1e-9\n")
+    _run_main(monkeypatch, output, fingerprint)
+    assert "TOLERANCE" in stub.read_text()
+    assert stub.stat().st_mtime != 1_000_000
+    assert fingerprint.read_text() != recorded
+
+
+def test_main_fatal_error_leaves_no_fingerprint(monkeypatch, tmp_path, api_package):
+    """Stubs with invalid signatures exit with an error and record nothing."""
+    output, fingerprint = tmp_path / "stubs", tmp_path / "api.sha256"
+    api_package(API_SOURCE)
+    _run_main(monkeypatch, output, fingerprint)
+    assert fingerprint.exists()
+
+    api_package(
+        API_SOURCE
+        + """
+def broken(*args, **kwargs):
+    '''broken(x: _api_pkg.Thing = <_api_pkg.Thing object at 0x7f00>) -> None'''
+"""
+    )
+    with pytest.raises(SystemExit) as exc_info:
+        _run_main(monkeypatch, output, fingerprint)
+
+    assert exc_info.value.code == 1
+    assert not fingerprint.exists()
+
+
+# ============================================================================
+# TEST signature tokenizer
+# ============================================================================
+
+# boost::python argument lists, with the names the fallback gives them
+BOOST_PYTHON_ARGUMENTS = [
+    (" (SE3)arg1, (SE3)arg2", "arg1: SE3, arg2: SE3"),
+    (
+        " (object)self [, (int)nq=0 [, (int)nv=0]]",
+        "self_: object, nq: int = 0, nv: int = 0",
+    ),
+    (
+        " (Model)model, (Data)data, (numpy.ndarray)q [, (float)prec=1e-12 [, (bool)verbose]]",
+        "model: Model, data: Data, q_: numpy.ndarray, prec: float = 1e-12, verbose: bool",
+    ),
+    (
+        " (Model)model [, (Convention)convention=pinocchio.Convention.LOCAL]",
+        "model_: Model, convention: Convention = pinocchio.Convention.LOCAL",
+    ),
+    (" (str)path [, (str)sep='a b']", "path_: str, sep: str = 'a b'"),
+    (' (str)path [, (str)sep="/"]', 'path_: str, sep: str = "/"'),
+    (" (int)seed_value", "seed_value: int"),
+]
+
+# Left to the fallback: defaults with parentheses, commas or brackets, and
+# lists with optional arguments only or unbalanced brackets
+BOOST_PYTHON_FALLBACK_ARGUMENTS = [
+    " (Model)self, (str)name [, (FrameType)type=pinocchio.FrameType(31)]",
+    " (Vector)self [, (list)values=[1, 2]]",
+    " (Solver)self [, (tuple)bounds=(0, 1)]",
+    " [, (int)n=0]",
+    " (int)x ]",
+]
+
+
+@pytest.mark.parametrize("args,expected", BOOST_PYTHON_ARGUMENTS)
+def test_boost_python_arguments_match_fallback(args, expected):
+    """The single-pass parse gives what the former conversion gives."""
+    arguments = stubgen.boost_python_arguments(args)
+
+    assert arguments is not None
+    converted = ", ".join(a.to_string() for a in arguments)
+    assert converted == expected
+    assert converted == stubgen.FunctionSignature.boost_python_arguments_fallback(args)
+
+
+@pytest.mark.parametrize("args", BOOST_PYTHON_FALLBACK_ARGUMENTS)
+def test_boost_python_arguments_defer_to_fallback(args):
+    """What the single-pass parse does not recognize goes to the fallback."""
+    assert stubgen.boost_python_arguments(args) is None
+
+
+# (name, args, rtype, whether is_valid_signature accepts it). Rejected cases
+# are decided by ast.parse, which may still accept them.
+SIGNATURES = [
+    ("f", "", "None", True),
+    ("f", "x: int, y: float = 1.0", "None", True),
+    ("f", "self: a.B, *args, **kwargs", "typing.Any", True),
+    ("f", "x: List[Dict[str, int]] = [], *, key: str = 'k'", "Optional[int]", False),
+    ("f", "x: List[Dict[str, int]] = [], *rest: int, key: str = 'k'", "int", True),
+    ("f", "x: numpy.ndarray[numpy.float64[3, 1]]", "None", True),
+    ("f", "x: Callable[[int, float], bool]", "Iterator[Tuple[str, float]]", True),
+    ("f", "x: float = 1e-09, y: int = -1, z: int = 0", "None", True),
+    ("f", "x: None = None, y: bool = True", "None", True),
+    # keywords
+    ("class", "x: int", "None", False),
+    ("f", "lambda: int", "None", False),
+    ("f", "x: import.foo", "None", False),
+    ("f", "x: a.None", "None", False),
+    ("f", "x: int", "a.True", False),
+    ("f", "x: int", "True.real", True),
+    # argument order
+    ("f", "x: int = 1, y: int", "None", False),
+    ("f", "*args, y: int, **kwargs", "None", True),
+    ("f", "**kwargs, x: int", "None", False),
+    ("f", "*args, *rest", "None", False),
+    ("f", "*args: int = 1", "None", False),
+    ("f", "*, x: int", "None", False),
+    # numbers
+    ("f", "x: int = 01", "None", False),
+    ("f", "x: int = 00", "None", False),
+    ("f", "x: float = .5", "None", True),
+    # unbalanced brackets
+    ("f", "x: List[int", "None", False),
+    ("f", "x: List[int]]", "None", False),
+    ("f", "x: int = [1, 2", "None", False),
+    ("f", "x: int", "List[int", False),
+    ("f", "x: int,", "None", False),
+]
+
+
+def _parses(name, args, rtype):
+    try:
+        ast.parse(f"def {name}({args}) -> {rtype}: ...")
+    except SyntaxError:
+        return False
+    return True
+
+
+@pytest.mark.parametrize("name,args,rtype,accepted", SIGNATURES)
+def test_is_valid_signature_agrees_with_ast(name, args, rtype, accepted):
+    """is_valid_signature only accepts what ast.parse accepts."""
+    assert stubgen.is_valid_signature(name, args, rtype) is accepted
+    if accepted:
+        assert _parses(name, args, rtype)
+
+
+def _signature(name, args, rtype, use_tokenizer):
+    """FunctionSignature built one way, with the invalid signatures it counted."""
+    stubgen.FunctionSignature.use_tokenizer = use_tokenizer
+    stubgen.FunctionSignature.n_invalid_signatures = 0
+    signature = stubgen.FunctionSignature(name, args, rtype)
+    return (signature.name, signature.args, signature.rtype), (
+        stubgen.FunctionSignature.n_invalid_signatures
+    )
+
+
+@pytest.mark.parametrize("name,args,rtype,accepted", SIGNATURES)
+def test_signature_matches_former_way(name, args, rtype, accepted):
+    """Signatures and error counts are those of ast.parse alone."""
+    tokenized = _signature(name, args, rtype, True)
+
+    assert tokenized == _signature(name, args, rtype, False)
+    assert tokenized[1] == (0 if _parses(name, args, rtype) else 1)
+
+
+@pytest.mark.parametrize(
+    "args",
+    [args for args, _ in BOOST_PYTHON_ARGUMENTS] + BOOST_PYTHON_FALLBACK_ARGUMENTS,
+)
+def test_boost_python_signature_matches_former_way(monkeypatch, args):
+    """boost::python signatures come out as they did without the tokenizer,
+    including the errors of the fallback."""
+    monkeypatch.setattr(stubgen, "USE_BOOST_PYTHON", True)
+
+    def outcome(use_tokenizer):
+        try:
+            return _signature("f", args, "None :", use_tokenizer)
+        except Exception as e:
+            return type(e)
+
+    assert outcome(True) == outcome(False)
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"] + sys.argv[1:]))